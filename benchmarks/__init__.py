@@ -0,0 +1 @@
+"""Benchmarks for estonian_e_invoice."""
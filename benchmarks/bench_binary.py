@@ -0,0 +1,99 @@
+"""
+Compares the binary format of `estonian_e_invoice.binary` with pickling.
+
+For invoices of 1, 50 and 500 rows, measures the encoded size and the encode
+and decode throughput of a stream of invoices, with every invoice pickled on
+its own like a record of a binary file. msgpack is measured if it is
+installed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_binary
+"""
+import io
+import pickle
+import timeit
+
+from estonian_e_invoice import binary
+from tests.factories import build_invoice
+
+ROWS = (1, 50, 500)
+INVOICES = 20
+
+
+def get_codecs() -> list:
+    codecs = [binary.JSON]
+    try:
+        binary.import_msgpack()
+    except ImportError:
+        pass
+    else:
+        codecs.append(binary.MSGPACK)
+    return codecs
+
+
+def pickle_records(invoices: list) -> list:
+    return [
+        pickle.dumps(invoice, protocol=pickle.HIGHEST_PROTOCOL) for invoice in invoices
+    ]
+
+
+def dump_binary(invoices: list, codec: str) -> bytes:
+    file = io.BytesIO()
+    binary.dump(invoices, file, codec)
+    return file.getvalue()
+
+
+def measure(function, repeat: int = 3) -> float:
+    """
+    Returns the best time of a single call in seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    print(
+        "{:>6} {:>8} {:>14} {:>16} {:>16}".format(
+            "rows", "format", "bytes/invoice", "encode (inv/s)", "decode (inv/s)"
+        )
+    )
+
+    for rows in ROWS:
+        invoices = [build_invoice(rows=rows)] * INVOICES
+
+        records = pickle_records(invoices)
+        results = [
+            (
+                "pickle",
+                sum(len(record) for record in records),
+                measure(lambda: pickle_records(invoices)),
+                measure(lambda: [pickle.loads(record) for record in records]),
+            )
+        ]
+        for codec in get_codecs():
+            data = dump_binary(invoices, codec)
+            results.append(
+                (
+                    codec,
+                    len(data),
+                    measure(lambda: dump_binary(invoices, codec)),
+                    measure(lambda: list(binary.load(io.BytesIO(data)))),
+                )
+            )
+
+        for name, size, encode_time, decode_time in results:
+            print(
+                "{:>6} {:>8} {:>14.0f} {:>16.0f} {:>16.0f}".format(
+                    rows,
+                    name,
+                    size / INVOICES,
+                    INVOICES / encode_time,
+                    INVOICES / decode_time,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
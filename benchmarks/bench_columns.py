@@ -0,0 +1,100 @@
+"""
+Compares building invoice rows one by one with `InvoiceItem.from_columns`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_columns
+"""
+import timeit
+from decimal import Decimal
+
+from estonian_e_invoice.entities import VAT, InvoiceItem, ItemDetailInfo, ItemEntry
+
+ROWS = (10, 100, 1000)
+
+
+def build_columns(rows: int) -> dict:
+    return {
+        "description": ["Item {index}".format(index=index) for index in range(rows)],
+        "item_sum": [Decimal("10.0000")] * rows,
+        "item_total": [Decimal("12.0000")] * rows,
+        "item_unit": ["kWh"] * rows,
+        "item_amount": [Decimal("1.0000")] * rows,
+        "item_price": [Decimal("10.0000")] * rows,
+        "vat_rate": [Decimal("20.00")] * rows,
+        "vat_sum": [Decimal("2.0000")] * rows,
+    }
+
+
+def build_rows(columns: dict) -> InvoiceItem:
+    return InvoiceItem(
+        [
+            ItemEntry(
+                description=description,
+                item_sum=item_sum,
+                item_total=item_total,
+                item_detail_info=ItemDetailInfo(
+                    item_unit=item_unit, item_amount=item_amount, item_price=item_price
+                ),
+                vat=VAT(vat_rate=vat_rate, vat_sum=vat_sum),
+            )
+            for (
+                description,
+                item_sum,
+                item_total,
+                item_unit,
+                item_amount,
+                item_price,
+                vat_rate,
+                vat_sum,
+            ) in zip(*columns.values())
+        ]
+    )
+
+
+def measure(function, repeat: int = 3) -> float:
+    """
+    Returns the best time of a single call in seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    print(
+        "{:>6} {:>12} {:>12} {:>8} {:>14} {:>14}".format(
+            "rows",
+            "rows (ms)",
+            "columns (ms)",
+            "speedup",
+            "rows + xml",
+            "columns + xml",
+        )
+    )
+
+    for rows in ROWS:
+        columns = build_columns(rows)
+        assert (
+            build_rows(columns).to_bytes()
+            == InvoiceItem.from_columns(**columns).to_bytes()
+        )
+
+        row_time = measure(lambda: build_rows(columns))
+        column_time = measure(lambda: InvoiceItem.from_columns(**columns))
+        row_total = measure(lambda: build_rows(columns).to_bytes())
+        column_total = measure(lambda: InvoiceItem.from_columns(**columns).to_bytes())
+        print(
+            "{:>6} {:>12.2f} {:>12.2f} {:>7.1f}x {:>14.2f} {:>14.2f}".format(
+                rows,
+                row_time * 1000,
+                column_time * 1000,
+                row_time / column_time,
+                row_total * 1000,
+                column_total * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares the date string check with `datetime.strptime`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_date_check
+"""
+import timeit
+from datetime import date, datetime, timedelta
+
+from estonian_e_invoice.validation.checks import check_date_string
+
+COUNT = 100000
+
+
+def check_with_strptime(value: str):
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return "Date should be in %Y-%m-%d format"
+
+    return None
+
+
+def measure(function, values) -> float:
+    """
+    Returns the best time of a check in nanoseconds.
+    """
+    timer = timeit.Timer(lambda: [function(value) for value in values])
+    return min(timer.repeat(repeat=5, number=1)) / len(values) * 1e9
+
+
+def main() -> None:
+    start = date(2000, 1, 1)
+    cases = [
+        ("repeated", ["2020-04-20", "2020-05-20", "2020-06-20"] * (COUNT // 3)),
+        (
+            "distinct",
+            [(start + timedelta(days=day)).isoformat() for day in range(COUNT)],
+        ),
+    ]
+
+    print(
+        "{:>10} {:>16} {:>16} {:>8}".format(
+            "dates", "strptime (ns)", "check (ns)", "speedup"
+        )
+    )
+    for name, values in cases:
+        check_date_string.cache_clear()
+        strptime_time = measure(check_with_strptime, values)
+        check_time = measure(check_date_string.__wrapped__, values)
+        cached_time = measure(check_date_string, values)
+        print(
+            "{:>10} {:>16.0f} {:>16.0f} {:>7.1f}x".format(
+                name, strptime_time, check_time, strptime_time / check_time
+            )
+        )
+        print(
+            "{:>10} {:>16} {:>16.0f} {:>7.1f}x".format(
+                name + "*", "", cached_time, strptime_time / cached_time
+            )
+        )
+    print("* with the memo of the checked strings")
+
+
+if __name__ == "__main__":
+    main()
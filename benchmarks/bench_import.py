@@ -0,0 +1,79 @@
+"""
+Import time and first invoice latency of a fresh process.
+
+Every measurement runs in a new interpreter and times, inside it:
+
+    import        `import estonian_e_invoice`
+    generators    `from estonian_e_invoice import XMLGenerator`
+    first         building and serializing the first invoice
+    warm_up       `estonian_e_invoice.warm_up()`
+    warm first    the first invoice after the warm-up
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+RUNS = 10
+
+SCRIPT = """
+import json, time
+
+start = time.perf_counter()
+import estonian_e_invoice
+imported = time.perf_counter()
+from estonian_e_invoice import XMLGenerator
+from tests.factories import build_header, build_invoice
+generators = time.perf_counter()
+
+if {warm_up}:
+    estonian_e_invoice.warm_up()
+warm = time.perf_counter()
+XMLGenerator(build_header(), None, build_invoice()).to_bytes()
+first = time.perf_counter()
+
+print(json.dumps({{
+    "import": imported - start,
+    "generators": generators - imported,
+    "warm_up": warm - generators,
+    "first": first - warm,
+}}))
+"""
+
+
+def run_script(warm_up: bool) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT.format(warm_up=warm_up)]
+    )
+    return json.loads(output.decode())
+
+
+def median_times(warm_up: bool, runs: int = RUNS) -> dict:
+    results = [run_script(warm_up) for _ in range(runs)]
+    return {
+        name: statistics.median(result[name] for result in results)
+        for name in results[0]
+    }
+
+
+def main() -> None:
+    cold = median_times(warm_up=False)
+    warm = median_times(warm_up=True)
+
+    print("median of {runs} processes (ms)".format(runs=RUNS))
+    for name, value in (
+        ("import", cold["import"]),
+        ("generators", cold["generators"]),
+        ("first", cold["first"]),
+        ("warm_up", warm["warm_up"]),
+        ("warm first", warm["first"]),
+    ):
+        print("{:>12} {:>10.1f}".format(name, value * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Peak memory of building and generating invoices.
+
+Measures the peak of the memory allocated by Python, traced with tracemalloc,
+while the entities of an invoice are built and while the document of an
+invoice is generated, and reports it per row and per invoice. The peak of the
+generation includes the ElementTree of the document and the serialized text,
+it is measured on top of the built invoice, so the peak per invoice is the
+sum of both. Streaming a file is measured too, reported per file and per
+invoice. The invoices are released once they are written, the peak still
+grows with the first few hundred invoices while the interpreter fills its
+free lists of tuples and dictionaries, and stays flat after that.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+
+tests/test_memory.py asserts ceilings for the same measurements.
+"""
+import gc
+import tracemalloc
+
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator
+from tests.factories import build_header, build_invoice
+
+ROWS = (1, 50, 500)
+INVOICES = (10, 100, 1000)
+
+
+class NullSink:
+    """
+    Binary file object dropping the written bytes.
+    """
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def peak_bytes(function) -> int:
+    """
+    Returns the peak of the memory allocated while function runs, on top of
+    the memory allocated before it was called.
+    """
+    function()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start
+
+
+def construction_peak(rows: int) -> int:
+    return peak_bytes(lambda: build_invoice(rows=rows))
+
+
+def generate_peak(rows: int, prettify: bool) -> int:
+    header = build_header()
+    invoice = build_invoice(rows=rows)
+    return peak_bytes(
+        lambda: XMLGenerator(header, None, invoice).generate(prettify=prettify)
+    )
+
+
+def streaming_peak(invoices: int, rows: int) -> int:
+    header = build_header()
+    return peak_bytes(
+        lambda: StreamingXMLGenerator(
+            header,
+            None,
+            (
+                build_invoice(invoice_id=str(index), rows=rows)
+                for index in range(invoices)
+            ),
+        ).write(NullSink())
+    )
+
+
+def main() -> None:
+    print(
+        "{:>6} {:>18} {:>18} {:>18} {:>18}".format(
+            "rows",
+            "construct (B/row)",
+            "generate (B/row)",
+            "pretty (B/row)",
+            "peak (B/invoice)",
+        )
+    )
+    for rows in ROWS:
+        construction = construction_peak(rows)
+        generation = generate_peak(rows, prettify=False)
+        print(
+            "{:>6} {:>18.0f} {:>18.0f} {:>18.0f} {:>18}".format(
+                rows,
+                construction / rows,
+                generation / rows,
+                generate_peak(rows, prettify=True) / rows,
+                construction + generation,
+            )
+        )
+
+    print()
+    print(
+        "{:>9} {:>24} {:>18}".format(
+            "invoices", "streaming peak (B/file)", "peak (B/invoice)"
+        )
+    )
+    for invoices in INVOICES:
+        peak = streaming_peak(invoices, rows=5)
+        print("{:>9} {:>24} {:>18.0f}".format(invoices, peak, peak / invoices))
+
+
+if __name__ == "__main__":
+    main()
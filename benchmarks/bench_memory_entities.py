@@ -0,0 +1,102 @@
+"""
+Compares the memory used by the compact entities with the dictionary based
+representation they replaced.
+
+The dictionary based entities are emulated by copying the compact trees into
+plain `Node` subclasses carrying an `elements` (and `attributes`) dictionary per
+instance. The copies of both representations share the values of the original
+tree, so only the memory used by the containers is measured.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory_entities
+"""
+import gc
+import tracemalloc
+
+from estonian_e_invoice.entities.common import CompactNode, Node
+from tests.factories import build_invoice, build_item_entry
+
+COUNT = 1000
+ROWS = (1, 50, 200)
+
+_dict_classes = {}
+
+
+def to_dict_node(cls: type, elements: dict, attributes: dict) -> Node:
+    if cls not in _dict_classes:
+        _dict_classes[cls] = type(cls.__name__, (Node,), {"tag": cls.tag})
+
+    node = _dict_classes[cls]()
+    node.elements = elements
+    if cls.attribute_fields:
+        node.attributes = attributes
+    return node
+
+
+def to_compact_node(cls: type, elements: dict, attributes: dict) -> CompactNode:
+    node = cls.__new__(cls)
+    node.elements = elements
+    if cls.attribute_fields:
+        node.attributes = attributes
+    return node
+
+
+def copy_tree(value, to_node):
+    """
+    Returns a copy of the compact tree built with `to_node`, sharing the values.
+    """
+    if isinstance(value, list):
+        return [copy_tree(item, to_node) for item in value]
+    if not isinstance(value, CompactNode):
+        return value
+
+    elements = {
+        name: copy_tree(element, to_node) for name, element in value.iter_elements()
+    }
+    return to_node(type(value), elements, dict(value.attributes))
+
+
+def measure(tree, to_node, count: int) -> float:
+    """
+    Returns the bytes retained by one copy of the tree built with `to_node`.
+    """
+    copy_tree(tree, to_node)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        copies = [copy_tree(tree, to_node) for _ in range(count)]
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del copies
+    return (end - start) / count
+
+
+def main() -> None:
+    print(
+        "{:>16} {:>14} {:>14} {:>8}".format(
+            "entity", "dict (B)", "compact (B)", "ratio"
+        )
+    )
+
+    cases = [("ItemEntry", build_item_entry(), COUNT)]
+    cases.extend(
+        ("Invoice/{rows}".format(rows=rows), build_invoice(rows=rows), COUNT // rows)
+        for rows in ROWS
+    )
+
+    for name, tree, count in cases:
+        dict_backed = measure(tree, to_dict_node, count)
+        compact = measure(tree, to_compact_node, count)
+        print(
+            "{:>16} {:>14.0f} {:>14.0f} {:>7.2f}x".format(
+                name, dict_backed, compact, dict_backed / compact
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
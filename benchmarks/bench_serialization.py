@@ -0,0 +1,169 @@
+"""
+Compares the direct Node serializer with the ElementTree path.
+
+The serializers of the compact entities are compared with the ones of the
+dictionary based entities they replaced as well, emulated like in
+`benchmarks.bench_memory_entities`. Compact entities serialized more slowly
+than the dictionary based ones by more than the threshold are listed and the
+exit status is 1, as the compact entities are meant to be as fast.
+
+Invoices sharing frozen parties are serialized with and without a
+`FragmentCache` too, a cache slower than no cache by more than the threshold
+is listed as a regression as well.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --threshold 0.25
+"""
+import argparse
+import sys
+import timeit
+from xml.etree import ElementTree
+
+from benchmarks.bench_memory_entities import copy_tree, to_dict_node
+from estonian_e_invoice.cache import FragmentCache
+from tests.factories import build_invoice
+
+ROWS = (1, 50, 500)
+
+
+def measure(function, repeat: int = 5) -> float:
+    """
+    Returns the best time of a single call in seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_interleaved(first, second, repeat: int = 15) -> tuple:
+    """
+    Returns the best times of single calls of both functions in seconds, timed
+    alternately so that the noise of the machine affects both alike.
+    """
+    first_timer, second_timer = timeit.Timer(first), timeit.Timer(second)
+    number, _ = first_timer.autorange()
+    first_times, second_times = [], []
+    for _ in range(repeat):
+        first_times.append(first_timer.timeit(number))
+        second_times.append(second_timer.timeit(number))
+    return min(first_times) / number, min(second_times) / number
+
+
+def compare_representations(invoice, threshold: float) -> list:
+    """
+    Returns the (serializer, dict time, compact time) tuples of the
+    serializers slower for the compact invoice than for its dictionary based
+    copy by more than the threshold.
+    """
+    dict_invoice = copy_tree(invoice, to_dict_node)
+    assert dict_invoice.to_bytes() == invoice.to_bytes()
+
+    regressions = []
+    for name in ("to_etree", "to_bytes"):
+        dict_time = measure(getattr(dict_invoice, name))
+        compact_time = measure(getattr(invoice, name))
+        print(
+            "{:>6} {:>10} {:>14.3f} {:>14.3f} {:>7.2f}x".format(
+                len(invoice.elements["InvoiceItem"].elements["InvoiceItemGroup"]),
+                name,
+                dict_time * 1000,
+                compact_time * 1000,
+                compact_time / dict_time,
+            )
+        )
+        if compact_time > dict_time * (1 + threshold):
+            regressions.append((name, dict_time, compact_time))
+
+    return regressions
+
+
+def compare_fragment_cache(invoice, threshold: float) -> list:
+    """
+    Returns the (serializer, uncached time, cached time) tuple of the invoice
+    if it is serialized more slowly with a warm fragment cache than without a
+    cache by more than the threshold. The parties of the invoice are frozen,
+    like interned ones.
+    """
+    for party in invoice.elements["InvoiceParties"]:
+        party.freeze()
+    fragment_cache = FragmentCache()
+    assert invoice.to_bytes(fragment_cache=fragment_cache) == invoice.to_bytes()
+
+    uncached_time, cached_time = measure_interleaved(
+        invoice.to_bytes, lambda: invoice.to_bytes(fragment_cache=fragment_cache)
+    )
+    print(
+        "{:>6} {:>14.3f} {:>14.3f} {:>7.2f}x".format(
+            len(invoice.elements["InvoiceItem"].elements["InvoiceItemGroup"]),
+            uncached_time * 1000,
+            cached_time * 1000,
+            uncached_time / cached_time,
+        )
+    )
+    if cached_time > uncached_time * (1 + threshold):
+        return [("to_bytes with FragmentCache", uncached_time, cached_time)]
+    return []
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown of the compact entities",
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        "{:>6} {:>14} {:>14} {:>8}".format(
+            "rows", "etree (ms)", "direct (ms)", "speedup"
+        )
+    )
+
+    invoices = [build_invoice(rows=rows) for rows in ROWS]
+    for rows, invoice in zip(ROWS, invoices):
+        assert invoice.to_bytes() == ElementTree.tostring(invoice.to_etree(), "utf-8")
+
+        etree_time = measure(lambda: ElementTree.tostring(invoice.to_etree(), "utf-8"))
+        direct_time = measure(invoice.to_bytes)
+        print(
+            "{:>6} {:>14.3f} {:>14.3f} {:>7.2f}x".format(
+                rows, etree_time * 1000, direct_time * 1000, etree_time / direct_time
+            )
+        )
+
+    print()
+    print(
+        "{:>6} {:>10} {:>14} {:>14} {:>8}".format(
+            "rows", "serializer", "dict (ms)", "compact (ms)", "ratio"
+        )
+    )
+    regressions = []
+    for invoice in invoices:
+        regressions.extend(compare_representations(invoice, args.threshold))
+
+    print()
+    print(
+        "{:>6} {:>14} {:>14} {:>8}".format(
+            "rows", "uncached (ms)", "cached (ms)", "speedup"
+        )
+    )
+    for rows in ROWS:
+        regressions.extend(
+            compare_fragment_cache(build_invoice(rows=rows), args.threshold)
+        )
+
+    for name, dict_time, compact_time in regressions:
+        print(
+            "REGRESSION {name}: {dict_time:.3f} ms -> {compact_time:.3f} ms".format(
+                name=name, dict_time=dict_time * 1000, compact_time=compact_time * 1000
+            )
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Benchmarks of entity construction, validation and serialization.
+
+Every scenario generates a file of synthetic invoices with the given number of
+rows and measures the stages of the generation separately:
+
+    construct        building the invoice entities, validated by `Node.validate`
+    to_etree         converting the invoices into ElementTree elements
+    generate         `XMLGenerator.generate(prettify=False)` of each invoice
+    generate_pretty  `XMLGenerator.generate(prettify=True)` of each invoice
+    end_to_end       building and streaming the invoices into a file
+
+The results are the seconds per invoice. The stages of single invoices are
+timed over --sample invoices, the end to end stage streams all the invoices of
+the scenario into a sink counting the bytes, so it takes a while for the
+largest scenarios. Every stage is run --repeat times, the fastest repeat is
+reported and compared with the baseline, the median is saved along with it.
+
+The default scenarios have 1 and 1000 invoices. End to end, an invoice takes
+about 10 ms with 1 row and 0.8 s with 500 rows, so the default matrix runs
+for about an hour. --large adds the scenarios of 100000 invoices, which take
+about three days with the default rows and repeats.
+
+Run from the repository root:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --large --rows 1 --repeat 1
+    python -m benchmarks.suite --invoices 1 1000 --rows 1 50 --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.1
+
+With --compare, stages slower than the baseline by more than the threshold are
+listed and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator
+from estonian_e_invoice.validation.registry import validator_registry
+from tests.factories import build_header, build_invoice
+
+INVOICES = (1, 1000)
+# Opt-in scenario, see --large.
+LARGE_INVOICES = 100000
+ROWS = (1, 50, 500)
+SAMPLE = 100
+REPEAT = 3
+
+STAGES = ("construct", "to_etree", "generate", "generate_pretty", "end_to_end")
+
+
+class CountingSink:
+    """
+    Binary file object counting the written bytes.
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+def scenario_name(invoices: int, rows: int) -> str:
+    return "invoices={invoices},rows={rows}".format(invoices=invoices, rows=rows)
+
+
+def time_per_call(function, count: int, repeat: int = REPEAT) -> list:
+    """
+    Returns the seconds per call of function over count calls of every repeat,
+    after a call warming up the caches.
+    """
+    function(0)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for index in range(count):
+            function(index)
+        times.append((time.perf_counter() - start) / count)
+    return times
+
+
+def run_scenario(
+    invoices: int, rows: int, sample: int = SAMPLE, repeat: int = REPEAT
+) -> dict:
+    count = min(invoices, sample)
+    header = build_header()
+    invoice = build_invoice(rows=rows)
+
+    def generate(prettify: bool):
+        return lambda index: XMLGenerator(header, None, invoice).generate(
+            prettify=prettify
+        )
+
+    times = {
+        "construct": time_per_call(
+            lambda index: build_invoice(invoice_id=str(index), rows=rows),
+            count,
+            repeat,
+        ),
+        "to_etree": time_per_call(lambda index: invoice.to_etree(), count, repeat),
+        "generate": time_per_call(generate(False), count, repeat),
+        "generate_pretty": time_per_call(generate(True), count, repeat),
+        "end_to_end": [],
+    }
+
+    for _ in range(repeat):
+        sink = CountingSink()
+        start = time.perf_counter()
+        StreamingXMLGenerator(
+            header,
+            None,
+            (
+                build_invoice(invoice_id=str(index), rows=rows)
+                for index in range(invoices)
+            ),
+        ).write(sink)
+        times["end_to_end"].append((time.perf_counter() - start) / invoices)
+
+    result = {stage: min(stage_times) for stage, stage_times in times.items()}
+    result["median"] = {
+        stage: statistics.median(stage_times) for stage, stage_times in times.items()
+    }
+    result["repeat"] = repeat
+    result["measured_invoices"] = count
+    result["invoices_per_second"] = 1 / result["end_to_end"]
+    result["rows_per_second"] = rows / result["end_to_end"]
+    result["bytes_per_invoice"] = sink.size / invoices
+    result["total_seconds"] = result["end_to_end"] * invoices
+    return result
+
+
+def run(
+    invoices=INVOICES, rows=ROWS, sample: int = SAMPLE, repeat: int = REPEAT
+) -> dict:
+    return {
+        "python": platform.python_version(),
+        "engine": validator_registry.engine,
+        "scenarios": {
+            scenario_name(invoice_count, row_count): run_scenario(
+                invoice_count, row_count, sample, repeat
+            )
+            for invoice_count in invoices
+            for row_count in rows
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns the (scenario, stage, baseline, current) tuples of the stages
+    slower than the baseline by more than the threshold, by their fastest
+    repeats.
+
+    Scenarios missing from either of the results are skipped.
+    """
+    regressions = []
+    for name, scenario in sorted(results["scenarios"].items()):
+        baseline_scenario = baseline["scenarios"].get(name)
+        if baseline_scenario is None:
+            continue
+
+        for stage in STAGES:
+            if stage not in baseline_scenario:
+                continue
+            if scenario[stage] > baseline_scenario[stage] * (1 + threshold):
+                regressions.append(
+                    (name, stage, baseline_scenario[stage], scenario[stage])
+                )
+
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    print(
+        "python {python}, {engine} validation engine".format(
+            python=results["python"], engine=results["engine"]
+        )
+    )
+    print(
+        "{:>24} ".format("scenario")
+        + " ".join("{:>20}".format(stage + " (ms)") for stage in STAGES)
+        + " {:>12} {:>12}".format("invoices/s", "total (s)")
+    )
+
+    for name, scenario in results["scenarios"].items():
+        print(
+            "{:>24} ".format(name)
+            + " ".join("{:>20.3f}".format(scenario[stage] * 1000) for stage in STAGES)
+            + " {:>12.0f} {:>12.1f}".format(
+                scenario["invoices_per_second"], scenario["total_seconds"]
+            )
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--invoices", type=int, nargs="+", default=INVOICES)
+    parser.add_argument("--rows", type=int, nargs="+", default=ROWS)
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help="add the scenarios of {count} invoices".format(count=LARGE_INVOICES),
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=SAMPLE,
+        help="number of invoices the single invoice stages are timed over",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=REPEAT,
+        help="number of times every stage is run",
+    )
+    parser.add_argument("--save", help="path of the JSON file to save the results")
+    parser.add_argument("--compare", help="path of the JSON baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown relative to the baseline",
+    )
+    args = parser.parse_args(argv)
+
+    invoices = list(args.invoices)
+    if args.large and LARGE_INVOICES not in invoices:
+        invoices.append(LARGE_INVOICES)
+
+    results = run(invoices, args.rows, args.sample, args.repeat)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        for name, stage, baseline_time, current_time in regressions:
+            print(
+                "REGRESSION {name} {stage}: {baseline:.3f} ms -> {current:.3f} ms "
+                "({change:+.0%})".format(
+                    name=name,
+                    stage=stage,
+                    baseline=baseline_time * 1000,
+                    current=current_time * 1000,
+                    change=current_time / baseline_time - 1,
+                )
+            )
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,56 @@
 """Top-level package for Estonian E-Invoice."""
 
+import sys
+
 __author__ = """Thorgate"""
 __email__ = "code@thorgate.eu"
 __version__ = '1.0.1'
 
+__all__ = ["StreamingXMLGenerator", "XMLGenerator", "warm_up"]
+
+# The generators, the entities and the validation schemas are imported on
+# first use, so importing the package stays cheap for short-lived processes.
+_lazy_attributes = {
+    "StreamingXMLGenerator": "estonian_e_invoice.estonian_e_invoice",
+    "XMLGenerator": "estonian_e_invoice.estonian_e_invoice",
+}
+
+
+def warm_up() -> None:
+    """
+    Imports the entities and creates the validators of their schemas in the
+    current thread, so the first invoice is built as fast as the following ones.
+
+    Call it at the start of a worker, or before forking the worker processes.
+    """
+    from estonian_e_invoice.parser import ENTITY_CLASSES
+    from estonian_e_invoice.validation.registry import validator_registry
+
+    validator_registry.warm_up(cls.validation_schema for cls in ENTITY_CLASSES.values())
+
+
+def __getattr__(name: str):
+    if name not in _lazy_attributes:
+        raise AttributeError(
+            "module {module!r} has no attribute {name!r}".format(
+                module=__name__, name=name
+            )
+        )
+
+    from importlib import import_module
+
+    value = getattr(import_module(_lazy_attributes[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
+
 
-from estonian_e_invoice.estonian_e_invoice import XMLGenerator
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported before Python 3.7.
+    from estonian_e_invoice.estonian_e_invoice import (  # noqa: F401
+        StreamingXMLGenerator,
+        XMLGenerator,
+    )
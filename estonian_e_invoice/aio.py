@@ -0,0 +1,144 @@
+"""
+Asyncio interface of the XML generation.
+
+Serializing invoices is CPU bound, so it is done in batches in an executor to
+keep the event loop responsive. The invoices are pulled from the producer only
+when the consumer asks for the next chunk, so the producer can not run ahead
+of the writer by more than one batch.
+
+Requires Python 3.6 or newer.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, List, Optional
+
+from estonian_e_invoice.estonian_e_invoice import root_end_tag, root_start_tag
+from estonian_e_invoice.serialization import encode
+from estonian_e_invoice.totals import FooterAccumulator, get_invoice_total_sum
+
+if TYPE_CHECKING:
+    from estonian_e_invoice.cache import FragmentCache
+    from estonian_e_invoice.entities import Footer, Header, Invoice
+
+try:
+    get_running_loop = asyncio.get_running_loop
+except AttributeError:
+    # Python 3.6, where the event loop of a coroutine is the running one.
+    get_running_loop = asyncio.get_event_loop
+
+
+def serialize_invoices(
+    invoices: List["Invoice"],
+    encoding: str = "utf-8",
+    fragment_cache: Optional["FragmentCache"] = None,
+) -> tuple:
+    """
+    Validates the pending trees of the invoices and returns the serialized
+    invoices as one chunk and their total sums.
+    """
+    for invoice in invoices:
+        invoice.validate_tree()
+
+    chunk = b"".join(invoice.to_bytes(encoding, fragment_cache) for invoice in invoices)
+    return chunk, [get_invoice_total_sum(invoice) for invoice in invoices]
+
+
+class AsyncXMLGenerator:
+    """
+    Generate an XML file from an async iterable of invoices.
+
+        header: Header of the file.
+        footer: Footer of the file, computed from the invoices when not given.
+                A given footer is checked against the invoices.
+        invoices: Async iterable of the invoices.
+        executor: Executor used to serialize the invoices. Defaults to the
+                  default executor of the event loop.
+        batch_size: Number of invoices serialized in one executor call.
+        fragment_cache: Cache of the repeated parties of the invoices. Can not
+                        be used with a process pool executor.
+    """
+
+    encoding = "utf-8"
+
+    def __init__(
+        self,
+        header: "Header",
+        footer: Optional["Footer"],
+        invoices: AsyncIterable["Invoice"],
+        executor: Optional[Executor] = None,
+        batch_size: int = 100,
+        fragment_cache: Optional["FragmentCache"] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size has to be a positive number")
+
+        self.header = header
+        self.footer = footer
+        self.invoices = invoices
+        self.executor = executor
+        self.batch_size = batch_size
+        self.fragment_cache = fragment_cache
+
+    async def serialize(self, invoices: List["Invoice"]) -> tuple:
+        loop = get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            serialize_invoices,
+            invoices,
+            self.encoding,
+            self.fragment_cache,
+        )
+
+    async def generate(self) -> AsyncIterator[bytes]:
+        """
+        Yields the file in chunks of serialized bytes.
+        """
+        accumulator = FooterAccumulator()
+        self.header.validate_tree()
+
+        yield encode(root_start_tag(), self.encoding) + self.header.to_bytes(
+            self.encoding
+        )
+
+        batch = []
+        async for invoice in self.invoices:
+            batch.append(invoice)
+            if len(batch) < self.batch_size:
+                continue
+
+            chunk, total_sums = await self.serialize(batch)
+            batch = []
+            for total_sum in total_sums:
+                accumulator.add_total_sum(total_sum)
+            yield chunk
+
+        if batch:
+            chunk, total_sums = await self.serialize(batch)
+            for total_sum in total_sums:
+                accumulator.add_total_sum(total_sum)
+            yield chunk
+
+        footer = self.footer
+        if footer is None:
+            footer = accumulator.to_footer()
+        else:
+            footer.validate_tree()
+            accumulator.check(footer)
+
+        yield footer.to_bytes(self.encoding) + encode(root_end_tag(), self.encoding)
+
+    async def write(self, writer) -> None:
+        """
+        Writes the file into an async writer.
+
+        Supports `asyncio.StreamWriter` (waits for `drain` after every chunk) and
+        writers with a coroutine `write` method.
+        """
+        drain = getattr(writer, "drain", None)
+
+        async for chunk in self.generate():
+            if drain is not None:
+                writer.write(chunk)
+                await drain()
+            else:
+                await writer.write(chunk)
@@ -0,0 +1,211 @@
+"""
+Parallel rendering of large invoice files.
+
+The invoices are built, validated and serialized in worker processes. The
+rendered fragments are written in the order of the input records, together
+with the header and the footer, into a single E_Invoice document.
+"""
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+from estonian_e_invoice.estonian_e_invoice import root_end_tag, root_start_tag
+from estonian_e_invoice.serialization import encode
+from estonian_e_invoice.sinks import open_sink
+from estonian_e_invoice.totals import FooterAccumulator, get_invoice_total_sum
+from estonian_e_invoice.validation.exceptions import ValidationError
+
+if TYPE_CHECKING:
+    from estonian_e_invoice.entities import Footer, Header, Invoice
+
+RenderedRecord = namedtuple("RenderedRecord", ["index", "fragment", "total_sum"])
+RenderedRecord.__doc__ = """Serialized invoice of the record at index."""
+
+RecordError = namedtuple("RecordError", ["index", "errors"])
+RecordError.__doc__ = """Validation errors of the record at index."""
+
+BatchResult = namedtuple("BatchResult", ["footer", "errors"])
+BatchResult.__doc__ = """Written footer and the errors of the skipped records."""
+
+
+def iter_chunks(records: Iterable[Any], chunk_size: int) -> Iterator[tuple]:
+    """
+    Yields the records in lists of chunk_size, with the index of their first
+    record.
+    """
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def map_chunks(
+    function: Callable[[List[Any], int], list],
+    records: Iterable[Any],
+    max_workers: int,
+    chunk_size: int = 100,
+    prefetch: int = 2,
+) -> Iterator[Any]:
+    """
+    Calls `function(chunk, start)` for the chunks of the records in a process
+    pool and yields the items of the returned lists in the order of the chunks.
+
+    At most `max_workers * prefetch` chunks are submitted ahead of the one
+    being yielded.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        max_pending = max(1, max_workers * prefetch)
+        pending = deque()
+
+        for start, chunk in iter_chunks(records, chunk_size):
+            pending.append(executor.submit(function, chunk, start))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def render_records(
+    build_invoice: Callable[[Any], "Invoice"],
+    records: List[Any],
+    start: int,
+    encoding: str = "utf-8",
+) -> list:
+    """
+    Builds and serializes the invoices of the records.
+
+    Runs in the worker processes. Records failing validation are returned as
+    RecordError instead of raising, any other exception is propagated.
+    """
+    results = []
+    for index, record in enumerate(records, start):
+        try:
+            invoice = build_invoice(record)
+            invoice.validate_tree()
+        except ValidationError as e:
+            results.append(RecordError(index, e.args[0]))
+        else:
+            results.append(
+                RenderedRecord(
+                    index, invoice.to_bytes(encoding), get_invoice_total_sum(invoice)
+                )
+            )
+    return results
+
+
+class BatchRenderer:
+    """
+    Renders invoice records into an E_Invoice document using a process pool.
+
+        build_invoice: Picklable callable building an Invoice from a record,
+                       e.g. a module level function.
+        max_workers: Number of the worker processes, defaults to the CPU count.
+        chunk_size: Number of records sent to a worker at once.
+        prefetch: Number of chunks queued per worker. Bounds the memory used by
+                  the records and fragments waiting to be written.
+
+    The validation engine of the workers is inherited from the parent process
+    when processes are forked. Use the ESTONIAN_E_INVOICE_VALIDATION_ENGINE
+    environment variable to select it for other start methods.
+    """
+
+    encoding = "utf-8"
+
+    def __init__(
+        self,
+        build_invoice: Callable[[Any], "Invoice"],
+        max_workers: Optional[int] = None,
+        chunk_size: int = 100,
+        prefetch: int = 2,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size has to be a positive number")
+
+        self.build_invoice = build_invoice
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+
+    def iter_chunks(self, records: Iterable[Any]) -> Iterator[tuple]:
+        return iter_chunks(records, self.chunk_size)
+
+    def iter_results(self, records: Iterable[Any]) -> Iterator[tuple]:
+        """
+        Yields the rendered records and errors in the order of the records.
+        """
+        return map_chunks(
+            partial(render_records, self.build_invoice, encoding=self.encoding),
+            records,
+            max_workers=self.max_workers,
+            chunk_size=self.chunk_size,
+            prefetch=self.prefetch,
+        )
+
+    def write_to(
+        self,
+        sink: BinaryIO,
+        header: "Header",
+        records: Iterable[Any],
+        footer: Optional["Footer"] = None,
+    ) -> BatchResult:
+        accumulator = FooterAccumulator()
+        errors = []
+
+        # Trees built with deferred validation are validated before use.
+        header.validate_tree()
+        if footer is not None:
+            footer.validate_tree()
+
+        sink.write(encode(root_start_tag(), self.encoding))
+        sink.write(header.to_bytes(self.encoding))
+
+        for result in self.iter_results(records):
+            if isinstance(result, RecordError):
+                errors.append(result)
+            else:
+                accumulator.add_total_sum(result.total_sum)
+                sink.write(result.fragment)
+
+        if footer is None:
+            footer = accumulator.to_footer()
+        else:
+            accumulator.check(footer)
+
+        sink.write(footer.to_bytes(self.encoding))
+        sink.write(encode(root_end_tag(), self.encoding))
+        return BatchResult(footer, errors)
+
+    def write(
+        self,
+        sink: Union[str, BinaryIO],
+        header: "Header",
+        records: Iterable[Any],
+        footer: Optional["Footer"] = None,
+    ) -> BatchResult:
+        """
+        Renders the records into a binary file object or to the given path.
+
+        The footer is computed from the rendered invoices when not given.
+        Records failing validation are left out of the document and reported
+        in the errors of the result.
+        """
+        with open_sink(sink) as file:
+            return self.write_to(file, header, records, footer)
@@ -0,0 +1,359 @@
+"""
+Compact binary format of validated entities.
+
+Validated entities are passed between processes and hosts, e.g. from the
+stage validating the invoices to the one rendering them, without pickling
+their object graphs. Every entity is encoded as the list of its attribute and
+sub element values in the order of `attribute_fields` and `fields`, decimals
+as strings, and the sub entities nested the same way:
+
+    with open("invoices.bin", "wb") as file:
+        dump(invoices, file)
+
+    # Later, or on another host.
+    for invoice in load("invoices.bin"):
+        XMLGenerator(header, None, invoice).generate()
+
+The lists are packed with msgpack when it is installed, with the `msgpack`
+extra, and with JSON otherwise. A file starts with a header naming its codec,
+followed by a record of every entity prefixed with its length, so entities are
+appended with `append` and read one at a time with `load`.
+
+Trees built with deferred validation are validated before they are encoded.
+The entities are rebuilt without validating them again, only files written by
+this package from validated entities should be loaded.
+"""
+
+import json
+import os
+import struct
+from collections import namedtuple
+from decimal import Decimal
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, Union
+
+from estonian_e_invoice.dicts import (
+    ATTRIBUTE,
+    ENTITY,
+    ENTITY_LIST,
+    SCALAR,
+    get_field_builders,
+)
+from estonian_e_invoice.entities.common import CompactNode
+from estonian_e_invoice.parser import ENTITY_CLASSES
+
+MAGIC = b"EINV"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+# Length of a record, unsigned big-endian.
+RECORD_LENGTH = struct.Struct(">I")
+
+MSGPACK = "msgpack"
+JSON = "json"
+# Identifiers of the codecs in the header.
+CODEC_IDENTIFIERS = {MSGPACK: b"M", JSON: b"J"}
+
+Codec = namedtuple("Codec", ["name", "identifier", "dumps", "loads"])
+Codec.__doc__ = """Encoding of the records of a file."""
+
+_layouts = {}
+_decoders = {}
+
+# Amounts and rates repeat across the rows and the invoices, their decoded
+# values are shared.
+parse_decimal = lru_cache(maxsize=4096)(Decimal)
+
+
+def import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError(
+            "The msgpack codec requires msgpack, install estonian_e_invoice[msgpack]"
+        )
+    return msgpack
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Returns the codec of the name, msgpack if it is installed by default.
+    """
+    if name is None:
+        try:
+            import_msgpack()
+        except ImportError:
+            name = JSON
+        else:
+            name = MSGPACK
+
+    if name == MSGPACK:
+        msgpack = import_msgpack()
+        return Codec(
+            MSGPACK,
+            CODEC_IDENTIFIERS[MSGPACK],
+            msgpack.packb,
+            lambda data: msgpack.unpackb(data, use_list=False),
+        )
+    if name == JSON:
+        return Codec(
+            JSON,
+            CODEC_IDENTIFIERS[JSON],
+            lambda value: json.dumps(value, separators=(",", ":")).encode(),
+            # Python 3.5 loads only str.
+            lambda data: json.loads(data.decode("utf-8")),
+        )
+
+    raise ValueError("Unknown codec: {name}".format(name=name))
+
+
+def get_codec_by_identifier(identifier: bytes) -> Codec:
+    for name, codec_identifier in CODEC_IDENTIFIERS.items():
+        if identifier == codec_identifier:
+            return get_codec(name)
+    raise ValueError("Unknown codec: {identifier!r}".format(identifier=identifier))
+
+
+def get_layout(cls: type) -> tuple:
+    """
+    Returns the kinds of the values of an entity in the encoded order.
+    """
+    layout = _layouts.get(cls)
+    if layout is None:
+        builders = get_field_builders(cls)
+        layout = _layouts[cls] = tuple(
+            builders[name] for name in cls.attribute_fields + tuple(cls.fields)
+        )
+    return layout
+
+
+def encode_value(kind: str, target, value):
+    if value is None or kind is ATTRIBUTE:
+        return value
+    if kind is SCALAR:
+        return str(value) if target is Decimal else value
+    if kind is ENTITY:
+        return encode_node(value)
+    if kind is ENTITY_LIST:
+        return [encode_node(item) for item in value]
+
+    tags = list(target)
+    return [[tags.index(item.tag), encode_node(item)] for item in value]
+
+
+def encode_node(node: CompactNode) -> list:
+    attribute_values, element_values = node.to_values()
+    values = [
+        encode_value(kind, target, value)
+        for (kind, target), value in zip(
+            get_layout(type(node)), attribute_values + element_values
+        )
+    ]
+    # Absent trailing values are left out.
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+def compile_decoder(cls: type) -> Callable[[Sequence], CompactNode]:
+    """
+    Generates the function rebuilding an entity of the class from its encoded
+    values, with the conversion of every value written out.
+    """
+    layout = get_layout(cls)
+    namespace = {"parse_decimal": parse_decimal, "from_values": cls.from_values}
+    expressions = []
+
+    for index, (kind, target) in enumerate(layout):
+        value = "values[{index}]".format(index=index)
+        if kind is ATTRIBUTE or (kind is SCALAR and target is not Decimal):
+            expressions.append(value)
+            continue
+
+        if kind is SCALAR:
+            expression = "parse_decimal({value})"
+        elif kind is ENTITY:
+            namespace["decode_{index}".format(index=index)] = get_decoder(target)
+            expression = "decode_{index}({value})"
+        elif kind is ENTITY_LIST:
+            namespace["decode_{index}".format(index=index)] = get_decoder(target)
+            expression = "[decode_{index}(item) for item in {value}]"
+        else:
+            # The entities of several classes are preceded by the index of
+            # their class.
+            namespace["decoders_{index}".format(index=index)] = tuple(
+                get_decoder(entity_cls) for entity_cls in target.values()
+            )
+            expression = "[decoders_{index}[i](item) for i, item in {value}]"
+        expressions.append(
+            "None if {value} is None else {expression}".format(
+                value=value, expression=expression.format(index=index, value=value)
+            )
+        )
+
+    attributes_count = len(cls.attribute_fields)
+    lines = [
+        "def decode(values):",
+        "    if len(values) < {count}:".format(count=len(layout)),
+        "        values = list(values) + [None] * ({count} - len(values))".format(
+            count=len(layout)
+        ),
+        "    return from_values(",
+        "        ({values}),".format(
+            values="".join(
+                expression + ", " for expression in expressions[:attributes_count]
+            )
+        ),
+        "        ({values}),".format(
+            values="".join(
+                expression + ", " for expression in expressions[attributes_count:]
+            )
+        ),
+        "    )",
+    ]
+    exec("\n".join(lines), namespace)
+    return namespace["decode"]
+
+
+def get_decoder(cls: type) -> Callable[[Sequence], CompactNode]:
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        decoder = _decoders[cls] = compile_decoder(cls)
+    return decoder
+
+
+def encode_record(node: CompactNode, codec: Codec) -> bytes:
+    node.validate_tree()
+    payload = codec.dumps([node.tag, encode_node(node)])
+    return RECORD_LENGTH.pack(len(payload)) + payload
+
+
+def decode_record(payload: bytes, codec: Codec) -> CompactNode:
+    tag, values = codec.loads(payload)
+    try:
+        cls = ENTITY_CLASSES[tag]
+    except KeyError:
+        raise ValueError("Unknown entity: {tag}".format(tag=tag))
+    return get_decoder(cls)(values)
+
+
+def build_header(codec: Codec) -> bytes:
+    return MAGIC + bytes([FORMAT_VERSION]) + codec.identifier
+
+
+def read_header(file: BinaryIO) -> Codec:
+    header = file.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE or not header.startswith(MAGIC):
+        raise ValueError("Not an estonian_e_invoice binary file")
+    if header[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError(
+            "Unsupported format version: {version}".format(version=header[len(MAGIC)])
+        )
+    return get_codec_by_identifier(header[-1:])
+
+
+class BinaryWriter:
+    """
+    Writes entities into a binary file object, one record each.
+
+        file: Binary file object, positioned at the start of a new file or at
+              the end of a file written with the same codec.
+        codec: Name of the codec, msgpack if it is installed by default.
+        write_header: Whether the header is written, False when appending.
+    """
+
+    def __init__(
+        self, file: BinaryIO, codec: Optional[str] = None, write_header: bool = True
+    ) -> None:
+        self.file = file
+        self.codec = get_codec(codec)
+        if write_header:
+            file.write(build_header(self.codec))
+
+    def write(self, node: CompactNode) -> None:
+        self.file.write(encode_record(node, self.codec))
+
+    def write_all(self, nodes: Iterable[CompactNode]) -> int:
+        """
+        Writes the entities and returns their number.
+        """
+        count = 0
+        for node in nodes:
+            self.write(node)
+            count += 1
+        return count
+
+
+def dump(
+    nodes: Iterable[CompactNode], file: BinaryIO, codec: Optional[str] = None
+) -> int:
+    """
+    Writes a file of the entities, returns their number.
+    """
+    return BinaryWriter(file, codec).write_all(nodes)
+
+
+def append(nodes: Iterable[CompactNode], path: str, codec: Optional[str] = None) -> int:
+    """
+    Appends the entities to the file at the path, creating it if it does not
+    exist. Existing files are appended with their own codec, a different codec
+    raises ValueError.
+    """
+    with open(path, "ab+") as file:
+        if file.tell() == 0:
+            writer = BinaryWriter(file, codec)
+        else:
+            file.seek(0)
+            file_codec = read_header(file)
+            if codec is not None and codec != file_codec.name:
+                raise ValueError(
+                    "The file is encoded with {name}".format(name=file_codec.name)
+                )
+            file.seek(0, os.SEEK_END)
+            writer = BinaryWriter(file, file_codec.name, write_header=False)
+        return writer.write_all(nodes)
+
+
+def read_exactly(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated record")
+    return data
+
+
+def load(source: Union[str, BinaryIO]) -> Iterator[CompactNode]:
+    """
+    Yields the entities of a file, read from a path or a binary file object
+    one record at a time.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            yield from load(file)
+        return
+
+    codec = read_header(source)
+    while True:
+        prefix = source.read(RECORD_LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) != RECORD_LENGTH.size:
+            raise ValueError("Truncated record")
+        (length,) = RECORD_LENGTH.unpack(prefix)
+        yield decode_record(read_exactly(source, length), codec)
+
+
+def dumps(node: CompactNode, codec: Optional[str] = None) -> bytes:
+    """
+    Returns a file of a single entity.
+    """
+    codec = get_codec(codec)
+    return build_header(codec) + encode_record(node, codec)
+
+
+def loads(data: bytes) -> CompactNode:
+    """
+    Returns the entity of a file written by `dumps`.
+    """
+    (node,) = load(BytesIO(data))
+    return node
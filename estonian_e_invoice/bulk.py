@@ -0,0 +1,198 @@
+"""
+Bulk validation of invoice records.
+
+Screens many records before a generation run. Every record is built with
+deferred validation and its whole tree is validated at once, so each result
+lists all the errors of the record with their paths in the invoice:
+
+    validator = BulkValidator(build_invoice, max_workers=4)
+    for result in validator.iter_results(records):
+        if not result.is_valid:
+            print(result.index, result.errors)
+
+The results can be written as JSON lines with `BulkValidator.write_jsonl`.
+"""
+import json
+import os
+from collections import namedtuple
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Union,
+)
+
+from estonian_e_invoice.batch import map_chunks
+from estonian_e_invoice.sinks import open_sink
+from estonian_e_invoice.validation.deferred import deferred_validation, flatten_errors
+from estonian_e_invoice.validation.exceptions import ValidationError
+
+if TYPE_CHECKING:
+    from estonian_e_invoice.entities import Invoice
+
+FieldError = namedtuple("FieldError", ["path", "message"])
+FieldError.__doc__ = """Error message of the field at path."""
+
+BulkSummary = namedtuple("BulkSummary", ["valid", "invalid"])
+BulkSummary.__doc__ = """Numbers of the valid and invalid records."""
+
+
+class ValidationResult(namedtuple("ValidationResult", ["index", "entity", "errors"])):
+    """
+    Validated entity or the field errors of the record at index.
+
+    The entity is None for invalid records, and for valid records if the
+    entities were not kept.
+    """
+
+    __slots__ = ()
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "valid": self.is_valid,
+            "errors": [
+                {"path": error.path, "message": error.message} for error in self.errors
+            ],
+        }
+
+
+def to_field_errors(errors: dict) -> List[FieldError]:
+    return [
+        FieldError(path, message)
+        for path, messages in flatten_errors(errors).items()
+        for message in messages
+    ]
+
+
+def validate_record(
+    build_invoice: Callable[[Any], "Invoice"],
+    record: Any,
+    index: int,
+    keep_entity: bool = True,
+) -> ValidationResult:
+    """
+    Builds the invoice of the record and validates its tree.
+
+    Only ValidationError is reported in the result, any other exception raised
+    by build_invoice is propagated.
+    """
+    try:
+        with deferred_validation():
+            invoice = build_invoice(record)
+        invoice.validate_tree()
+    except ValidationError as e:
+        return ValidationResult(index, None, to_field_errors(e.errors))
+
+    return ValidationResult(index, invoice if keep_entity else None, [])
+
+
+def validate_records(
+    build_invoice: Callable[[Any], "Invoice"],
+    records: List[Any],
+    start: int,
+    keep_entities: bool = True,
+) -> List[ValidationResult]:
+    """
+    Validates a chunk of records, runs in the worker processes.
+    """
+    return [
+        validate_record(build_invoice, record, index, keep_entities)
+        for index, record in enumerate(records, start)
+    ]
+
+
+class BulkValidator:
+    """
+    Validates invoice records, in parallel if more than one worker is used.
+
+        build_invoice: Callable building an Invoice from a record. Has to be
+                       picklable, e.g. a module level function, when more than
+                       one worker is used.
+        max_workers: Number of the worker processes. Records are validated in
+                     the current process by default. None uses the CPU count.
+        chunk_size: Number of records sent to a worker at once.
+        prefetch: Number of chunks queued per worker.
+    """
+
+    def __init__(
+        self,
+        build_invoice: Callable[[Any], "Invoice"],
+        max_workers: Optional[int] = 1,
+        chunk_size: int = 1000,
+        prefetch: int = 2,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size has to be a positive number")
+
+        self.build_invoice = build_invoice
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+
+    def iter_results(
+        self, records: Iterable[Any], keep_entities: bool = True
+    ) -> Iterator[ValidationResult]:
+        """
+        Yields the validation results in the order of the records.
+
+        Entities of valid records are sent back from the worker processes only
+        if keep_entities is set, pass False when the records are only screened.
+        """
+        if self.max_workers == 1:
+            return (
+                validate_record(self.build_invoice, record, index, keep_entities)
+                for index, record in enumerate(records)
+            )
+
+        return map_chunks(
+            partial(validate_records, self.build_invoice, keep_entities=keep_entities),
+            records,
+            max_workers=self.max_workers,
+            chunk_size=self.chunk_size,
+            prefetch=self.prefetch,
+        )
+
+    def validate(self, records: Iterable[Any]) -> List[ValidationResult]:
+        return list(self.iter_results(records))
+
+    def write_jsonl_to(
+        self, sink: TextIO, records: Iterable[Any], only_invalid: bool = False
+    ) -> BulkSummary:
+        valid = invalid = 0
+
+        for result in self.iter_results(records, keep_entities=False):
+            if result.is_valid:
+                valid += 1
+                if only_invalid:
+                    continue
+            else:
+                invalid += 1
+            sink.write(json.dumps(result.to_dict()) + "\n")
+
+        return BulkSummary(valid, invalid)
+
+    def write_jsonl(
+        self,
+        sink: Union[str, TextIO],
+        records: Iterable[Any],
+        only_invalid: bool = False,
+    ) -> BulkSummary:
+        """
+        Writes one JSON object per record into a text file object or to the
+        given path, and returns the numbers of the valid and invalid records.
+
+        Only the invalid records are written if only_invalid is set.
+        """
+        with open_sink(sink, "w", encoding="utf-8") as file:
+            return self.write_jsonl_to(file, records, only_invalid)
@@ -0,0 +1,115 @@
+"""
+Cache of serialized XML fragments.
+
+Parties, their contacts, addresses and accounts are usually repeated in every
+invoice of a file. Frozen nodes of the classes marked `cacheable`, e.g. the
+interned ones, are serialized once and the cached text is spliced into the
+output of every following invoice sharing them.
+
+The cache is opt-in, pass a `FragmentCache` to the serializing methods or to
+the generators. Fragments are keyed by the frozen node instance, which can not
+change, so a lookup costs one dictionary access. Nodes which are not frozen
+may be modified and are serialized without looking them up.
+"""
+import threading
+from collections import OrderedDict
+
+from estonian_e_invoice.entities.common import Node, NodeSequence
+
+
+def content_key(value) -> tuple:
+    """
+    Returns a hashable key which is equal for values rendering the same XML.
+    """
+    if isinstance(value, Node):
+        return (
+            type(value),
+            tuple(value.iter_attributes()),
+            tuple(
+                (name, content_key(element)) for name, element in value.iter_elements()
+            ),
+        )
+    if isinstance(value, (list, NodeSequence)):
+        return (list, tuple(content_key(item) for item in value))
+
+    # Equal values of different types or exponents are rendered differently.
+    return (type(value), str(value))
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU cache of the XML text of frozen cacheable nodes.
+
+        max_size: Maximum number of cached fragments. The nodes of the cached
+                  fragments are kept alive by the cache.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 1:
+            raise ValueError("max_size has to be a positive number")
+
+        self.max_size = max_size
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_fragment(self, node: Node) -> str:
+        """
+        Returns the XML text of the node, serializing it on a cache miss.
+
+        Nodes which are not frozen are always serialized, they are neither
+        looked up nor counted.
+        """
+        parts = []
+        if not node.is_frozen:
+            node.write_xml(parts.append, self)
+            return "".join(parts)
+
+        with self._lock:
+            fragment = self._fragments.get(node)
+            if fragment is not None:
+                self._fragments.move_to_end(node)
+                self._hits += 1
+                return fragment
+            self._misses += 1
+
+        node.write_xml(parts.append, self)
+        fragment = "".join(parts)
+
+        with self._lock:
+            self._fragments[node] = fragment
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
+                self._evictions += 1
+
+        return fragment
+
+    def clear(self) -> None:
+        """
+        Drops the cached fragments and the counters.
+        """
+        with self._lock:
+            self._fragments.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the lookup counters, the number of cached fragments and the
+        ratio of the lookups served from the cache.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._fragments),
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._fragments)
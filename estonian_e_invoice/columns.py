@@ -0,0 +1,209 @@
+"""
+Columnar construction of invoice rows.
+
+Building and validating an ItemEntry, ItemDetailInfo and VAT per row dominates
+the construction of invoices with thousands of rows. `InvoiceItem.from_columns`
+takes the values of the rows as parallel columns instead, validates each
+column in one pass and builds the row entities only when they are accessed,
+e.g. while the invoice is serialized:
+
+    item = InvoiceItem.from_columns(
+        description=["Electricity", "Network fee"],
+        item_sum=[Decimal("10.0000"), Decimal("2.5000")],
+        vat_rate=[Decimal("20.00"), Decimal("20.00")],
+        vat_sum=[Decimal("2.0000"), Decimal("0.5000")],
+    )
+
+Columns can be any sequences of the row values, e.g. lists, tuples or NumPy
+arrays of objects. None and blank values are left out of their rows. A row
+gets an ItemDetailInfo or a VAT only if it has any of their values.
+
+Errors are keyed by the path of the column in the row, the messages of the
+invalid values by the index of their row:
+
+    {"Description": [{3: ["required field"]}], "VAT.VATSum": [{0: [...]}]}
+"""
+from typing import Iterator
+
+from estonian_e_invoice.entities import VAT, ItemDetailInfo, ItemEntry
+from estonian_e_invoice.entities.common import NodeSequence
+from estonian_e_invoice.validation.compiled import CompiledValidator
+from estonian_e_invoice.validation.exceptions import ValidationError
+
+# Entities of a row with the path prefix, the argument and the field name of
+# their columns.
+COLUMN_GROUPS = (
+    (
+        ItemEntry,
+        "",
+        (
+            ("description", "Description"),
+            ("item_sum", "ItemSum"),
+            ("item_total", "ItemTotal"),
+        ),
+    ),
+    (
+        ItemDetailInfo,
+        "ItemDetailInfo.",
+        (
+            ("item_unit", "ItemUnit"),
+            ("item_amount", "ItemAmount"),
+            ("item_price", "ItemPrice"),
+        ),
+    ),
+    (
+        VAT,
+        "VAT.",
+        (
+            ("vat_rate", "VATRate"),
+            ("vat_sum", "VATSum"),
+            ("sum_before_vat", "SumBeforeVAT"),
+            ("sum_after_vat", "SumAfterVAT"),
+            ("vat_currency", "Currency"),
+        ),
+    ),
+)
+
+COLUMN_NAMES = tuple(name for _, _, columns in COLUMN_GROUPS for name, _ in columns)
+
+_column_validators = {}
+
+
+def get_column_validator(cls: type) -> CompiledValidator:
+    # The check functions are stateless, the validators are shared by threads.
+    validator = _column_validators.get(cls)
+    if validator is None:
+        validator = _column_validators[cls] = CompiledValidator(cls.validation_schema)
+    return validator
+
+
+def build_node(cls: type, elements: dict):
+    """
+    Builds an entity from validated values without validating them again.
+    """
+    node = cls.__new__(cls)
+    node.elements = elements
+    return node
+
+
+class ItemEntryColumns(NodeSequence):
+    """
+    Invoice rows stored as columns of their values.
+
+        columns: Sequences of the row values by the argument names of
+                 `InvoiceItem.from_columns`. The description is required.
+
+    The columns are validated when the rows are created, also inside
+    `deferred_validation`, and raise a single ValidationError with the errors
+    of all the columns. Every access builds new row entities, which are not
+    kept.
+    """
+
+    __slots__ = ("columns", "length")
+
+    def __init__(self, columns: dict) -> None:
+        unknown = set(columns) - set(COLUMN_NAMES)
+        if unknown:
+            raise TypeError(
+                "Unknown columns: {names}".format(names=", ".join(sorted(unknown)))
+            )
+        if columns.get("description") is None:
+            raise TypeError("The description column is required")
+
+        self.length = len(columns["description"])
+        self.columns = self.validate(
+            {name: column for name, column in columns.items() if column is not None}
+        )
+
+    def validate(self, columns: dict) -> dict:
+        """
+        Returns the validated columns, as lists of the row values.
+        """
+        validated = {}
+        errors = {}
+
+        for cls, prefix, group in COLUMN_GROUPS:
+            validator = get_column_validator(cls)
+            present = [None] * self.length
+
+            for name, field in group:
+                column = columns.get(name)
+                if column is None:
+                    continue
+                if len(column) != self.length:
+                    errors[prefix + field] = [
+                        "must have {length} values".format(length=self.length)
+                    ]
+                    continue
+
+                validated[name], column_errors = validator.validate_column(
+                    field, column
+                )
+                if column_errors:
+                    errors[prefix + field] = [column_errors]
+
+                for index, value in enumerate(validated[name]):
+                    if value is not None:
+                        present[index] = True
+
+            # Every row has an ItemEntry, the other entities are left out of
+            # the rows without any of their values.
+            for name, field in group:
+                if not validator.schema[field].get("required"):
+                    continue
+
+                column = validated.get(name)
+                if column is None and name in columns:
+                    # The column has a wrong length.
+                    continue
+
+                for index in range(self.length):
+                    if column is not None and column[index] is not None:
+                        continue
+                    if cls is ItemEntry or present[index]:
+                        row_errors = errors.setdefault(prefix + field, [{}])[0]
+                        row_errors[index] = ["required field"]
+
+        if errors:
+            for messages in errors.values():
+                if isinstance(messages[0], dict):
+                    messages[0] = dict(sorted(messages[0].items()))
+            raise ValidationError(errors)
+
+        return validated
+
+    def get_values(self, group: tuple, index: int) -> dict:
+        return {
+            field: self.columns[name][index]
+            for name, field in group
+            if name in self.columns and self.columns[name][index] is not None
+        }
+
+    def build_row(self, index: int) -> ItemEntry:
+        (_, _, entry_group), (_, _, detail_group), (_, _, vat_group) = COLUMN_GROUPS
+
+        elements = self.get_values(entry_group, index)
+        item_detail_info = self.get_values(detail_group, index)
+        if item_detail_info:
+            elements["ItemDetailInfo"] = build_node(ItemDetailInfo, item_detail_info)
+        vat = self.get_values(vat_group, index)
+        if vat:
+            elements["VAT"] = build_node(VAT, vat)
+
+        return build_node(ItemEntry, elements)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.build_row(i) for i in range(*index.indices(self.length))]
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("row index out of range")
+        return self.build_row(index)
+
+    def __iter__(self) -> Iterator[ItemEntry]:
+        return (self.build_row(index) for index in range(self.length))
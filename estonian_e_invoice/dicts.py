@@ -0,0 +1,244 @@
+"""
+Building entities from mappings and exporting them into mappings.
+
+The mappings are keyed by the element and attribute names of the entities,
+the same names their `elements` and `attributes` use, and nest the mappings
+of the sub entities:
+
+    invoice = Invoice.from_dict(
+        {
+            "invoiceId": "1",
+            "InvoiceSumGroup": {"TotalSum": "24.00", "Currency": "EUR"},
+            "InvoiceItem": {
+                "InvoiceItemGroup": [{"Description": "Electricity"}],
+            },
+            "InvoiceParties": {
+                "SellerParty": {"Name": "Seller", "RegNumber": "222222222"},
+                "BuyerParty": {"Name": "Buyer"},
+            },
+            ...
+        }
+    )
+    invoice.to_dict() == {...}
+
+Lists of entities of a single class are lists of their mappings, lists of
+entities of several classes, like InvoiceParties, mappings by their tags.
+Decimals and integers may be given as strings, e.g. from JSON, and are parsed
+like the text of XML elements. A single ValidationError is raised with the
+errors of the whole tree keyed by their path, like the ones of `validate_tree`.
+
+`read_jsonl` yields the invoices of a file with one mapping per line.
+"""
+import json
+from decimal import Decimal
+from typing import BinaryIO, Iterator, Mapping, Union
+
+from estonian_e_invoice import instrumentation
+from estonian_e_invoice.entities import Invoice
+from estonian_e_invoice.entities.common import Node, NodeSequence
+from estonian_e_invoice.instrumentation import VALIDATE
+from estonian_e_invoice.parser import (
+    ENTITY,
+    ENTITY_LIST,
+    get_field_parsers,
+    parse_scalar,
+)
+from estonian_e_invoice.validation.compiled import TYPES_MAPPING
+from estonian_e_invoice.validation.deferred import flatten_errors, join_path
+from estonian_e_invoice.validation.exceptions import ValidationError
+from estonian_e_invoice.validation.registry import validator_registry
+
+# Kinds of the values of the mapping keys, besides the entities and the lists
+# of entities.
+ATTRIBUTE = "attribute"
+SCALAR = "scalar"
+TAGGED_ENTITY_LIST = "tagged_entity_list"
+
+_field_builders = {}
+
+
+def get_entity_classes(rules: dict) -> tuple:
+    included, _ = TYPES_MAPPING[rules["type"]]
+    return included
+
+
+def get_field_builders(cls: type) -> dict:
+    """
+    Returns the kinds of the values of the mapping keys of the class, with the
+    scalar parser, the entity class or the entity classes by their tags.
+    """
+    builders = _field_builders.get(cls)
+    if builders is None:
+        builders = {name: (ATTRIBUTE, None) for name in cls.attribute_fields}
+        schema = cls.validation_schema
+        for field, parser in get_field_parsers(cls).items():
+            if field not in cls.fields:
+                continue
+
+            if parser is ENTITY:
+                (entity_cls,) = get_entity_classes(schema[field])
+                builders[field] = (ENTITY, entity_cls)
+            elif parser is ENTITY_LIST:
+                classes = get_entity_classes(schema[field]["schema"])
+                if len(classes) == 1:
+                    builders[field] = (ENTITY_LIST, classes[0])
+                else:
+                    builders[field] = (
+                        TAGGED_ENTITY_LIST,
+                        {entity_cls.tag: entity_cls for entity_cls in classes},
+                    )
+            else:
+                builders[field] = (SCALAR, parser)
+        _field_builders[cls] = builders
+
+    return builders
+
+
+def build_value(kind: str, target, value, path: str, errors: dict):
+    # Values of other types are left for the validation to report.
+    if kind is SCALAR:
+        if isinstance(value, str):
+            return parse_scalar(target, value)
+        if target is Decimal and type(value) is int:
+            return Decimal(value)
+    elif kind is ENTITY:
+        if isinstance(value, Mapping):
+            return build_node(target, value, path, errors)
+    elif kind is ENTITY_LIST:
+        if isinstance(value, list):
+            return [
+                (
+                    build_node(target, item, join_path(path, index), errors)
+                    if isinstance(item, Mapping)
+                    else item
+                )
+                for index, item in enumerate(value)
+            ]
+    elif kind is TAGGED_ENTITY_LIST:
+        if isinstance(value, Mapping):
+            for tag in value:
+                if tag not in target:
+                    errors[join_path(path, tag)] = ["unknown field"]
+            # The entities are listed in the order of their classes.
+            tags = [tag for tag in target if tag in value]
+            return [
+                build_node(target[tag], value[tag], join_path(path, index), errors)
+                for index, tag in enumerate(tags)
+            ]
+    return value
+
+
+def build_node(cls: type, data: Mapping, path: str, errors: dict) -> Node:
+    """
+    Builds the entity of the mapping with its sub entities and validates them.
+
+    The errors are added to errors keyed by their path, the entities are
+    built from their unvalidated values if they are invalid.
+    """
+    builders = get_field_builders(cls)
+    attributes = {}
+    elements = {}
+
+    for key, value in data.items():
+        kind_target = builders.get(key)
+        if kind_target is None:
+            errors[join_path(path, key)] = ["unknown field"]
+        elif value in (None, ""):
+            continue
+        elif kind_target[0] is ATTRIBUTE:
+            attributes[key] = value
+        else:
+            elements[key] = build_value(
+                kind_target[0], kind_target[1], value, join_path(path, key), errors
+            )
+
+    node = cls.__new__(cls)
+    if cls.to_document is Node.to_document:
+        document = attributes
+        document.update(elements)
+    else:
+        node.attributes = attributes
+        node.elements = elements
+        document = {
+            k: v for k, v in node.to_document().items() if v not in (None, "")
+        }
+
+    validator = validator_registry.get(cls.validation_schema)
+    with instrumentation.measure(VALIDATE, cls.__name__):
+        is_valid = validator.validate(document)
+    if is_valid:
+        document = validator.document
+    else:
+        flatten_errors(validator.errors, path, errors)
+
+    node.load(document)
+    return node
+
+
+def from_dict(cls: type, data: Mapping) -> Node:
+    """
+    Builds the entity of the mapping and its sub entities.
+
+    Raises ValidationError with the errors of the whole tree keyed by their
+    paths in the entity, unknown keys included.
+    """
+    errors = {}
+    node = build_node(cls, data, "", errors)
+    if errors:
+        raise ValidationError(errors)
+    return node
+
+
+def to_dict(node: Node) -> dict:
+    """
+    Returns the mapping the entity can be built from.
+    """
+    builders = get_field_builders(type(node))
+    data = dict(node.attributes)
+    for key, value in node.elements.items():
+        if isinstance(value, Node):
+            value = to_dict(value)
+        elif builders[key][0] is TAGGED_ENTITY_LIST:
+            value = {item.tag: to_dict(item) for item in value}
+        elif isinstance(value, (list, NodeSequence)):
+            value = [
+                to_dict(item) if isinstance(item, Node) else item for item in value
+            ]
+        data[key] = value
+    return data
+
+
+def read_jsonl(source: Union[str, BinaryIO]) -> Iterator[Invoice]:
+    """
+    Yields the invoices of a JSON Lines file, one invoice mapping per line.
+
+        source: Path or binary file object of the file.
+
+    The lines are decoded as UTF-8 and blank ones are skipped. Numbers with a
+    fraction are read as Decimal. The errors of an invalid line are raised
+    keyed by its line number.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            yield from read_jsonl(file)
+        return
+
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+
+        try:
+            # Python 3.5 loads only str.
+            data = json.loads(line.decode("utf-8"), parse_float=Decimal)
+        except ValueError as error:
+            raise ValidationError(
+                {line_number: ["invalid JSON: {error}".format(error=error)]}
+            )
+        if not isinstance(data, dict):
+            raise ValidationError({line_number: ["must be of dict type"]})
+
+        try:
+            invoice = from_dict(Invoice, data)
+        except ValidationError as error:
+            raise ValidationError({line_number: [error.errors]})
+        yield invoice
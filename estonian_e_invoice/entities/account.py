@@ -1,14 +1,14 @@
 from decimal import Decimal
 from typing import Optional
 
-from estonian_e_invoice.entities.common import Node
+from estonian_e_invoice.entities.common import CompactNode
 from estonian_e_invoice.validation.validation_schemas import (
     ACCOUNT_INFO_SCHEMA,
     PAYMENT_INFO_SCHEMA,
 )
 
 
-class AccountInfo(Node):
+class AccountInfo(CompactNode):
     """
     Describes the accounts of a party.
 
@@ -18,8 +18,12 @@ class AccountInfo(Node):
         bank_name: The name of the bank.
     """
 
+    __slots__ = ()
+
     tag = "AccountInfo"
     validation_schema = ACCOUNT_INFO_SCHEMA
+    cacheable = True
+    fields = ("AccountNumber", "IBAN", "BIC", "BankName")
 
     def __init__(
         self,
@@ -38,7 +42,7 @@ class AccountInfo(Node):
         )
 
 
-class PaymentInfo(Node):
+class PaymentInfo(CompactNode):
     """
     Describes the information used for generating payment order form from the invoice.
 
@@ -53,8 +57,21 @@ class PaymentInfo(Node):
         pay_due_date: Payment due date.
     """
 
+    __slots__ = ()
+
     tag = "PaymentInfo"
     validation_schema = PAYMENT_INFO_SCHEMA
+    fields = (
+        "Currency",
+        "PaymentDescription",
+        "Payable",
+        "PaymentTotalSum",
+        "PayerName",
+        "PaymentId",
+        "PayToAccount",
+        "PayToName",
+        "PayDueDate",
+    )
 
     def __init__(
         self,
@@ -1,5 +1,53 @@
+from collections.abc import Sequence
+from decimal import Decimal
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+from weakref import WeakSet
 from xml.etree.ElementTree import Element, SubElement
 
+from estonian_e_invoice import instrumentation
+from estonian_e_invoice.instrumentation import TO_ETREE, VALIDATE
+from estonian_e_invoice.serialization import encode, escape_attribute, escape_text
+from estonian_e_invoice.validation.deferred import (
+    flatten_errors,
+    has_pending_nodes,
+    is_pending,
+    is_validation_deferred,
+    join_path,
+    mark_pending,
+    mark_validated,
+)
+from estonian_e_invoice.validation.exceptions import ValidationError
+from estonian_e_invoice.validation.registry import validator_registry
+
+if TYPE_CHECKING:
+    from estonian_e_invoice.cache import FragmentCache
+
+# Types of the values rendered as element text, checked before the nodes and
+# the sequences of nodes, as NodeSequence is an abstract base class with a
+# slow isinstance check.
+SCALAR_TYPES = (str, Decimal, int)
+
+
+class NodeSequence(Sequence):
+    """
+    Read-only sequence of nodes built when they are accessed.
+
+    Sub elements holding a NodeSequence are rendered like lists of nodes. The
+    nodes are built from validated values, so `validate_tree` does not visit
+    them.
+    """
+
+    __slots__ = ()
+
 
 class Node:
     """
@@ -29,6 +77,8 @@ class Node:
         </Node>
     """
 
+    __slots__ = ()
+
     # XML element's name.
     tag = "Node"
     # Dictionary of sub XML elements.
@@ -39,51 +89,431 @@ class Node:
     element_attrs = {}
     # Cerberus validation schema to be used while validating the element.
     validation_schema = None
+    # Whether the serialized element may be reused by a `FragmentCache`.
+    cacheable = False
+    # Whether the node can not be modified any more, see `CompactNode.freeze`.
+    is_frozen = False
+
+    def __setstate__(self, state) -> None:
+        # Objects with slots are pickled with their slot values separately.
+        if isinstance(state, tuple):
+            state, slot_state = state
+        else:
+            slot_state = None
+        for values in (state, slot_state):
+            for name, value in (values or {}).items():
+                setattr(self, name, value)
+
+        # Unpickled pending nodes are pending in this process as well.
+        if is_pending(self):
+            mark_pending(self)
 
     def validate(self, data: dict) -> dict:
+        collector = instrumentation.active_collector
+        if collector is not None:
+            with collector.measure(VALIDATE, type(self).__name__):
+                return self.run_validation(data)
+        return self.run_validation(data)
+
+    def run_validation(self, data: dict) -> dict:
         # Run validations if there is a validation schema
         if not self.validation_schema:
             raise ValueError("validation_schema has to be defined to run validation")
 
-        from estonian_e_invoice.validation.exceptions import ValidationError
-        from estonian_e_invoice.validation.validators import CustomValidator
-
-        validator = CustomValidator(self.validation_schema)
         # Exclude null and blank values.
-        is_valid = validator.validate(
-            {k: v for k, v in data.items() if v not in (None, "")}
-        )
+        document = {k: v for k, v in data.items() if v not in (None, "")}
+
+        if is_validation_deferred():
+            mark_pending(self)
+            return document
+
+        validator = validator_registry.get(self.validation_schema)
+        is_valid = validator.validate(document)
 
         if is_valid:
             return validator.document
         else:
             raise ValidationError(validator.errors)
 
+    def load(self, document: dict) -> None:
+        """
+        Sets the values of the element from a (validated) document.
+        """
+        self.elements = document
+
+    def to_document(self) -> dict:
+        """
+        Returns the document the element can be validated and loaded from.
+        """
+        document = dict(self.attributes)
+        document.update(self.elements)
+        return document
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Node":
+        """
+        Builds the element and its sub elements from a mapping keyed by their
+        names, see `estonian_e_invoice.dicts`.
+        """
+        from estonian_e_invoice.dicts import from_dict
+
+        return from_dict(cls, data)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the values of the element and its sub elements as nested
+        mappings keyed by their names.
+        """
+        from estonian_e_invoice.dicts import to_dict
+
+        return to_dict(self)
+
+    def validate_tree(self) -> None:
+        """
+        Validates the nodes of the tree built in `deferred_validation`.
+
+        Raises ValidationError with the errors of all the nodes keyed by their
+        path in the tree.
+        """
+        if not has_pending_nodes():
+            return
+
+        errors = {}
+        self.validate_subtree("", errors)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_subtree(self, path: str, errors: dict) -> None:
+        if is_pending(self):
+            document = {
+                k: v for k, v in self.to_document().items() if v not in (None, "")
+            }
+            validator = validator_registry.get(self.validation_schema)
+            with instrumentation.measure(VALIDATE, type(self).__name__):
+                is_valid = validator.validate(document)
+            if is_valid:
+                self.load(validator.document)
+                mark_validated(self)
+            else:
+                flatten_errors(validator.errors, path, errors)
+
+        for key, value in self.iter_elements():
+            if isinstance(value, Node):
+                value.validate_subtree(join_path(path, key), errors)
+            elif isinstance(value, list):
+                for index, node in enumerate(value):
+                    if isinstance(node, Node):
+                        node.validate_subtree(
+                            join_path(join_path(path, key), index), errors
+                        )
+
+    def iter_elements(self) -> Iterable[Tuple[str, object]]:
+        """
+        Yields the names and values of the sub elements in rendering order.
+        """
+        return iter(self.elements.items())
+
+    def iter_attributes(self) -> Iterable[Tuple[str, object]]:
+        """
+        Yields the names and values of the attributes in rendering order.
+        """
+        return iter(self.attributes.items())
+
+    def iter_rendered_elements(self) -> Iterable[Tuple[str, object]]:
+        """
+        Yields the names and values of the sub elements for the serializers,
+        which skip the empty ones, absent values may be yielded as None.
+        """
+        return self.iter_elements()
+
     @classmethod
     def set_attrs(cls, element: Element, attributes: dict) -> None:
         for key, value in attributes.items():
             element.set(key, str(value))
 
+    @classmethod
+    def write_attrs(cls, write: Callable[[str], None], attributes: dict) -> None:
+        for key, value in attributes.items():
+            write(" " + key + '="' + escape_attribute(str(value)) + '"')
+
     def to_etree(self) -> Element:
+        collector = instrumentation.active_collector
+        if collector is not None:
+            with collector.measure(TO_ETREE, type(self).__name__):
+                return self.build_etree()
+        return self.build_etree()
+
+    def build_etree(self) -> Element:
         parent = Element(self.tag)
-        self.set_attrs(parent, self.attributes)
+        for key, value in self.iter_attributes():
+            parent.set(key, str(value))
 
-        for key, value in self.elements.items():
+        for key, value in self.iter_rendered_elements():
             if not value:
                 continue
 
-            if isinstance(value, Node):
+            if isinstance(value, SCALAR_TYPES) or not isinstance(
+                value, (Node, list, NodeSequence)
+            ):
+                child = SubElement(parent, key)
+                element_attrs = self.element_attrs.get(key)
+                if element_attrs:
+                    self.set_attrs(child, element_attrs)
+                child.text = str(value)
+            elif isinstance(value, Node):
                 parent.append(value.to_etree())
-            elif isinstance(value, list):
-                if all(isinstance(node, Node) for node in value):
-                    child = SubElement(parent, key)
+            elif isinstance(value, NodeSequence) or all(
+                isinstance(node, Node) for node in value
+            ):
+                child = SubElement(parent, key)
+                for node in value:
+                    child.append(node.to_etree())
+            else:
+                raise ValueError("Provided value are not instances of Node class")
+
+        return parent
+
+    def write_xml(
+        self,
+        write: Callable[[str], None],
+        fragment_cache: Optional["FragmentCache"] = None,
+    ) -> None:
+        """
+        Writes the XML text of the element without building an ElementTree.
+
+        Follows the same rules as `to_etree` and produces the same text as
+        serializing its result with `ElementTree.tostring`. Cacheable sub
+        elements are taken from the fragment cache if one is given.
+        """
+        write("<" + self.tag)
+        for key, value in self.iter_attributes():
+            write(" " + key + '="' + escape_attribute(str(value)) + '"')
+
+        children = [
+            (key, value) for key, value in self.iter_rendered_elements() if value
+        ]
+        if not children:
+            write(" />")
+            return
+
+        write(">")
+        for key, value in children:
+            if isinstance(value, SCALAR_TYPES) or not isinstance(
+                value, (Node, list, NodeSequence)
+            ):
+                write("<" + key)
+                element_attrs = self.element_attrs.get(key)
+                if element_attrs:
+                    self.write_attrs(write, element_attrs)
+
+                text = str(value)
+                if text:
+                    write(">" + escape_text(text) + "</" + key + ">")
+                else:
+                    write(" />")
+            elif isinstance(value, Node):
+                if (
+                    fragment_cache is not None
+                    and value.cacheable
+                    and value.is_frozen
+                ):
+                    write(fragment_cache.get_fragment(value))
+                else:
+                    value.write_xml(write, fragment_cache)
+            elif isinstance(value, NodeSequence) or all(
+                isinstance(node, Node) for node in value
+            ):
+                write("<" + key + ">")
+                if fragment_cache is None:
                     for node in value:
-                        child.append(node.to_etree())
+                        node.write_xml(write)
                 else:
-                    raise ValueError("Provided value are not instances of Node class")
+                    for node in value:
+                        node.write_child(write, fragment_cache)
+                write("</" + key + ">")
             else:
-                child = SubElement(parent, key)
-                self.set_attrs(child, self.element_attrs.get(key, {}))
-                child.text = str(value)
+                raise ValueError("Provided value are not instances of Node class")
+        write("</" + self.tag + ">")
 
-        return parent
+    def write_child(
+        self,
+        write: Callable[[str], None],
+        fragment_cache: Optional["FragmentCache"] = None,
+    ) -> None:
+        if fragment_cache is not None and self.cacheable and self.is_frozen:
+            write(fragment_cache.get_fragment(self))
+        else:
+            self.write_xml(write, fragment_cache)
+
+    def to_bytes(
+        self, encoding: str = "utf-8", fragment_cache: Optional["FragmentCache"] = None
+    ) -> bytes:
+        """
+        Returns the encoded XML of the element without an XML declaration.
+
+        For UTF-8 and US-ASCII these are the same bytes as
+        `ElementTree.tostring(self.to_etree(), encoding)`. ElementTree starts
+        the output of other encodings with an XML declaration, which is left
+        out here, as the element is usually a part of a larger document.
+        """
+        parts = []
+        self.write_xml(parts.append, fragment_cache)
+        return encode("".join(parts), encoding)
+
+    def write_to(
+        self,
+        sink: BinaryIO,
+        encoding: str = "utf-8",
+        fragment_cache: Optional["FragmentCache"] = None,
+    ) -> None:
+        sink.write(self.to_bytes(encoding, fragment_cache))
+
+
+# Compact nodes which can not be modified any more, see `CompactNode.freeze`.
+_frozen_nodes = WeakSet()
+
+
+class CompactNode(Node):
+    """
+    Node storing its values in tuples instead of per instance dictionaries.
+
+    The names of the sub elements and the attributes are declared once per
+    class in `fields` and `attribute_fields`, in rendering order. Absent values
+    are stored as None. `elements` and `attributes` return read-only mappings
+    of the present values, and are replaced as a whole by assigning a
+    dictionary to them.
+
+    Subclasses have to declare `__slots__ = ()` to stay compact.
+
+    Frozen nodes raise AttributeError when their values are replaced.
+
+    Example:
+        tag = "Node"
+        fields = ("Child",)
+        attribute_fields = ("id",)
+    """
+
+    __slots__ = ("_element_values", "_attribute_values", "_pending", "__weakref__")
+
+    # Names of the sub XML elements.
+    fields = ()
+    # Names of the element's attributes.
+    attribute_fields = ()
+
+    @staticmethod
+    def _pack(names: tuple, values: Mapping) -> tuple:
+        unknown = set(values) - set(names)
+        if unknown:
+            raise ValueError("Unknown fields: {fields}".format(fields=sorted(unknown)))
+        return tuple(values.get(name) for name in names)
+
+    @staticmethod
+    def _unpack(names: tuple, values: tuple) -> Mapping:
+        return MappingProxyType(
+            {name: value for name, value in zip(names, values) if value is not None}
+        )
+
+    def load(self, document: dict) -> None:
+        self.attributes = {name: document.get(name) for name in self.attribute_fields}
+        self.elements = {name: document.get(name) for name in self.fields}
+
+    @classmethod
+    def from_values(
+        cls, attribute_values: tuple, element_values: tuple
+    ) -> "CompactNode":
+        """
+        Builds a node from the values of its attributes and sub elements in the
+        order of `attribute_fields` and `fields`, without validating them.
+        """
+        node = cls.__new__(cls)
+        node._attribute_values = attribute_values
+        node._element_values = element_values
+        return node
+
+    def to_values(self) -> Tuple[tuple, tuple]:
+        """
+        Returns the values of the attributes and the sub elements in the order
+        of `attribute_fields` and `fields`, None for the absent ones.
+        """
+        attribute_values = getattr(self, "_attribute_values", ())
+        element_values = getattr(self, "_element_values", ())
+        return (
+            attribute_values
+            + (None,) * (len(self.attribute_fields) - len(attribute_values)),
+            element_values + (None,) * (len(self.fields) - len(element_values)),
+        )
+
+    @classmethod
+    def interned(cls, *args, **kwargs) -> "CompactNode":
+        """
+        Returns the shared frozen instance built from the arguments, see
+        `estonian_e_invoice.interning`.
+        """
+        # The interning module depends on the entities.
+        from estonian_e_invoice.interning import intern_registry
+
+        return intern_registry.get(cls, *args, **kwargs)
+
+    def _check_not_frozen(self) -> None:
+        if self in _frozen_nodes:
+            raise AttributeError("{tag} is frozen".format(tag=self.tag))
+
+    def freeze(self) -> None:
+        """
+        Makes the node and its sub elements immutable.
+        """
+        values = [value for _, value in self.iter_elements()]
+        if any(isinstance(value, list) for value in values):
+            raise ValueError("Nodes with lists of elements can not be frozen")
+
+        for value in values:
+            if isinstance(value, CompactNode):
+                value.freeze()
+        _frozen_nodes.add(self)
+
+    @property
+    def is_frozen(self) -> bool:
+        return self in _frozen_nodes
+
+    @property
+    def elements(self) -> Mapping:
+        return self._unpack(self.fields, getattr(self, "_element_values", ()))
+
+    @elements.setter
+    def elements(self, elements: Mapping) -> None:
+        self._check_not_frozen()
+        self._element_values = self._pack(self.fields, elements)
+
+    @property
+    def attributes(self) -> Mapping:
+        return self._unpack(
+            self.attribute_fields, getattr(self, "_attribute_values", ())
+        )
+
+    @attributes.setter
+    def attributes(self, attributes: Mapping) -> None:
+        self._check_not_frozen()
+        self._attribute_values = self._pack(self.attribute_fields, attributes)
+
+    def iter_elements(self) -> Iterable[Tuple[str, object]]:
+        return (
+            (name, value)
+            for name, value in zip(self.fields, getattr(self, "_element_values", ()))
+            if value is not None
+        )
+
+    # The serializers read the values directly, `elements` and `attributes`
+    # build new mappings on every access.
+    def iter_rendered_elements(self) -> Iterable[Tuple[str, object]]:
+        return zip(self.fields, getattr(self, "_element_values", ()))
+
+    def iter_attributes(self) -> Iterable[Tuple[str, object]]:
+        if not self.attribute_fields:
+            return ()
+        return [
+            (name, value)
+            for name, value in zip(
+                self.attribute_fields, getattr(self, "_attribute_values", ())
+            )
+            if value is not None
+        ]
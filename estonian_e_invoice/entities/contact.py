@@ -1,13 +1,13 @@
 from typing import Optional
 
-from estonian_e_invoice.entities.common import Node
+from estonian_e_invoice.entities.common import CompactNode
 from estonian_e_invoice.validation.validation_schemas import (
     ADDRESS_RECORD_SCHEMA,
     CONTACT_DATA_SCHEMA,
 )
 
 
-class LegalAddress(Node):
+class LegalAddress(CompactNode):
     """
     Describes the legal address of the invoice parties.
 
@@ -18,8 +18,12 @@ class LegalAddress(Node):
         country: Country
     """
 
+    __slots__ = ()
+
     tag = "LegalAddress"
     validation_schema = ADDRESS_RECORD_SCHEMA
+    cacheable = True
+    fields = ("PostalAddress1", "City", "PostalAddress2", "PostalCode", "Country")
 
     def __init__(
         self,
@@ -40,7 +44,7 @@ class LegalAddress(Node):
         )
 
 
-class ContactData(Node):
+class ContactData(CompactNode):
     """
     Describes the contacts of the invoice parties.
 
@@ -53,8 +57,20 @@ class ContactData(Node):
         legal_address: Describes the legal address of the party.
     """
 
+    __slots__ = ()
+
     tag = "ContactData"
     validation_schema = CONTACT_DATA_SCHEMA
+    cacheable = True
+    fields = (
+        "ContactName",
+        "ContactPersonCode",
+        "PhoneNumber",
+        "FaxNumber",
+        "URL",
+        "EmailAddress",
+        "LegalAddress",
+    )
 
     def __init__(
         self,
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from estonian_e_invoice.entities.common import Node
+from estonian_e_invoice.entities.common import CompactNode
 from estonian_e_invoice.validation.validation_schemas import (
     FOOTER_SCHEMA,
     HEADER_SCHEMA,
@@ -13,7 +13,7 @@ https://wp.itl.ee/files/Estonian_e-invoice_description_ver1.2_eng.pdf
 E_INVOICE_VERSION = "1.2"
 
 
-class Header(Node):
+class Header(CompactNode):
     """
     Contains file specific elements.
 
@@ -21,8 +21,11 @@ class Header(Node):
         file_id: Unique identification of the file. Used to prevent double-processing of the same file.
     """
 
+    __slots__ = ()
+
     tag = "Header"
     validation_schema = HEADER_SCHEMA
+    fields = ("Date", "FileId", "Version")
 
     def __init__(self, date: str, file_id: str,) -> None:
         self.elements = self.validate(
@@ -30,7 +33,7 @@ class Header(Node):
         )
 
 
-class Footer(Node):
+class Footer(CompactNode):
     """
     Contains the total number of the invoices and the sum of all the invoices in the file.
 
@@ -38,8 +41,11 @@ class Footer(Node):
         total_amount: Sum of all the invoices in the file.
     """
 
+    __slots__ = ()
+
     tag = "Footer"
     validation_schema = FOOTER_SCHEMA
+    fields = ("TotalNumberInvoices", "TotalAmount")
 
     def __init__(self, invoices_count: int, total_amount: Decimal) -> None:
         self.elements = self.validate(
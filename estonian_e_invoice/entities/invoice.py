@@ -1,8 +1,8 @@
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from estonian_e_invoice.entities import AccountInfo, ContactData, PaymentInfo
-from estonian_e_invoice.entities.common import Node
+from estonian_e_invoice.entities.common import CompactNode
 from estonian_e_invoice.validation.validation_schemas import (
     BUYER_PARTY_SCHEMA,
     INVOICE_INFORMATION_SCHEMA,
@@ -17,7 +17,7 @@ from estonian_e_invoice.validation.validation_schemas import (
 )
 
 
-class VAT(Node):
+class VAT(CompactNode):
     """
     Describes value-added tax.
 
@@ -28,8 +28,11 @@ class VAT(Node):
         currency: VAT currency
     """
 
+    __slots__ = ()
+
     tag = "VAT"
     validation_schema = VAT_SCHEMA
+    fields = ("SumBeforeVAT", "VATRate", "VATSum", "Currency", "SumAfterVAT")
 
     def __init__(
         self,
@@ -50,7 +53,7 @@ class VAT(Node):
         )
 
 
-class SellerParty(Node):
+class SellerParty(CompactNode):
     """
     Defines SellerParty involved with the invoice. Differs from the buyer party
     by the mandatory register code.
@@ -62,8 +65,12 @@ class SellerParty(Node):
         account_info: Describes the accounts of the party.
     """
 
+    __slots__ = ()
+
     tag = "SellerParty"
     validation_schema = SELLER_PARTY_SCHEMA
+    cacheable = True
+    fields = ("Name", "RegNumber", "VATRegNumber", "ContactData", "AccountInfo")
 
     def __init__(
         self,
@@ -87,6 +94,8 @@ class SellerParty(Node):
 class BuyerParty(SellerParty):
     """Defines the buyer of the invoice"""
 
+    __slots__ = ()
+
     tag = "BuyerParty"
     validation_schema = BUYER_PARTY_SCHEMA
 
@@ -107,32 +116,44 @@ class BuyerParty(SellerParty):
         )
 
 
-class InvoiceType(Node):
+class InvoiceType(CompactNode):
     """"
     Invoice type.
 
         invoice_type: Invoice type. DEB – debit invoice, CRE – credit invoice.
     """
 
+    __slots__ = ()
+
     tag = "Type"
     validation_schema = INVOICE_TYPE_SCHEMA
+    fields = ("SourceInvoice",)
+    attribute_fields = ("type",)
 
     def __init__(self, invoice_type: str, source_invoice: Optional[str] = None):
-        validated_data = self.validate(
-            {"Type": invoice_type, "SourceInvoice": source_invoice,}
+        self.load(
+            self.validate({"Type": invoice_type, "SourceInvoice": source_invoice,})
         )
+
+    def load(self, document: dict) -> None:
         self.attributes = {
-            "type": validated_data["Type"],
+            "type": document.get("Type"),
         }
 
-        source_invoice = validated_data.get("SourceInvoice")
+        source_invoice = document.get("SourceInvoice")
         if source_invoice:
             self.elements = {
                 "SourceInvoice": source_invoice,
             }
 
+    def to_document(self) -> dict:
+        return {
+            "Type": self.attributes.get("type"),
+            "SourceInvoice": self.elements.get("SourceInvoice"),
+        }
+
 
-class InvoiceInformation(Node):
+class InvoiceInformation(CompactNode):
     """
     Contains general invoice specific information about the invoice, like invoice number and dates.
 
@@ -144,8 +165,18 @@ class InvoiceInformation(Node):
         fine_rate_per_day: Fine rate per day. Shown in percent.
     """
 
+    __slots__ = ()
+
     tag = "InvoiceInformation"
     validation_schema = INVOICE_INFORMATION_SCHEMA
+    fields = (
+        "Type",
+        "DocumentName",
+        "InvoiceNumber",
+        "InvoiceDate",
+        "DueDate",
+        "FineRatePerDay",
+    )
 
     def __init__(
         self,
@@ -168,7 +199,7 @@ class InvoiceInformation(Node):
         )
 
 
-class ItemDetailInfo(Node):
+class ItemDetailInfo(CompactNode):
     """
     Detailed information of products/services.
 
@@ -177,8 +208,11 @@ class ItemDetailInfo(Node):
         item_price: Price of one product or service (without taxes).
     """
 
+    __slots__ = ()
+
     tag = "ItemDetailInfo"
     validation_schema = ITEM_DETAIL_INFO_SCHEMA
+    fields = ("ItemUnit", "ItemAmount", "ItemPrice")
 
     def __init__(
         self,
@@ -191,7 +225,7 @@ class ItemDetailInfo(Node):
         )
 
 
-class ItemEntry(Node):
+class ItemEntry(CompactNode):
     """
     Describes detailed info about one specific invoice row.
 
@@ -202,8 +236,11 @@ class ItemEntry(Node):
         item_detail_info: Detailed information of products/services.
     """
 
+    __slots__ = ()
+
     tag = "ItemEntry"
     validation_schema = ITEM_ENTRY_SCHEMA
+    fields = ("Description", "ItemDetailInfo", "ItemSum", "VAT", "ItemTotal")
 
     def __init__(
         self,
@@ -224,21 +261,68 @@ class ItemEntry(Node):
         )
 
 
-class InvoiceItem(Node):
+class InvoiceItem(CompactNode):
     """
      Contains information about invoice rows.
 
         invoice_item_entries: Describes one specific invoice row entries.
     """
 
+    __slots__ = ()
+
     tag = "InvoiceItem"
     validation_schema = INVOICE_ITEM_SCHEMA
+    fields = ("InvoiceItemGroup",)
 
     def __init__(self, invoice_item_entries: List[ItemEntry],) -> None:
         self.elements = self.validate({"InvoiceItemGroup": invoice_item_entries,})
 
+    @classmethod
+    def from_columns(
+        cls,
+        description: Sequence[str],
+        item_sum: Optional[Sequence[Decimal]] = None,
+        item_total: Optional[Sequence[Decimal]] = None,
+        item_unit: Optional[Sequence[str]] = None,
+        item_amount: Optional[Sequence[Decimal]] = None,
+        item_price: Optional[Sequence[Decimal]] = None,
+        vat_rate: Optional[Sequence[Decimal]] = None,
+        vat_sum: Optional[Sequence[Decimal]] = None,
+        sum_before_vat: Optional[Sequence[Decimal]] = None,
+        sum_after_vat: Optional[Sequence[Decimal]] = None,
+        vat_currency: Optional[Sequence[str]] = None,
+    ) -> "InvoiceItem":
+        """
+        Builds the invoice rows from parallel columns of their values, see
+        `estonian_e_invoice.columns`.
+
+        The columns are validated at once and the row entities are built only
+        when the rows are serialized.
+        """
+        from estonian_e_invoice.columns import ItemEntryColumns
+
+        rows = ItemEntryColumns(
+            {
+                "description": description,
+                "item_sum": item_sum,
+                "item_total": item_total,
+                "item_unit": item_unit,
+                "item_amount": item_amount,
+                "item_price": item_price,
+                "vat_rate": vat_rate,
+                "vat_sum": vat_sum,
+                "sum_before_vat": sum_before_vat,
+                "sum_after_vat": sum_after_vat,
+                "vat_currency": vat_currency,
+            }
+        )
+
+        item = cls.__new__(cls)
+        item.elements = {"InvoiceItemGroup": rows}
+        return item
 
-class InvoiceSumGroup(Node):
+
+class InvoiceSumGroup(CompactNode):
     """
     Contains invoiced amounts (total sum, sum_before_var etc).
 
@@ -251,8 +335,11 @@ class InvoiceSumGroup(Node):
         total_vat_sum: Total of all VAT sums.
     """
 
+    __slots__ = ()
+
     tag = "InvoiceSumGroup"
     validation_schema = INVOICE_SUM_GROUP_SCHEMA
+    fields = ("InvoiceSum", "VAT", "TotalVATSum", "TotalSum", "Currency", "TotalToPay")
 
     def __init__(
         self,
@@ -275,7 +362,7 @@ class InvoiceSumGroup(Node):
         )
 
 
-class Invoice(Node):
+class Invoice(CompactNode):
     """
     Contains information about one specific invoice.
 
@@ -289,8 +376,18 @@ class Invoice(Node):
         invoice_item: Information block for invoice row entries.
     """
 
+    __slots__ = ()
+
     tag = "Invoice"
     validation_schema = INVOICE_SCHEMA
+    fields = (
+        "InvoiceParties",
+        "InvoiceInformation",
+        "InvoiceSumGroup",
+        "InvoiceItem",
+        "PaymentInfo",
+    )
+    attribute_fields = ("invoiceId", "regNumber", "sellerRegnumber")
 
     def __init__(
         self,
@@ -304,27 +401,17 @@ class Invoice(Node):
         invoice_item: InvoiceItem,
         payment_info: PaymentInfo,
     ) -> None:
-        validated_data = self.validate(
-            {
-                "invoiceId": invoice_id,
-                "regNumber": reg_number,
-                "sellerRegnumber": seller_reg_number,
-                "InvoiceParties": [seller_party, buyer_party],
-                "InvoiceInformation": invoice_information,
-                "InvoiceSumGroup": invoice_sum_group,
-                "InvoiceItem": invoice_item,
-                "PaymentInfo": payment_info,
-            }
+        self.load(
+            self.validate(
+                {
+                    "invoiceId": invoice_id,
+                    "regNumber": reg_number,
+                    "sellerRegnumber": seller_reg_number,
+                    "InvoiceParties": [seller_party, buyer_party],
+                    "InvoiceInformation": invoice_information,
+                    "InvoiceSumGroup": invoice_sum_group,
+                    "InvoiceItem": invoice_item,
+                    "PaymentInfo": payment_info,
+                }
+            )
         )
-        self.attributes = {
-            "invoiceId": validated_data["invoiceId"],
-            "regNumber": validated_data["regNumber"],
-            "sellerRegnumber": validated_data["sellerRegnumber"],
-        }
-        self.elements = {
-            "InvoiceParties": validated_data["InvoiceParties"],
-            "InvoiceInformation": validated_data["InvoiceInformation"],
-            "InvoiceSumGroup": validated_data["InvoiceSumGroup"],
-            "InvoiceItem": validated_data["InvoiceItem"],
-            "PaymentInfo": validated_data["PaymentInfo"],
-        }
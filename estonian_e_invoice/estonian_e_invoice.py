@@ -1,48 +1,256 @@
 """Main module."""
-from typing import TYPE_CHECKING, ByteString, Union
-from xml.dom import minidom
+from typing import TYPE_CHECKING, BinaryIO, ByteString, Iterable, Optional, Union
 from xml.etree import ElementTree
 
+from estonian_e_invoice.instrumentation import GENERATOR, measure
+from estonian_e_invoice.serialization import (
+    encode,
+    escape_attribute,
+    to_pretty_string,
+)
+from estonian_e_invoice.sinks import open_sink
+from estonian_e_invoice.totals import FooterAccumulator
+
 if TYPE_CHECKING:
+    from estonian_e_invoice.cache import FragmentCache
     from estonian_e_invoice.entities import Header, Footer, Invoice
+    from estonian_e_invoice.entities.common import Node
+    from estonian_e_invoice.xsd import XSDValidator
+
+ROOT_TAG = "E_Invoice"
+ROOT_ATTRIBUTES = (
+    ("xsi:noNamespaceSchemaLocation", "e-invoice_ver1.2.xsd"),
+    ("xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance"),
+)
+
+
+def root_start_tag() -> str:
+    attributes = "".join(
+        " " + key + '="' + escape_attribute(value) + '"'
+        for key, value in ROOT_ATTRIBUTES
+    )
+    return "<" + ROOT_TAG + attributes + ">"
+
+
+def root_end_tag() -> str:
+    return "</" + ROOT_TAG + ">"
 
 
 class XMLGenerator:
     """
     Generate string representation of XML element.
+
+    The footer is computed from the invoice when it is not given. A given
+    footer is written as it is, or checked against the invoice with
+    check_footer, raising ValidationError if they do not match.
+
+    A given fragment cache is used by `to_bytes`.
     """
     encoding = "utf-8"
 
-    def __init__(self, header: "Header", footer: "Footer", invoice: "Invoice") -> None:
-        self.root = ElementTree.Element("E_Invoice")
+    def __init__(
+        self,
+        header: "Header",
+        footer: Optional["Footer"],
+        invoice: "Invoice",
+        fragment_cache: Optional["FragmentCache"] = None,
+        check_footer: bool = False,
+    ) -> None:
+        self.root = ElementTree.Element(ROOT_TAG)
         self.header = header
-        self.footer = footer
         self.invoice = invoice
+        self.fragment_cache = fragment_cache
 
-    def to_string(self, prettify: bool) -> Union[ByteString, str]:
-        """
-        A ByteString is returned if prettified, otherwise str.
+        # Trees built with deferred validation are validated before use.
+        with measure(GENERATOR, "XMLGenerator.validate_tree"):
+            header.validate_tree()
+            invoice.validate_tree()
+
+            if footer is None or check_footer:
+                accumulator = FooterAccumulator()
+                accumulator.add(invoice)
+            if footer is None:
+                footer = accumulator.to_footer()
+            else:
+                footer.validate_tree()
+                if check_footer:
+                    accumulator.check(footer)
 
-        Returns an (optionally prettified) encoded string containing the XML data.
+        self.footer = footer
+
+    def to_string(
+        self, prettify: bool, as_bytes: Optional[bool] = None
+    ) -> Union[ByteString, str]:
         """
-        rough_string = ElementTree.tostring(self.root, self.encoding)
+        Returns an (optionally prettified) string containing the XML data.
+
+        If as_bytes is not given, a str is returned if prettified, otherwise
+        UTF-8 encoded bytes. Pass as_bytes to always get the same type.
 
-        if not prettify:
-            return rough_string
+        The prettified output is written in one pass and matches the output of
+        `minidom.Document.toprettyxml`.
+        """
+        if prettify:
+            with measure(GENERATOR, "XMLGenerator.prettify"):
+                pretty_string = to_pretty_string(self.root, indent="  ")
+                if as_bytes:
+                    return pretty_string.encode(self.encoding)
+            return pretty_string
 
-        re_parsed = minidom.parseString(rough_string)
-        return re_parsed.toprettyxml(indent="  ")
+        with measure(GENERATOR, "XMLGenerator.tostring"):
+            rough_string = ElementTree.tostring(self.root, self.encoding)
+        if as_bytes is False:
+            return rough_string.decode(self.encoding)
+        return rough_string
 
     def set_root_attrs(self) -> None:
-        self.root.set("xsi:noNamespaceSchemaLocation", "e-invoice_ver1.2.xsd")
-        self.root.set("xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance")
+        for key, value in ROOT_ATTRIBUTES:
+            self.root.set(key, value)
 
     def add_nodes_to_root(self) -> None:
-        self.root.extend(
-            [self.header.to_etree(), self.invoice.to_etree(), self.footer.to_etree(),]
-        )
+        with measure(GENERATOR, "XMLGenerator.to_etree"):
+            self.root.extend(
+                [
+                    self.header.to_etree(),
+                    self.invoice.to_etree(),
+                    self.footer.to_etree(),
+                ]
+            )
 
-    def generate(self, prettify=True) -> Union[ByteString, str]:
+    def generate(
+        self, prettify=True, as_bytes: Optional[bool] = None
+    ) -> Union[ByteString, str]:
         self.set_root_attrs()
         self.add_nodes_to_root()
-        return self.to_string(prettify)
+        return self.to_string(prettify, as_bytes=as_bytes)
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the same bytes as `generate(prettify=False)`.
+
+        The XML is written directly from the entities, without building the
+        ElementTree of the document.
+        """
+        with measure(GENERATOR, "XMLGenerator.to_bytes"):
+            parts = [root_start_tag()]
+            for node in (self.header, self.invoice, self.footer):
+                node.write_xml(parts.append, self.fragment_cache)
+            parts.append(root_end_tag())
+            return encode("".join(parts), self.encoding)
+
+
+class StreamingXMLGenerator:
+    """
+    Write an XML file with any number of invoices into a binary file.
+
+    The invoices are consumed one by one, each invoice is serialized and
+    released before the next one is read, so the memory usage does not depend
+    on the number of invoices. The output of a single invoice is the same as
+    the non-prettified output of `XMLGenerator`.
+
+    The footer is computed from the invoices while they are written when it is
+    not given. A given footer is checked against the written invoices and
+    ValidationError is raised before writing it if they do not match. The
+    check can only fail after the invoices are written, see `write`.
+
+    Repeated parties of the invoices are serialized once if a fragment cache
+    is given. Invoices built with deferred validation are validated before
+    they are written.
+
+    If an XSD validator is given, every invoice and the footer are validated
+    against the XML schema before they are written, each in a minimal
+    document with the header, see `XSDValidator.validate_fragments`.
+    """
+    encoding = "utf-8"
+
+    def __init__(
+        self,
+        header: "Header",
+        footer: Optional["Footer"],
+        invoices: Iterable["Invoice"],
+        fragment_cache: Optional["FragmentCache"] = None,
+        xsd_validator: Optional["XSDValidator"] = None,
+    ) -> None:
+        self.header = header
+        self.footer = footer
+        self.invoices = invoices
+        self.fragment_cache = fragment_cache
+        self.xsd_validator = xsd_validator
+
+    def start_tag(self) -> bytes:
+        return encode(root_start_tag(), self.encoding)
+
+    def end_tag(self) -> bytes:
+        return encode(root_end_tag(), self.encoding)
+
+    def serialize(self, node: "Node") -> bytes:
+        with measure(GENERATOR, "StreamingXMLGenerator.serialize"):
+            return node.to_bytes(self.encoding, self.fragment_cache)
+
+    def validate_xml(
+        self,
+        header: bytes,
+        invoice: bytes,
+        footer: Optional[bytes] = None,
+        paths: Optional[dict] = None,
+    ) -> None:
+        if self.xsd_validator is not None:
+            with measure(GENERATOR, "StreamingXMLGenerator.xsd_validate"):
+                self.xsd_validator.validate_fragments(
+                    header, invoice, footer, paths, self.encoding
+                )
+
+    def write_to(self, sink: BinaryIO) -> "Footer":
+        accumulator = FooterAccumulator()
+        with measure(GENERATOR, "StreamingXMLGenerator.validate_tree"):
+            self.header.validate_tree()
+        header_data = self.serialize(self.header)
+        sink.write(self.start_tag())
+        sink.write(header_data)
+
+        invoice_data = b""
+        for index, invoice in enumerate(self.invoices, 1):
+            with measure(GENERATOR, "StreamingXMLGenerator.validate_tree"):
+                invoice.validate_tree()
+            accumulator.add(invoice)
+            invoice_data = self.serialize(invoice)
+            self.validate_xml(
+                header_data,
+                invoice_data,
+                paths={
+                    "/" + ROOT_TAG + "/Invoice": "/{root}/Invoice[{index}]".format(
+                        root=ROOT_TAG, index=index
+                    )
+                },
+            )
+            sink.write(invoice_data)
+
+        footer = self.footer
+        if footer is None:
+            footer = accumulator.to_footer()
+        else:
+            with measure(GENERATOR, "StreamingXMLGenerator.validate_tree"):
+                footer.validate_tree()
+            accumulator.check(footer)
+
+        footer_data = self.serialize(footer)
+        # The header is validated with the first invoice, the footer with the
+        # last one.
+        self.validate_xml(header_data, invoice_data, footer_data)
+        sink.write(footer_data)
+        sink.write(self.end_tag())
+        return footer
+
+    def write(self, sink: Union[str, BinaryIO]) -> "Footer":
+        """
+        Writes the file into a binary file object or to the given path.
+
+        A path is written through a temporary file in the same directory, which
+        replaces the path only when the whole file is written, so a failed
+        validation leaves no partial file behind. A file object contains an
+        incomplete and invalid document if ValidationError is raised.
+
+        Returns the footer of the written file.
+        """
+        with open_sink(sink, atomic=True) as file:
+            return self.write_to(file)
@@ -0,0 +1,148 @@
+"""
+Timing of the generation pipeline.
+
+A `Collector` records the number of calls and the cumulative time of the
+validation and the ElementTree conversion of every entity class, and of the
+stages of the generators, while it is active:
+
+    with Collector() as collector:
+        invoice = build_invoice()
+        XMLGenerator(header, None, invoice).generate()
+
+    collector.to_dict()
+    # {"validate": {"Invoice": {"count": 1, "seconds": 0.0012}, ...},
+    #  "to_etree": {...}, "generator": {"XMLGenerator.prettify": {...}, ...}}
+
+The generator stages are named after the generator and the stage:
+`validate_tree` of the given entities, `to_etree` building the document tree,
+`tostring` or `prettify` converting it into text and `to_bytes` writing the
+text directly, and `serialize` and `xsd_validate` of every written entity of
+`StreamingXMLGenerator`.
+
+The times of `to_etree` include the conversion of the sub elements. Measured
+code only checks whether a collector is active when none is, so the timing
+costs nothing when it is not used.
+
+The active collector is shared by all threads of the process.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+VALIDATE = "validate"
+TO_ETREE = "to_etree"
+GENERATOR = "generator"
+
+# The collector recording the timings, None when timing is disabled.
+active_collector = None
+
+
+class Timer:
+    """
+    Context manager recording the time of its block into a collector.
+    """
+
+    __slots__ = ("collector", "stage", "name", "start")
+
+    def __init__(self, collector: "Collector", stage: str, name: str) -> None:
+        self.collector = collector
+        self.stage = stage
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.collector.record(
+            self.stage, self.name, time.perf_counter() - self.start
+        )
+
+
+class NullTimer:
+    """
+    Context manager used when timing is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+null_timer = NullTimer()
+
+
+class Collector:
+    """
+    Records the count and the cumulative time of the measured calls.
+
+        callback: Called with the stage, the name and the seconds of every
+                  measured call, e.g. to forward them to a metrics system.
+
+    Collectors are activated as context managers, the previously active
+    collector is restored when the block exits.
+    """
+
+    def __init__(
+        self, callback: Optional[Callable[[str, str, float], None]] = None
+    ) -> None:
+        self.callback = callback
+        self._timings = {}
+        self._lock = threading.Lock()
+        self._previous = []
+
+    def __enter__(self) -> "Collector":
+        global active_collector
+        self._previous.append(active_collector)
+        active_collector = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global active_collector
+        active_collector = self._previous.pop()
+
+    def record(self, stage: str, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.get((stage, name))
+            if timing is None:
+                self._timings[(stage, name)] = [1, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+
+        if self.callback is not None:
+            self.callback(stage, name, seconds)
+
+    def measure(self, stage: str, name: str) -> Timer:
+        return Timer(self, stage, name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._timings.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Returns the counts and the seconds of the measured calls by their stage
+        and name.
+        """
+        timings = {}
+        with self._lock:
+            for (stage, name), (count, seconds) in sorted(self._timings.items()):
+                timings.setdefault(stage, {})[name] = {
+                    "count": count,
+                    "seconds": seconds,
+                }
+        return timings
+
+
+def measure(stage: str, name: str):
+    """
+    Returns a context manager timing its block with the active collector.
+    """
+    collector = active_collector
+    if collector is None:
+        return null_timer
+    return collector.measure(stage, name)
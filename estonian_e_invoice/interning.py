@@ -0,0 +1,111 @@
+"""
+Interning of repeated entities.
+
+Parties, their contacts, addresses and accounts are usually the same on most
+invoices of a billing run. The registry returns one shared instance for equal
+constructor arguments, so those entities are validated only once. The shared
+instances are frozen, modifying them raises AttributeError.
+
+    seller_party = SellerParty.interned(name="Seller", reg_number="1")
+
+Only the classes marked `cacheable` can be interned.
+"""
+import inspect
+import threading
+from collections import OrderedDict
+
+from estonian_e_invoice.cache import content_key
+from estonian_e_invoice.entities.common import CompactNode
+
+
+class InternRegistry:
+    """
+    Thread-safe LRU registry of interned entities keyed by the arguments they
+    were built from.
+
+        max_size: Maximum number of interned entities. Evicted entities stay
+                  valid and frozen, they are only not shared any more.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        if max_size < 1:
+            raise ValueError("max_size has to be a positive number")
+
+        self.max_size = max_size
+        self._nodes = OrderedDict()
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_key(self, cls: type, args: tuple, kwargs: dict) -> tuple:
+        signature = self._signatures.get(cls)
+        if signature is None:
+            signature = self._signatures[cls] = inspect.signature(cls)
+
+        # Binding makes positional and keyword arguments produce the same key.
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        return (cls,) + tuple(
+            (name, content_key(value)) for name, value in arguments.arguments.items()
+        )
+
+    def get(self, cls: type, *args, **kwargs) -> CompactNode:
+        """
+        Returns the shared instance of the class built from the arguments.
+        """
+        if not (issubclass(cls, CompactNode) and cls.cacheable):
+            raise ValueError("{name} can not be interned".format(name=cls.__name__))
+
+        key = self.get_key(cls, args, kwargs)
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is not None:
+                self._nodes.move_to_end(key)
+                self._hits += 1
+                return node
+            self._misses += 1
+
+        node = cls(*args, **kwargs)
+        # Shared entities are always validated, even in deferred validation.
+        node.validate_tree()
+        node.freeze()
+
+        with self._lock:
+            # Another thread may have built the same entity meanwhile.
+            node = self._nodes.setdefault(key, node)
+            self._nodes.move_to_end(key)
+            while len(self._nodes) > self.max_size:
+                self._nodes.popitem(last=False)
+                self._evictions += 1
+
+        return node
+
+    def clear(self) -> None:
+        """
+        Drops the interned entities and the counters.
+        """
+        with self._lock:
+            self._nodes.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the lookup counters and the number of interned entities.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._nodes),
+            }
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+
+intern_registry = InternRegistry()
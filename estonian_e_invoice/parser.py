@@ -0,0 +1,307 @@
+"""
+Reading E_Invoice documents into entities.
+
+The elements are converted to the types of their validation schema, decimals
+are parsed into Decimal and integers into int, and the entities are rebuilt
+through their validation:
+
+    document = parse("invoices.xml")
+    StreamingXMLGenerator(document.header, document.footer, document.invoices)
+
+Large documents are read one invoice at a time with `InvoiceReader`.
+
+Generating a document from the parsed entities returns the bytes the document
+was read from, if it was written by this package. The writer leaves out zero
+amounts, so documents containing them are not reproduced exactly.
+"""
+import re
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, Optional, Union
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element
+
+from estonian_e_invoice.entities import (
+    VAT,
+    AccountInfo,
+    BuyerParty,
+    ContactData,
+    Footer,
+    Header,
+    Invoice,
+    InvoiceInformation,
+    InvoiceItem,
+    InvoiceSumGroup,
+    InvoiceType,
+    ItemDetailInfo,
+    ItemEntry,
+    LegalAddress,
+    PaymentInfo,
+    SellerParty,
+)
+from estonian_e_invoice.entities.common import Node
+from estonian_e_invoice.estonian_e_invoice import ROOT_TAG
+from estonian_e_invoice.totals import FooterAccumulator
+from estonian_e_invoice.validation.deferred import deferred_validation
+from estonian_e_invoice.validation.exceptions import ValidationError
+
+Document = namedtuple("Document", ["header", "invoices", "footer"])
+Document.__doc__ = """Entities of an E_Invoice document."""
+
+ENTITY_CLASSES = {
+    cls.tag: cls
+    for cls in (
+        VAT,
+        AccountInfo,
+        BuyerParty,
+        ContactData,
+        Footer,
+        Header,
+        Invoice,
+        InvoiceInformation,
+        InvoiceItem,
+        InvoiceSumGroup,
+        InvoiceType,
+        ItemDetailInfo,
+        ItemEntry,
+        LegalAddress,
+        PaymentInfo,
+        SellerParty,
+    )
+}
+
+SCALAR_PARSERS = {
+    "decimal": Decimal,
+    "integer": int,
+}
+
+# Lexical space of xs:decimal, which has no exponents, NaN or Infinity.
+DECIMAL_PATTERN = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)")
+
+YES_NO_VALUES = {"YES": True, "NO": False}
+
+# Element values which are entities, or sequences of entities.
+ENTITY = "entity"
+ENTITY_LIST = "entity_list"
+
+_field_parsers = {}
+
+
+def get_field_parsers(cls: type) -> dict:
+    """
+    Returns the parsers of the sub elements of the class by their names.
+    """
+    parsers = _field_parsers.get(cls)
+    if parsers is None:
+        parsers = {}
+        for field, rules in cls.validation_schema.items():
+            data_type = rules.get("type")
+            if rules.get("coerce") == "to_yes_no":
+                parsers[field] = parse_yes_no
+            elif data_type == "list":
+                parsers[field] = ENTITY_LIST
+            elif data_type in SCALAR_PARSERS:
+                parsers[field] = SCALAR_PARSERS[data_type]
+            elif data_type == "string":
+                parsers[field] = str
+            else:
+                parsers[field] = ENTITY
+        _field_parsers[cls] = parsers
+
+    return parsers
+
+
+def parse_yes_no(text: str) -> bool:
+    # The validation converts the flag back into YES or NO.
+    try:
+        return YES_NO_VALUES[text]
+    except KeyError:
+        raise ValueError("Not YES or NO: {text}".format(text=text))
+
+
+def parse_scalar(parser, text: str):
+    if parser is Decimal and not DECIMAL_PATTERN.fullmatch(text.strip()):
+        # Left for the validation to report.
+        return text
+
+    try:
+        return parser(text)
+    except (ValueError, InvalidOperation):
+        # Left for the validation to report.
+        return text
+
+
+def parse_element(element: Element) -> Node:
+    """
+    Builds the entity of the element with its sub elements.
+
+    Raises ValidationError for unknown elements and invalid values.
+    """
+    try:
+        cls = ENTITY_CLASSES[element.tag]
+    except KeyError:
+        raise ValidationError({element.tag: ["unknown field"]})
+
+    unknown = [name for name in element.attrib if name not in cls.attribute_fields]
+    unknown.extend(child.tag for child in element if child.tag not in cls.fields)
+    if unknown:
+        raise ValidationError(
+            {
+                "{tag}.{field}".format(tag=element.tag, field=field): ["unknown field"]
+                for field in unknown
+            }
+        )
+
+    parsers = get_field_parsers(cls)
+    elements = {}
+    for child in element:
+        parser = parsers[child.tag]
+
+        if parser is ENTITY:
+            value = parse_element(child)
+        elif parser is ENTITY_LIST:
+            value = [parse_element(item) for item in child]
+        else:
+            value = parse_scalar(parser, child.text or "")
+        elements[child.tag] = value
+
+    node = cls.__new__(cls)
+    node.attributes = dict(element.attrib)
+    node.elements = elements
+    node.load(node.validate(node.to_document()))
+    return node
+
+
+def parse_entity(element: Element) -> Node:
+    """
+    Builds the entity of a child of the root and validates its tree.
+
+    Errors are keyed by their paths in the entity.
+    """
+    with deferred_validation():
+        node = parse_element(element)
+    node.validate_tree()
+    return node
+
+
+def check_document(header: Optional[Header], footer: Optional[Footer]) -> None:
+    if header is None or footer is None:
+        raise ValidationError(
+            {
+                tag: ["required field"]
+                for tag, node in (("Header", header), ("Footer", footer))
+                if node is None
+            }
+        )
+
+
+def parse_root(root: Element) -> Document:
+    """
+    Builds the entities of an E_Invoice element.
+    """
+    if root.tag != ROOT_TAG:
+        raise ValidationError({root.tag: ["unknown field"]})
+
+    header = footer = None
+    invoices = []
+    for child in root:
+        node = parse_entity(child)
+
+        if isinstance(node, Header):
+            header = node
+        elif isinstance(node, Footer):
+            footer = node
+        elif isinstance(node, Invoice):
+            invoices.append(node)
+        else:
+            raise ValidationError({child.tag: ["unknown field"]})
+
+    check_document(header, footer)
+    return Document(header, invoices, footer)
+
+
+def parse(source: Union[str, BinaryIO]) -> Document:
+    """
+    Reads an E_Invoice document from a path or a binary file object.
+    """
+    return parse_root(ElementTree.parse(source).getroot())
+
+
+def parse_string(text: Union[str, bytes]) -> Document:
+    """
+    Reads an E_Invoice document from a string.
+    """
+    return parse_root(ElementTree.fromstring(text))
+
+
+def release_child(root: Element, element: Element) -> None:
+    """
+    Releases the complete child of the root read by `iterparse`, and the
+    children read before it, so the memory usage does not depend on the size
+    of the document. Works with the elements of ElementTree and lxml.
+    """
+    element.clear()
+    del root[:]
+
+
+class InvoiceReader:
+    """
+    Reads the invoices of an E_Invoice document one by one.
+
+    The document is parsed incrementally and every child of the root is
+    released once its entity is built, so the memory usage is bounded by the
+    largest invoice instead of the size of the file.
+
+        source: Path or binary file object of the document.
+        check_footer: Whether the footer is checked against the invoices.
+
+    The header is available once the first invoice is read, the footer when
+    all of them are. The number and the total sum of the invoices are summed
+    while they are read and a footer not matching them raises ValidationError.
+
+        reader = InvoiceReader("invoices.xml")
+        for invoice in reader:
+            ...
+        reader.footer
+    """
+
+    def __init__(self, source: Union[str, BinaryIO], check_footer: bool = True) -> None:
+        self.source = source
+        self.check_footer = check_footer
+        self.header = None
+        self.footer = None
+
+    def __iter__(self) -> Iterator[Invoice]:
+        accumulator = FooterAccumulator()
+        root = None
+        depth = 0
+
+        for event, element in ElementTree.iterparse(self.source, ("start", "end")):
+            if event == "start":
+                depth += 1
+                if root is None:
+                    root = element
+                    if root.tag != ROOT_TAG:
+                        raise ValidationError({root.tag: ["unknown field"]})
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            node = parse_entity(element)
+            release_child(root, element)
+
+            if isinstance(node, Invoice):
+                accumulator.add(node)
+                yield node
+            elif isinstance(node, Header):
+                self.header = node
+            elif isinstance(node, Footer):
+                self.footer = node
+                if self.check_footer:
+                    accumulator.check(node)
+            else:
+                raise ValidationError({element.tag: ["unknown field"]})
+
+        check_document(self.header, self.footer)
@@ -0,0 +1,103 @@
+"""
+Serializers writing XML text in a single pass.
+"""
+from typing import Callable
+from xml.etree.ElementTree import Element
+
+PRETTY_XML_DECLARATION = '<?xml version="1.0" ?>\n'
+
+
+def escape_text(text: str) -> str:
+    """
+    Escapes element text the way `ElementTree.tostring` writes it.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_attribute(text: str) -> str:
+    """
+    Escapes an attribute value the way `ElementTree.tostring` writes it.
+    """
+    text = escape_text(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def encode(text: str, encoding: str = "utf-8") -> bytes:
+    # Characters the encoding can not represent become character references.
+    return text.encode(encoding, "xmlcharrefreplace")
+
+
+def escape_pretty(text: str) -> str:
+    """
+    Escapes text the way `xml.dom.minidom` writes it.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def write_pretty_element(
+    element: Element, write: Callable[[str], None], indent: str, level: int = 0
+) -> None:
+    """
+    Writes an element with the layout of `minidom.Node.toprettyxml`.
+
+    Every element is written on its own line, elements with only a text are
+    kept on a single line. Namespace declarations are written before the
+    other attributes, as the minidom parser reorders them that way.
+    """
+    prefix = indent * level
+    write(prefix + "<" + element.tag)
+    if element.attrib:
+        attributes = sorted(
+            element.attrib.items(), key=lambda item: not item[0].startswith("xmlns")
+        )
+        for key, value in attributes:
+            write(" " + key + '="' + escape_pretty(value) + '"')
+
+    text = element.text
+    if text and "\r" in text:
+        # Line endings are normalized when the XML is parsed.
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    if len(element):
+        write(">\n")
+        if text:
+            write(prefix + indent + escape_pretty(text) + "\n")
+        for child in element:
+            write_pretty_element(child, write, indent, level + 1)
+        write(prefix + "</" + element.tag + ">\n")
+    elif text:
+        write(">" + escape_pretty(text) + "</" + element.tag + ">\n")
+    else:
+        write("/>\n")
+
+
+def to_pretty_string(element: Element, indent: str = "  ") -> str:
+    """
+    Returns the same document as re-parsing the serialized element with
+    `xml.dom.minidom` and calling `toprettyxml(indent=indent)` on it.
+    """
+    parts = [PRETTY_XML_DECLARATION]
+    write_pretty_element(element, parts.append, indent)
+    return "".join(parts)
@@ -0,0 +1,43 @@
+"""
+Files written to a path or to a given file object.
+"""
+import os
+import uuid
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Union
+
+
+@contextmanager
+def open_sink(
+    sink: Union[str, IO],
+    mode: str = "wb",
+    encoding: Optional[str] = None,
+    atomic: bool = False,
+) -> Iterator[IO]:
+    """
+    Yields the given file object as it is, or the file at the given path
+    opened with the mode and closed on exit.
+
+    If atomic is set, a path is written through a temporary file in the same
+    directory, which replaces the path only when the block completes, so an
+    exception leaves no partial file behind.
+    """
+    if hasattr(sink, "write"):
+        yield sink
+        return
+
+    if not atomic:
+        with open(sink, mode, encoding=encoding) as file:
+            yield file
+        return
+
+    # Opened like the path itself, so the file gets the same permissions.
+    temporary_path = "{}.{}.tmp".format(sink, uuid.uuid4().hex)
+    try:
+        with open(temporary_path, mode.replace("w", "x"), encoding=encoding) as file:
+            yield file
+        os.replace(temporary_path, sink)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
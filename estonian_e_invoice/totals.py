@@ -0,0 +1,403 @@
+"""
+Computation of the amounts derived from other entities.
+"""
+from decimal import (
+    MAX_EMAX,
+    MAX_PREC,
+    MIN_EMIN,
+    ROUND_HALF_UP,
+    Context,
+    Decimal,
+    Inexact,
+    localcontext,
+)
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+from estonian_e_invoice.entities import VAT, Footer, InvoiceSumGroup
+from estonian_e_invoice.validation.exceptions import ValidationError
+
+if TYPE_CHECKING:
+    from estonian_e_invoice.entities import Invoice, InvoiceItem
+
+# Sums are computed without rounding, an inexact result raises instead.
+EXACT_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN, traps=[Inexact])
+# Rounds the exact amounts to the decimal places of their fields.
+ROUNDING_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+TWO_PLACES = 2
+FOUR_PLACES = 4
+
+
+def get_invoice_total_sum(invoice: "Invoice") -> Decimal:
+    return invoice.elements["InvoiceSumGroup"].elements["TotalSum"]
+
+
+class FooterAccumulator:
+    """
+    Accumulates the footer values from the invoices of a file.
+
+        invoices_count: Number of the added invoices.
+        total_amount: Sum of TotalSum of the added invoices.
+    """
+
+    def __init__(self) -> None:
+        self.invoices_count = 0
+        self.total_amount = Decimal("0.00")
+
+    def add(self, invoice: "Invoice") -> None:
+        self.add_total_sum(get_invoice_total_sum(invoice))
+
+    def add_total_sum(self, total_sum: Decimal) -> None:
+        self.invoices_count += 1
+        self.total_amount = EXACT_CONTEXT.add(self.total_amount, total_sum)
+
+    def to_footer(self) -> Footer:
+        return Footer(
+            invoices_count=self.invoices_count, total_amount=self.total_amount
+        )
+
+    def check(self, footer: Footer) -> None:
+        """
+        Raises ValidationError if the footer does not match the added invoices.
+        """
+        errors = {}
+        expected = {
+            "TotalNumberInvoices": self.invoices_count,
+            "TotalAmount": self.total_amount,
+        }
+        for key, value in expected.items():
+            if footer.elements.get(key) != value:
+                errors[key] = [
+                    "does not match the invoices, expected {value}".format(value=value)
+                ]
+
+        if errors:
+            raise ValidationError(errors)
+
+
+def round_amount(value: Decimal, places: int, rounding: str = ROUND_HALF_UP) -> Decimal:
+    return value.quantize(
+        Decimal(1).scaleb(-places), rounding=rounding, context=ROUNDING_CONTEXT
+    )
+
+
+def compute_vat_sum(
+    vat_rate: Decimal, sum_before_vat: Decimal, rounding: str = ROUND_HALF_UP
+) -> Decimal:
+    """
+    Returns the VAT of an amount, rounded to the four decimal places of VATSum.
+    """
+    return round_amount(
+        EXACT_CONTEXT.multiply(sum_before_vat, vat_rate).scaleb(-2, EXACT_CONTEXT),
+        FOUR_PLACES,
+        rounding,
+    )
+
+
+def build_vat(
+    vat_rate: Decimal,
+    sum_before_vat: Decimal,
+    currency: Optional[str] = None,
+    rounding: str = ROUND_HALF_UP,
+) -> VAT:
+    """
+    Builds the VAT of an amount with the computed VAT sum and the sum after it.
+    """
+    vat_sum = compute_vat_sum(vat_rate, sum_before_vat, rounding)
+    return VAT(
+        vat_rate=vat_rate,
+        vat_sum=vat_sum,
+        sum_before_vat=sum_before_vat,
+        sum_after_vat=EXACT_CONTEXT.add(sum_before_vat, vat_sum),
+        currency=currency,
+    )
+
+
+def matches(value: Decimal, expected: Decimal, places: int, rounding: str) -> bool:
+    """
+    Compares a supplied amount with the exact one rounded to the decimal
+    places of the supplied amount, at least two and at most those of its field.
+    """
+    value_places = min(max(-value.as_tuple().exponent, TWO_PLACES), places)
+    return value == round_amount(expected, value_places, rounding)
+
+
+def iter_rows(invoice_item: "InvoiceItem") -> Iterator[tuple]:
+    """
+    Yields the ItemSum, VATRate, VATSum and SumBeforeVAT of the invoice rows,
+    None for the missing values.
+    """
+    from estonian_e_invoice.columns import ItemEntryColumns
+
+    rows = invoice_item.elements["InvoiceItemGroup"]
+    if isinstance(rows, ItemEntryColumns):
+        # The values are read from the columns without building the rows.
+        missing = [None] * len(rows)
+        return zip(
+            *(
+                rows.columns.get(name, missing)
+                for name in ("item_sum", "vat_rate", "vat_sum", "sum_before_vat")
+            )
+        )
+
+    return iter_entry_rows(rows)
+
+
+def iter_entry_rows(rows: Iterable) -> Iterator[tuple]:
+    for row in rows:
+        elements = row.elements
+        vat = elements.get("VAT")
+        if vat is None:
+            yield elements.get("ItemSum"), None, None, None
+        else:
+            vat = vat.elements
+            yield (
+                elements.get("ItemSum"),
+                vat["VATRate"],
+                vat["VATSum"],
+                vat.get("SumBeforeVAT"),
+            )
+
+
+class InvoiceTotals:
+    """
+    Computes the amounts of InvoiceSumGroup from the invoice rows.
+
+        rounding: Rounding mode of the `decimal` module, used to round the exact
+                  sums to the decimal places of their fields.
+        check_rows: Whether the VAT sums of the rows are compared with their
+                    VAT rate and the amount before VAT.
+
+    The rows are summed exactly. InvoiceSum is the sum of ItemSum, TotalVATSum
+    the sum of the VAT sums of the rows and TotalSum the sum of both; they are
+    rounded only once, to their decimal places. The VAT of a row is calculated
+    of SumBeforeVAT, of ItemSum if it is missing.
+    """
+
+    def __init__(self, rounding: str = ROUND_HALF_UP, check_rows: bool = False) -> None:
+        self.rounding = rounding
+        self.check_rows = check_rows
+        self.rows_count = 0
+        self.exact_invoice_sum = Decimal("0")
+        self.exact_vat_sum = Decimal("0")
+        # Sums before VAT and VAT sums of the rows by their VAT rate.
+        self.vat_rates = {}
+        # Errors of the rows by their index, when the rows are checked.
+        self.row_errors = {}
+
+    def add_rows(self, rows: Iterable[tuple]) -> None:
+        """
+        Adds the ItemSum, VATRate, VATSum and SumBeforeVAT of rows.
+        """
+        invoice_sum = self.exact_invoice_sum
+        vat_sum = self.exact_vat_sum
+        vat_rates = self.vat_rates
+        index = self.rows_count - 1
+
+        with localcontext(EXACT_CONTEXT):
+            for index, (item_sum, vat_rate, row_vat_sum, sum_before_vat) in enumerate(
+                rows, self.rows_count
+            ):
+                if item_sum is not None:
+                    invoice_sum += item_sum
+                if vat_rate is None:
+                    continue
+
+                if sum_before_vat is None:
+                    sum_before_vat = Decimal("0") if item_sum is None else item_sum
+                if row_vat_sum is None:
+                    row_vat_sum = compute_vat_sum(
+                        vat_rate, sum_before_vat, self.rounding
+                    )
+                elif self.check_rows:
+                    self.check_row(index, vat_rate, row_vat_sum, sum_before_vat)
+                vat_sum += row_vat_sum
+
+                rate_sums = vat_rates.get(vat_rate)
+                if rate_sums is None:
+                    vat_rates[vat_rate] = [sum_before_vat, row_vat_sum]
+                else:
+                    rate_sums[0] += sum_before_vat
+                    rate_sums[1] += row_vat_sum
+
+        self.rows_count = index + 1
+        self.exact_invoice_sum = invoice_sum
+        self.exact_vat_sum = vat_sum
+
+    def add(self, invoice_item: "InvoiceItem") -> None:
+        self.add_rows(iter_rows(invoice_item))
+
+    def check_row(
+        self, index: int, vat_rate: Decimal, vat_sum: Decimal, sum_before_vat: Decimal
+    ) -> None:
+        expected = EXACT_CONTEXT.multiply(sum_before_vat, vat_rate).scaleb(
+            -2, EXACT_CONTEXT
+        )
+        if not matches(vat_sum, expected, FOUR_PLACES, self.rounding):
+            self.row_errors[index] = [
+                {
+                    "VAT": [
+                        {
+                            "VATSum": [
+                                "does not match the VAT rate, expected {value}".format(
+                                    value=round_amount(
+                                        expected, FOUR_PLACES, self.rounding
+                                    )
+                                )
+                            ]
+                        }
+                    ]
+                }
+            ]
+
+    @property
+    def invoice_sum(self) -> Decimal:
+        return round_amount(self.exact_invoice_sum, FOUR_PLACES, self.rounding)
+
+    @property
+    def total_vat_sum(self) -> Decimal:
+        return round_amount(self.exact_vat_sum, TWO_PLACES, self.rounding)
+
+    @property
+    def total_sum(self) -> Decimal:
+        return round_amount(
+            EXACT_CONTEXT.add(self.exact_invoice_sum, self.exact_vat_sum),
+            TWO_PLACES,
+            self.rounding,
+        )
+
+    def get_vat_breakdown(self, currency: Optional[str] = None) -> List[VAT]:
+        """
+        Returns the sums of the rows by their VAT rate, in the order of the rates.
+        """
+        return [
+            VAT(
+                vat_rate=vat_rate,
+                vat_sum=round_amount(vat_sum, FOUR_PLACES, self.rounding),
+                sum_before_vat=round_amount(sum_before_vat, FOUR_PLACES, self.rounding),
+                sum_after_vat=round_amount(
+                    EXACT_CONTEXT.add(sum_before_vat, vat_sum),
+                    FOUR_PLACES,
+                    self.rounding,
+                ),
+                currency=currency,
+            )
+            for vat_rate, (sum_before_vat, vat_sum) in sorted(self.vat_rates.items())
+        ]
+
+    def to_invoice_sum_group(
+        self, currency: Optional[str] = None, total_to_pay: Optional[Decimal] = None
+    ) -> InvoiceSumGroup:
+        """
+        Builds the InvoiceSumGroup of the rows. Its VAT is set if the rows have
+        a single VAT rate.
+
+            total_to_pay: Defaults to TotalSum, credit invoices pass 0.00.
+        """
+        vat_breakdown = self.get_vat_breakdown()
+        total_sum = self.total_sum
+        return InvoiceSumGroup(
+            total_sum=total_sum,
+            invoice_sum=self.invoice_sum,
+            currency=currency,
+            total_to_pay=total_sum if total_to_pay is None else total_to_pay,
+            vat=vat_breakdown[0] if len(vat_breakdown) == 1 else None,
+            total_vat_sum=self.total_vat_sum,
+        )
+
+    def get_errors(self, invoice_sum_group: InvoiceSumGroup) -> dict:
+        """
+        Returns the errors of the supplied InvoiceSumGroup amounts not matching
+        the rows. TotalToPay is not checked.
+        """
+        errors = {}
+        expected = (
+            ("InvoiceSum", self.exact_invoice_sum, FOUR_PLACES),
+            ("TotalVATSum", self.exact_vat_sum, TWO_PLACES),
+            (
+                "TotalSum",
+                EXACT_CONTEXT.add(self.exact_invoice_sum, self.exact_vat_sum),
+                TWO_PLACES,
+            ),
+        )
+        for key, value, places in expected:
+            supplied = invoice_sum_group.elements.get(key)
+            if supplied is not None and not matches(
+                supplied, value, places, self.rounding
+            ):
+                errors[key] = [
+                    "does not match the rows, expected {value}".format(
+                        value=round_amount(value, places, self.rounding)
+                    )
+                ]
+
+        vat = invoice_sum_group.elements.get("VAT")
+        if vat is not None:
+            vat_errors = self.get_vat_errors(vat.elements)
+            if vat_errors:
+                errors["VAT"] = [vat_errors]
+
+        return errors
+
+    def get_vat_errors(self, vat: dict) -> dict:
+        rate_sums = self.vat_rates.get(vat["VATRate"])
+        if rate_sums is None:
+            return {"VATRate": ["does not match the VAT rate of any row"]}
+
+        sum_before_vat, vat_sum = rate_sums
+        errors = {}
+        for key, value in (
+            ("SumBeforeVAT", sum_before_vat),
+            ("VATSum", vat_sum),
+            ("SumAfterVAT", EXACT_CONTEXT.add(sum_before_vat, vat_sum)),
+        ):
+            supplied = vat.get(key)
+            if supplied is not None and not matches(
+                supplied, value, FOUR_PLACES, self.rounding
+            ):
+                errors[key] = [
+                    "does not match the rows of the VAT rate, expected {value}".format(
+                        value=round_amount(value, FOUR_PLACES, self.rounding)
+                    )
+                ]
+        return errors
+
+    def check(self, invoice_sum_group: InvoiceSumGroup) -> None:
+        """
+        Raises ValidationError if the supplied amounts or, when they are
+        checked, the VAT sums of the rows do not match the rows.
+        """
+        errors = {}
+        if self.row_errors:
+            errors["InvoiceItem"] = [
+                {"InvoiceItemGroup": [dict(sorted(self.row_errors.items()))]}
+            ]
+        sum_group_errors = self.get_errors(invoice_sum_group)
+        if sum_group_errors:
+            errors["InvoiceSumGroup"] = [sum_group_errors]
+
+        if errors:
+            raise ValidationError(errors)
+
+
+def compute_totals(
+    invoice_item: "InvoiceItem",
+    rounding: str = ROUND_HALF_UP,
+    check_rows: bool = False,
+) -> InvoiceTotals:
+    """
+    Computes the totals of the invoice rows in one pass.
+    """
+    totals = InvoiceTotals(rounding=rounding, check_rows=check_rows)
+    totals.add(invoice_item)
+    return totals
+
+
+def check_invoice_totals(invoice: "Invoice", rounding: str = ROUND_HALF_UP) -> None:
+    """
+    Raises ValidationError if the VAT sums of the rows or the amounts of
+    InvoiceSumGroup do not match the rows of an invoice.
+    """
+    compute_totals(
+        invoice.elements["InvoiceItem"], rounding=rounding, check_rows=True
+    ).check(invoice.elements["InvoiceSumGroup"])
@@ -0,0 +1,72 @@
+"""
+Value checks and coercions shared by the validation engines.
+
+Checks return the error message for an invalid value and None otherwise.
+"""
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional
+
+# The expression `datetime.strptime` matches the "%Y-%m-%d" format with.
+DATE_PATTERN = re.compile(
+    r"(\d\d\d\d)-(1[0-2]|0[1-9]|[1-9])-(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def check_date_string(value: str) -> Optional[str]:
+    """
+    Accepts the same strings as `datetime.strptime(value, "%Y-%m-%d")`.
+
+    The results are memoized, as the dates of a batch are usually repeated.
+    """
+    match = DATE_PATTERN.match(value)
+    if match is not None and match.end() == len(value):
+        year, month, day = match.groups()
+        try:
+            date(int(year), int(month), int(day))
+        except ValueError:
+            pass
+        else:
+            return None
+
+    return "Date should be in %Y-%m-%d format"
+
+
+def date_to_string(value):
+    # Datetimes are left to fail the type check rather than losing their time.
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.isoformat()
+
+    return value
+
+
+def check_decimal_places(value: Decimal, num_decimal_places: int) -> Optional[str]:
+    if not isinstance(value, Decimal):
+        return "must be of a decimal type"
+
+    # The exponent of NaN and Infinity is a string.
+    if not value.is_finite():
+        return "must be a finite decimal"
+
+    if -value.as_tuple().exponent > num_decimal_places:
+        return "must not have more than {num_decimal_places} decimal places".format(
+            num_decimal_places=num_decimal_places
+        )
+
+    return None
+
+
+def check_two_decimal_places(value: Decimal) -> Optional[str]:
+    return check_decimal_places(value, 2)
+
+
+def check_four_decimal_places(value: Decimal) -> Optional[str]:
+    return check_decimal_places(value, 4)
+
+
+def to_yes_no(value) -> str:
+    return "YES" if value else "NO"
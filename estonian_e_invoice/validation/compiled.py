@@ -0,0 +1,437 @@
+"""
+Code generated validation engine.
+
+Cerberus resolves and dispatches every rule of every field through its generic
+machinery on each validation. This engine translates the schemas in
+`validation_schemas` into plain Python check functions once, and runs those
+instead. The normalized document and the error payload are the same as the
+ones produced by `CustomValidator`.
+
+Only the rules used by the schemas of this package are supported. Schemas
+using anything else raise `UnsupportedSchemaError` while being compiled.
+"""
+import re
+from collections.abc import Iterable, Sequence, Sized
+from copy import copy
+from decimal import Decimal
+from itertools import count
+from operator import itemgetter
+from typing import Tuple
+
+from estonian_e_invoice.entities import (
+    VAT,
+    AccountInfo,
+    BuyerParty,
+    ContactData,
+    InvoiceInformation,
+    InvoiceItem,
+    InvoiceSumGroup,
+    InvoiceType,
+    ItemDetailInfo,
+    ItemEntry,
+    LegalAddress,
+    PaymentInfo,
+    SellerParty,
+)
+from estonian_e_invoice.validation.checks import (
+    check_date_string,
+    check_four_decimal_places,
+    check_two_decimal_places,
+    date_to_string,
+    to_yes_no,
+)
+
+# Included and excluded classes of the types known to `CustomValidator`.
+TYPES_MAPPING = {
+    "string": ((str,), ()),
+    "integer": ((int,), ()),
+    "list": ((Sequence,), (str,)),
+    "decimal": ((Decimal,), ()),
+    "vat": ((VAT,), ()),
+    "legal_address": ((LegalAddress,), ()),
+    "contact_data": ((ContactData,), ()),
+    "account_info": ((AccountInfo,), ()),
+    "invoice_type": ((InvoiceType,), ()),
+    "item_detail_info": ((ItemDetailInfo,), ()),
+    "invoice_information": ((InvoiceInformation,), ()),
+    "invoice_item": ((InvoiceItem,), ()),
+    "invoice_sum_group": ((InvoiceSumGroup,), ()),
+    "payment_info": ((PaymentInfo,), ()),
+    "item_entry": ((ItemEntry,), ()),
+    "invoice_party": ((SellerParty, BuyerParty), ()),
+}
+
+CHECKS = {
+    "date_string": check_date_string,
+    "two_decimal_places": check_two_decimal_places,
+    "four_decimal_places": check_four_decimal_places,
+}
+
+COERCERS = {
+    "date_to_string": date_to_string,
+    "to_yes_no": to_yes_no,
+}
+
+SUPPORTED_RULES = {
+    "allowed",
+    "check_with",
+    "coerce",
+    "empty",
+    "maxlength",
+    "nullable",
+    "regex",
+    "required",
+    "schema",
+    "type",
+}
+
+# Rules which are skipped by Cerberus once a value turned out to be empty.
+EMPTY_SKIPPED_RULES = {"allowed", "maxlength", "regex", "check_with"}
+
+# Rules which are skipped by Cerberus once a value turned out to be None.
+NULL_SKIPPED_RULES = {"allowed", "empty", "maxlength", "regex", "schema", "type"}
+
+
+class UnsupportedSchemaError(Exception):
+    """Raised when a schema uses rules that can not be compiled"""
+
+    pass
+
+
+class _SchemaCompiler:
+    """
+    Generates the source of the check functions of one schema.
+
+    Each field check has the signature `check(value, field, errors)` and
+    appends `(field, rule, error)` tuples to the errors list. The rule is only
+    used to order the errors the same way as Cerberus does.
+    """
+
+    def __init__(self) -> None:
+        self.lines = []
+        self.namespace = {
+            "Iterable": Iterable,
+            "Sequence": Sequence,
+            "Sized": Sized,
+            "sort_errors": sort_errors,
+        }
+        self._names = count()
+
+    def add_constant(self, value, prefix: str = "constant") -> str:
+        name = "{prefix}_{index}".format(prefix=prefix, index=next(self._names))
+        self.namespace[name] = value
+        return name
+
+    def compile_field(self, rules: dict) -> str:
+        unsupported = set(rules) - SUPPORTED_RULES
+        if unsupported:
+            raise UnsupportedSchemaError(
+                "Unsupported rules: {rules}".format(rules=sorted(unsupported))
+            )
+
+        # Nested checks have to be defined before the function using them.
+        item_check = None
+        if "schema" in rules:
+            item_check = self.compile_field(rules["schema"])
+
+        name = "check_{index}".format(index=next(self._names))
+        body = []
+
+        body.append("if value is None:")
+        if not rules.get("nullable", False):
+            body.append(
+                "    errors.append((field, 'nullable', 'null value not allowed'))"
+            )
+        body.extend(self.compile_rules(rules, NULL_SKIPPED_RULES, item_check, 1))
+        body.append("    return")
+
+        if rules.get("type"):
+            body.extend(self.compile_type(rules["type"]))
+
+        if "empty" in rules:
+            body.append("if isinstance(value, Sized) and len(value) == 0:")
+            if not rules["empty"]:
+                body.append(
+                    "    errors.append((field, 'empty', 'empty values not allowed'))"
+                )
+            body.extend(self.compile_rules(rules, EMPTY_SKIPPED_RULES, item_check, 1))
+            body.append("    return")
+
+        body.extend(self.compile_rules(rules, set(), item_check, 0))
+
+        self.lines.append("def {name}(value, field, errors):".format(name=name))
+        self.lines.extend("    " + line for line in body)
+        self.lines.append("    return")
+        self.lines.append("")
+
+        return name
+
+    def compile_type(self, data_type) -> list:
+        types = (data_type,) if isinstance(data_type, str) else data_type
+        conditions = []
+        for type_name in types:
+            try:
+                included, excluded = TYPES_MAPPING[type_name]
+            except KeyError:
+                raise UnsupportedSchemaError(
+                    "Unsupported type: {type_name}".format(type_name=type_name)
+                )
+
+            condition = "isinstance(value, {included})".format(
+                included=self.add_constant(included, "types")
+            )
+            if excluded:
+                condition += " and not isinstance(value, {excluded})".format(
+                    excluded=self.add_constant(excluded, "types")
+                )
+            conditions.append("({condition})".format(condition=condition))
+
+        message = "must be of {constraint} type".format(constraint=data_type)
+        return [
+            "if not ({conditions}):".format(conditions=" or ".join(conditions)),
+            "    errors.append((field, 'type', {message!r}))".format(message=message),
+            "    return",
+        ]
+
+    def compile_rules(
+        self, rules: dict, skipped: set, item_check: str, depth: int
+    ) -> list:
+        is_string = rules.get("type") == "string"
+        lines = []
+
+        for rule, constraint in rules.items():
+            if rule in skipped:
+                continue
+
+            if rule == "maxlength":
+                condition = "len(value) > {constraint!r}".format(constraint=constraint)
+                if not is_string:
+                    condition = "isinstance(value, Iterable) and " + condition
+                lines.extend(
+                    [
+                        "if {condition}:".format(condition=condition),
+                        "    errors.append((field, 'maxlength', {message!r}))".format(
+                            message="max length is {constraint}".format(
+                                constraint=constraint
+                            )
+                        ),
+                    ]
+                )
+            elif rule == "regex":
+                pattern = constraint if constraint.endswith("$") else constraint + "$"
+                condition = "not {regex}.match(value)".format(
+                    regex=self.add_constant(re.compile(pattern), "regex")
+                )
+                if not is_string:
+                    condition = "isinstance(value, str) and " + condition
+                lines.extend(
+                    [
+                        "if {condition}:".format(condition=condition),
+                        "    errors.append((field, 'regex', {message!r}))".format(
+                            message="value does not match regex '{constraint}'".format(
+                                constraint=constraint
+                            )
+                        ),
+                    ]
+                )
+            elif rule == "allowed":
+                allowed = self.add_constant(tuple(constraint), "allowed")
+                if not is_string:
+                    lines.extend(
+                        [
+                            "if isinstance(value, Iterable) "
+                            "and not isinstance(value, str):",
+                            "    unallowed = set(value) - set({allowed})".format(
+                                allowed=allowed
+                            ),
+                            "    if unallowed:",
+                            "        errors.append((field, 'allowed', "
+                            "'unallowed values {}'.format(list(unallowed))))",
+                            "elif value not in {allowed}:".format(allowed=allowed),
+                        ]
+                    )
+                else:
+                    lines.append("if value not in {allowed}:".format(allowed=allowed))
+                lines.append(
+                    "    errors.append((field, 'allowed', "
+                    "'unallowed value {}'.format(value)))"
+                )
+            elif rule == "check_with":
+                try:
+                    check = CHECKS[constraint]
+                except (KeyError, TypeError):
+                    raise UnsupportedSchemaError(
+                        "Unsupported check: {check}".format(check=constraint)
+                    )
+
+                lines.extend(
+                    [
+                        "message = {check}(value)".format(
+                            check=self.add_constant(check, "check")
+                        ),
+                        "if message:",
+                        "    errors.append((field, '', message))",
+                    ]
+                )
+            elif rule == "schema":
+                lines.extend(
+                    [
+                        "if isinstance(value, Sequence) "
+                        "and not isinstance(value, str):",
+                        "    item_errors = {}",
+                        "    for index, item in enumerate(value):",
+                        "        errors_of_item = []",
+                        "        {item_check}(item, index, errors_of_item)".format(
+                            item_check=item_check
+                        ),
+                        "        if errors_of_item:",
+                        "            item_errors.update(sort_errors(errors_of_item))",
+                        "    if item_errors:",
+                        "        errors.append((field, 'schema', item_errors))",
+                    ]
+                )
+
+        return ["    " * depth + line for line in lines]
+
+
+def sort_errors(errors: list) -> dict:
+    """
+    Builds the error payload of Cerberus' BasicErrorHandler from
+    `(field, rule, error)` tuples.
+    """
+    tree = {}
+    subtrees = {}
+    for field, _, error in sorted(errors, key=itemgetter(0, 1)):
+        messages = tree.setdefault(field, [])
+        if isinstance(error, dict):
+            subtrees.setdefault(field, {}).update(error)
+        else:
+            messages.append(error)
+
+    for field, subtree in subtrees.items():
+        tree[field].append(subtree)
+
+    return tree
+
+
+class CompiledValidator:
+    """
+    Validates documents against a schema using generated check functions.
+
+    Exposes the `validate`, `document` and `errors` interface of
+    `CustomValidator`.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        self.schema = schema
+        self.document = None
+        self._errors = []
+
+        compiler = _SchemaCompiler()
+        checks = {}
+        coercers = []
+        sequences = []
+        for field, rules in schema.items():
+            checks[field] = compiler.compile_field(rules)
+
+            if "coerce" in rules:
+                try:
+                    coercers.append((field, COERCERS[rules["coerce"]]))
+                except (KeyError, TypeError):
+                    raise UnsupportedSchemaError(
+                        "Unsupported coercion: {coerce}".format(coerce=rules["coerce"])
+                    )
+            if "schema" in rules:
+                sequences.append(field)
+
+        exec("\n".join(compiler.lines), compiler.namespace)
+
+        self._checks = {
+            field: compiler.namespace[name] for field, name in checks.items()
+        }
+        self._coercers = coercers
+        self._sequences = sequences
+        self._required = [
+            field for field, rules in schema.items() if rules.get("required") is True
+        ]
+
+    def normalize(self, document: dict) -> list:
+        errors = []
+
+        for field, coercer in self._coercers:
+            if field in document:
+                try:
+                    document[field] = coercer(document[field])
+                except Exception as e:
+                    errors.append(
+                        (
+                            field,
+                            "coerce",
+                            "field '{field}' cannot be coerced: {error}".format(
+                                field=field, error=e
+                            ),
+                        )
+                    )
+
+        # Cerberus rebuilds the sequences it normalizes against a sub-schema.
+        for field in self._sequences:
+            value = document.get(field)
+            if isinstance(value, Sequence) and not isinstance(value, str):
+                document[field] = type(value)(value)
+
+        return errors
+
+    def validate(self, document: dict) -> bool:
+        document = copy(document)
+        errors = self.normalize(document)
+        checks = self._checks
+
+        for field, value in document.items():
+            check = checks.get(field)
+            if check is None:
+                errors.append((field, "", "unknown field"))
+            else:
+                check(value, field, errors)
+
+        for field in self._required:
+            if field not in document:
+                errors.append((field, "required", "required field"))
+
+        self.document = document
+        self._errors = errors
+        return not errors
+
+    def validate_column(self, field: str, values: Iterable) -> Tuple[list, dict]:
+        """
+        Validates the values of a field of many documents in one pass.
+
+        Returns the values coerced like in `validate` and the error messages
+        of the invalid values keyed by their index. None and blank values are
+        skipped, as `Node.validate` leaves them out of the documents.
+        """
+        check = self._checks[field]
+        coercer = dict(self._coercers).get(field)
+        column = []
+        column_errors = {}
+
+        for index, value in enumerate(values):
+            if value in (None, ""):
+                column.append(None)
+                continue
+
+            errors = []
+            if coercer is not None:
+                document = {field: value}
+                errors = self.normalize(document)
+                value = document[field]
+            check(value, field, errors)
+
+            if errors:
+                column_errors[index] = sort_errors(errors)[field]
+            column.append(value)
+
+        return column, column_errors
+
+    @property
+    def errors(self) -> dict:
+        return sort_errors(self._errors)
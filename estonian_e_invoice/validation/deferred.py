@@ -0,0 +1,93 @@
+"""
+Deferred validation of entity trees.
+
+Entities validate their data when they are built. Inside `deferred_validation`
+they are built from the unvalidated data instead and marked as pending:
+
+    with deferred_validation():
+        invoice = Invoice(...)
+
+    invoice.validate_tree()
+
+`Node.validate_tree` validates the pending nodes of the tree in one traversal
+and raises a single ValidationError with every error keyed by its path, like
+`InvoiceItem.InvoiceItemGroup[17].VAT.VATSum`. The generators validate the
+pending trees before serializing them.
+
+Deferring is enabled per thread. The pending flag is kept on the nodes, so
+pending trees stay pending when they are pickled, e.g. into the worker of a
+process pool.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+from weakref import WeakSet
+
+_local = threading.local()
+
+# Nodes built from unvalidated data in this process, for skipping the
+# traversal of the trees when there are none.
+_pending_nodes = WeakSet()
+
+
+@contextmanager
+def deferred_validation() -> Iterator[None]:
+    """
+    Defers the validation of the entities built in the current thread.
+    """
+    _local.depth = getattr(_local, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+
+
+def is_validation_deferred() -> bool:
+    return getattr(_local, "depth", 0) > 0
+
+
+def has_pending_nodes() -> bool:
+    return len(_pending_nodes) > 0
+
+
+def mark_pending(node) -> None:
+    node._pending = True
+    _pending_nodes.add(node)
+
+
+def is_pending(node) -> bool:
+    return getattr(node, "_pending", False)
+
+
+def mark_validated(node) -> None:
+    if is_pending(node):
+        del node._pending
+    _pending_nodes.discard(node)
+
+
+def join_path(path: str, field) -> str:
+    if isinstance(field, int):
+        return "{path}[{index}]".format(path=path, index=field)
+    if path:
+        return "{path}.{field}".format(path=path, field=field)
+    return str(field)
+
+
+def flatten_errors(errors: dict, path: str = "", flat_errors: dict = None) -> dict:
+    """
+    Converts a Cerberus error payload into messages keyed by their full path.
+
+    Errors of sequence items are keyed by the index of the item.
+    """
+    if flat_errors is None:
+        flat_errors = {}
+
+    for field, messages in errors.items():
+        field_path = join_path(path, field)
+        for message in messages:
+            if isinstance(message, dict):
+                flatten_errors(message, field_path, flat_errors)
+            else:
+                flat_errors.setdefault(field_path, []).append(message)
+
+    return flat_errors
@@ -1,4 +1,7 @@
 class ValidationError(Exception):
     """Raised when there are validation errors from Cerberus"""
 
-    pass
+    @property
+    def errors(self) -> dict:
+        """The error payload, messages keyed by the field names or paths."""
+        return self.args[0] if self.args else {}
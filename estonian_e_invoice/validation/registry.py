@@ -0,0 +1,174 @@
+"""
+Registry of compiled validators.
+
+Building a Cerberus validator normalizes and checks the whole schema, which is
+far more expensive than validating a single entity. The registry builds one
+validator per schema and reuses it for every following validation of that
+schema. Validators keep per-document state, so each thread gets its own set.
+
+The validation engine is selected per process, either with the
+ESTONIAN_E_INVOICE_VALIDATION_ENGINE environment variable or by calling
+`set_validation_engine`:
+
+    cerberus: Cerberus based `CustomValidator` (default).
+    compiled: Generated check functions from `validation.compiled`.
+"""
+import os
+import threading
+import weakref
+from typing import Iterable
+
+CERBERUS_ENGINE = "cerberus"
+COMPILED_ENGINE = "compiled"
+VALIDATION_ENGINES = (CERBERUS_ENGINE, COMPILED_ENGINE)
+
+
+class ValidatorStats:
+    """
+    Counts validator lookups of a single thread, or of the finished threads.
+
+        hits: Lookups served by an already compiled validator.
+        misses: Lookups that had to compile a new validator.
+    """
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+class ValidatorRegistry:
+    """
+    Thread-local cache of validators keyed by their schema.
+
+    The schemas in `validation_schemas` are module level constants, so the
+    identity of the schema dictionary is used as the cache key.
+    """
+
+    def __init__(self, engine: str = CERBERUS_ENGINE) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Counters of the running threads, with a reference to their thread.
+        self._stats = []
+        # Counters of the finished threads, summed up.
+        self._finished_stats = ValidatorStats()
+        self.engine = None
+        self.set_engine(engine)
+
+    def set_engine(self, engine: str) -> None:
+        """
+        Selects the validation engine and drops the validators of the previous one.
+        """
+        if engine not in VALIDATION_ENGINES:
+            raise ValueError(
+                "Unknown validation engine {engine}, choose from {engines}".format(
+                    engine=engine, engines=", ".join(VALIDATION_ENGINES)
+                )
+            )
+
+        self.engine = engine
+        self.clear()
+
+    def _get_local(self) -> threading.local:
+        local = self._local
+        if not hasattr(local, "validators"):
+            local.stats = ValidatorStats()
+            local.validators = {}
+            with self._lock:
+                self._prune_stats()
+                self._stats.append(
+                    (weakref.ref(threading.current_thread()), local.stats)
+                )
+
+        return local
+
+    def _prune_stats(self) -> None:
+        # Finished threads do not update their counters any more, so they are
+        # summed up instead of being kept per thread.
+        running_stats = []
+        for thread_ref, stats in self._stats:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                running_stats.append((thread_ref, stats))
+            else:
+                self._finished_stats.hits += stats.hits
+                self._finished_stats.misses += stats.misses
+        self._stats = running_stats
+
+    def create_validator(self, schema: dict):
+        if self.engine == COMPILED_ENGINE:
+            from estonian_e_invoice.validation.compiled import (
+                CompiledValidator,
+                UnsupportedSchemaError,
+            )
+
+            try:
+                return CompiledValidator(schema)
+            except UnsupportedSchemaError:
+                # Schemas outside of the compiled subset are left to Cerberus.
+                pass
+
+        from estonian_e_invoice.validation.validators import CustomValidator
+
+        return CustomValidator(schema)
+
+    def get(self, schema: dict):
+        """
+        Returns the validator of the current thread for the given schema.
+        """
+        local = self._get_local()
+        try:
+            validator = local.validators[id(schema)][1]
+        except KeyError:
+            local.stats.misses += 1
+            validator = self.create_validator(schema)
+            # Keep a reference to the schema so its id can not be reused.
+            local.validators[id(schema)] = (schema, validator)
+        else:
+            local.stats.hits += 1
+
+        return validator
+
+    def warm_up(self, schemas: Iterable[dict]) -> None:
+        """
+        Creates the validators of the current thread for the given schemas and
+        runs each of them once, which imports and initializes the validation
+        engine.
+        """
+        for schema in schemas:
+            # Validating a document initializes the caches of the engine.
+            self.get(schema).validate({})
+
+    def clear(self) -> None:
+        """
+        Drops the validators and counters of all threads.
+        """
+        with self._lock:
+            self._local = threading.local()
+            self._stats = []
+            self._finished_stats = ValidatorStats()
+
+    def stats(self) -> dict:
+        """
+        Returns the lookup counters summed over all threads.
+        """
+        with self._lock:
+            self._prune_stats()
+            hits = self._finished_stats.hits + sum(
+                stats.hits for _, stats in self._stats
+            )
+            misses = self._finished_stats.misses + sum(
+                stats.misses for _, stats in self._stats
+            )
+
+        return {"hits": hits, "misses": misses}
+
+
+validator_registry = ValidatorRegistry(
+    os.environ.get("ESTONIAN_E_INVOICE_VALIDATION_ENGINE", CERBERUS_ENGINE)
+)
+
+
+def set_validation_engine(engine: str) -> None:
+    validator_registry.set_engine(engine)
@@ -53,6 +53,7 @@ LONG_STRING_TYPE_REQUIRED = {
 
 DATE_STRING_TYPE = {
     **SHORT_STRING_TYPE,
+    "coerce": "date_to_string",
     "check_with": "date_string",
 }
 
@@ -1,7 +1,10 @@
-from datetime import datetime
-from decimal import Decimal
-
 from cerberus import Validator
+from estonian_e_invoice.validation.checks import (
+    check_date_string,
+    check_decimal_places,
+    date_to_string,
+    to_yes_no,
+)
 from estonian_e_invoice.validation.validator_custom_types import (
     ACCOUNT_INFO_TYPE,
     CONTACT_DATA_TYPE,
@@ -39,22 +42,14 @@ class CustomValidator(Validator):
 
     # Custom validators
     def _check_with_date_string(self, field, value):
-        try:
-            datetime.strptime(value, "%Y-%m-%d")
-        except ValueError:
-            self._error(field, "Date should be in %Y-%m-%d format")
+        error = check_date_string(value)
+        if error:
+            self._error(field, error)
 
     def check_with_decimal_places(self, field, value, num_decimal_places):
-        if isinstance(value, Decimal):
-            if -value.as_tuple().exponent > num_decimal_places:
-                self._error(
-                    field,
-                    "must not have more than {num_decimal_places} decimal places".format(
-                        num_decimal_places=num_decimal_places
-                    ),
-                )
-        else:
-            self._error(field, "must be of a decimal type")
+        error = check_decimal_places(value, num_decimal_places)
+        if error:
+            self._error(field, error)
 
     def _check_with_two_decimal_places(self, field, value):
         self.check_with_decimal_places(field, value, 2)
@@ -64,4 +59,7 @@ class CustomValidator(Validator):
 
     # Custom coarces
     def _normalize_coerce_to_yes_no(self, value):
-        return "YES" if value else "NO"
+        return to_yes_no(value)
+
+    def _normalize_coerce_date_to_string(self, value):
+        return date_to_string(value)
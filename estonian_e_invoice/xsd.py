@@ -0,0 +1,240 @@
+"""
+Offline XSD validation of E_Invoice documents.
+
+Documents are checked against the Estonian e-invoice standard with the
+official `e-invoice_ver1.2.xsd`, which is not redistributed with the package.
+Download it and pass its path. Schemas are compiled once per process and
+nothing is loaded from the network:
+
+    validator = get_xsd_validator("/path/to/e-invoice_ver1.2.xsd")
+    validator.validate(generator.to_bytes())
+
+Without a path, the bundled `estonian_e_invoice_subset.xsd` is used. It is a
+smoke check only: it is written from `validation_schemas`, describes just the
+documents this package generates, and catches serialization errors. A
+document it accepts may still be rejected by the official schema.
+
+Large files are validated one child of the root at a time with
+`XSDValidator.validate_file`, and `StreamingXMLGenerator` validates each
+invoice before writing it when it is given a validator. As schemas only
+declare the E_Invoice root globally, every invoice is validated in a minimal
+document of its own with the header and a footer, see
+`XSDValidator.validate_fragments`.
+
+Requires lxml, installed with the `xsd` extra.
+"""
+import os
+import threading
+from typing import BinaryIO, Mapping, Optional, Union
+
+from estonian_e_invoice.estonian_e_invoice import (
+    ROOT_TAG,
+    root_end_tag,
+    root_start_tag,
+)
+from estonian_e_invoice.parser import release_child
+from estonian_e_invoice.serialization import encode
+from estonian_e_invoice.validation.exceptions import ValidationError
+
+XSD_PATH = os.path.join(
+    os.path.dirname(__file__), "schemas", "estonian_e_invoice_subset.xsd"
+)
+
+HEADER_PATH = "/{root}/Header".format(root=ROOT_TAG)
+INVOICE_PATH = "/{root}/Invoice".format(root=ROOT_TAG)
+FOOTER_PATH = "/{root}/Footer".format(root=ROOT_TAG)
+
+XML_DECLARATION = '<?xml version="1.0" encoding="{encoding}"?>'
+
+# Completes the documents the header and an invoice are validated in.
+PLACEHOLDER_FOOTER = (
+    "<Footer><TotalNumberInvoices>1</TotalNumberInvoices>"
+    "<TotalAmount>0.00</TotalAmount></Footer>"
+)
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def import_etree():
+    try:
+        from lxml import etree
+    except ImportError:
+        raise ImportError(
+            "XSD validation requires lxml, install estonian_e_invoice[xsd]"
+        )
+    return etree
+
+
+def get_parser(etree):
+    # Documents and schemas never reach out to the network or expand entities.
+    return etree.XMLParser(no_network=True, resolve_entities=False)
+
+
+def replace_path(path: str, paths: Mapping[str, str]) -> str:
+    for old, new in paths.items():
+        if path == old or path.startswith(old + "/"):
+            return new + path[len(old):]
+    return path
+
+
+def raise_order_error():
+    raise ValidationError(
+        {"/" + ROOT_TAG: ["expected Header, Invoice elements and Footer"]}
+    )
+
+
+class XSDValidator:
+    """
+    Validates documents and their fragments against an XML schema.
+
+        path: Path of the XSD file, usually the official e-invoice_ver1.2.xsd.
+              Schemas it includes have to be available locally. The bundled
+              subset schema, a smoke check only, is used by default.
+
+    Errors are raised as ValidationError with the messages keyed by the XPath
+    of the invalid element, like `/E_Invoice/Invoice[2]/PaymentInfo/Payable`.
+    """
+
+    def __init__(self, path: str = XSD_PATH) -> None:
+        self.etree = import_etree()
+        self.path = path
+        self.schema = self.etree.XMLSchema(
+            self.etree.parse(path, parser=get_parser(self.etree))
+        )
+
+    def check(self, element, paths: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Validates the element. The errors are keyed by their XPath in the
+        element, with the paths of its parts replaced by the given ones.
+        """
+        if self.schema.validate(element):
+            return
+
+        errors = {}
+        for error in self.schema.error_log:
+            errors.setdefault(replace_path(error.path, paths or {}), []).append(
+                error.message
+            )
+        raise ValidationError(errors)
+
+    def validate(self, document: Union[bytes, str]) -> None:
+        """
+        Validates the XML text of a document.
+        """
+        if isinstance(document, str):
+            document = document.encode("utf-8")
+        self.check(self.etree.fromstring(document, parser=get_parser(self.etree)))
+
+    def validate_fragments(
+        self,
+        header: bytes,
+        invoice: bytes,
+        footer: Optional[bytes] = None,
+        paths: Optional[Mapping[str, str]] = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        Validates the serialized Header, Invoice and Footer of a document in a
+        minimal document of their own, as schemas like the official one only
+        declare the root element globally. A placeholder footer is used if
+        none is given.
+
+            paths: XPaths of the fragments in the errors, by their XPath in
+                   the minimal document, e.g. `/E_Invoice/Invoice`.
+        """
+        document = b"".join(
+            (
+                XML_DECLARATION.format(encoding=encoding).encode(encoding),
+                encode(root_start_tag(), encoding),
+                header,
+                invoice,
+                PLACEHOLDER_FOOTER.encode(encoding) if footer is None else footer,
+                encode(root_end_tag(), encoding),
+            )
+        )
+        self.check(
+            self.etree.fromstring(document, parser=get_parser(self.etree)), paths
+        )
+
+    def validate_file(self, source: Union[str, BinaryIO]) -> None:
+        """
+        Validates a document from a path or a binary file object.
+
+        The document is parsed incrementally and every child of the root is
+        validated and released when it is complete, so the memory usage does
+        not depend on the size of the file.
+        """
+        root = None
+        header = invoice = None
+        depth = 0
+        counts = {}
+
+        events = self.etree.iterparse(
+            source, events=("start", "end"), no_network=True, resolve_entities=False
+        )
+        for event, element in events:
+            if event == "start":
+                depth += 1
+                if root is None:
+                    root = element
+                    if root.tag != ROOT_TAG:
+                        raise ValidationError({"/" + root.tag: ["unknown field"]})
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            tag = element.tag
+            if "Footer" in counts or (tag == "Header") == bool(counts):
+                raise_order_error()
+
+            counts[tag] = counts.get(tag, 0) + 1
+            path = "/{root}/{tag}[{index}]".format(
+                root=ROOT_TAG, tag=tag, index=counts[tag]
+            )
+            data = self.etree.tostring(element, encoding="utf-8", with_tail=False)
+
+            # The children are validated in minimal documents with the
+            # header and the last invoice.
+            if tag == "Header":
+                header = data
+            elif tag == "Invoice":
+                invoice = data
+                self.validate_fragments(
+                    header,
+                    invoice,
+                    paths={HEADER_PATH: HEADER_PATH + "[1]", INVOICE_PATH: path},
+                )
+            elif tag == "Footer":
+                if invoice is None:
+                    raise_order_error()
+                self.validate_fragments(
+                    header,
+                    invoice,
+                    data,
+                    paths={HEADER_PATH: HEADER_PATH + "[1]", FOOTER_PATH: path},
+                )
+            else:
+                raise ValidationError({path: ["unknown field"]})
+
+            release_child(root, element)
+
+        if "Footer" not in counts or "Invoice" not in counts:
+            raise_order_error()
+
+
+def get_xsd_validator(path: str = XSD_PATH) -> XSDValidator:
+    """
+    Returns the validator of the schema at path, compiled once per process.
+
+    Pass the path of the official e-invoice_ver1.2.xsd to check conformance
+    with the standard. The bundled subset schema used by default is a smoke
+    check only.
+    """
+    with _validators_lock:
+        validator = _validators.get(path)
+        if validator is None:
+            validator = _validators[path] = XSDValidator(path)
+    return validator
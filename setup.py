@@ -14,6 +14,11 @@ requirements = [
     "Cerberus==1.3.2",
 ]
 
+extras_requirements = {
+    "xsd": ["lxml"],
+    "msgpack": ["msgpack"],
+}
+
 setup_requirements = [
     "pytest-runner",
 ]
@@ -39,11 +44,13 @@ setup(
     ],
     description="Estonian e-invoice generator",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + "\n\n" + history,
     include_package_data=True,
     keywords="estonian_e_invoice",
     name="estonian_e_invoice",
+    package_data={"estonian_e_invoice": ["schemas/*.xsd"]},
     packages=find_packages(
         include=[
             "estonian_e_invoice",
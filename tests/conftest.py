@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+
+"""Configuration of the test collection"""
+
+import sys
+
+collect_ignore = []
+
+# Async generators are a syntax error before Python 3.6.
+if sys.version_info < (3, 6):
+    collect_ignore.append("test_aio.py")
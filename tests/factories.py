@@ -0,0 +1,115 @@
+"""Builders of valid entities for the tests"""
+from decimal import Decimal
+
+from estonian_e_invoice.entities import (
+    VAT,
+    AccountInfo,
+    BuyerParty,
+    ContactData,
+    Footer,
+    Header,
+    Invoice,
+    InvoiceInformation,
+    InvoiceItem,
+    InvoiceSumGroup,
+    InvoiceType,
+    ItemDetailInfo,
+    ItemEntry,
+    LegalAddress,
+    PaymentInfo,
+    SellerParty,
+)
+
+
+def build_header() -> Header:
+    return Header(date="2020-04-20", file_id="FILE-1")
+
+
+def build_footer(invoices_count: int = 1, total_amount: str = "24.00") -> Footer:
+    return Footer(invoices_count=invoices_count, total_amount=Decimal(total_amount))
+
+
+def build_item_entry(index: int = 1) -> ItemEntry:
+    return ItemEntry(
+        description="Item <{index}> & co".format(index=index),
+        item_sum=Decimal("10.0000"),
+        vat=VAT(
+            vat_rate=Decimal("20.00"),
+            vat_sum=Decimal("2.0000"),
+            sum_before_vat=Decimal("10.0000"),
+            sum_after_vat=Decimal("12.0000"),
+        ),
+        item_total=Decimal("12.0000"),
+        item_detail_info=ItemDetailInfo(
+            item_unit="h", item_amount=Decimal("1.0000"), item_price=Decimal("10.0000")
+        ),
+    )
+
+
+def build_invoice(invoice_id: str = "1", rows: int = 2) -> Invoice:
+    total_sum = Decimal("12.00") * rows
+
+    seller_party = SellerParty(
+        name="Test seller",
+        reg_number="222222222",
+        vat_reg_number="EE123456789",
+        contact_data=ContactData(
+            contact_name="Test Contact Seller",
+            phone_number="57557575",
+            email_address="seller@test.test",
+            legal_address=LegalAddress(
+                postal_address_1="Test street 1", city="Test city"
+            ),
+        ),
+        account_info=AccountInfo(
+            account_number="10123456789012",
+            iban="EE471000001020145685",
+            bic="HABAEE2X",
+            bank_name="Test Bank",
+        ),
+    )
+    buyer_party = BuyerParty(name="Test buyer", reg_number="111111111")
+    invoice_information = InvoiceInformation(
+        invoice_type=InvoiceType(invoice_type="DEB"),
+        invoice_number="Invoice {invoice_id}".format(invoice_id=invoice_id),
+        invoice_date="2020-04-20",
+        document_name="Invoice",
+        due_date="2020-05-20",
+    )
+    invoice_sum_group = InvoiceSumGroup(
+        total_sum=total_sum,
+        invoice_sum=Decimal("10.0000") * rows,
+        currency="EUR",
+        total_to_pay=total_sum,
+        total_vat_sum=Decimal("2.00") * rows,
+    )
+    invoice_item = InvoiceItem(
+        invoice_item_entries=[build_item_entry(index) for index in range(rows)]
+    )
+    payment_info = PaymentInfo(
+        currency="EUR",
+        payment_description="Invoice {invoice_id}".format(invoice_id=invoice_id),
+        payable=True,
+        payment_total_sum=total_sum,
+        payer_name="Test buyer",
+        payment_id=invoice_id,
+        pay_to_account="EE909900123456789012",
+        pay_to_name="Test seller",
+        pay_due_date="2020-05-20",
+    )
+
+    return Invoice(
+        invoice_id=invoice_id,
+        reg_number="111111111",
+        seller_reg_number="222222222",
+        seller_party=seller_party,
+        buyer_party=buyer_party,
+        invoice_information=invoice_information,
+        invoice_sum_group=invoice_sum_group,
+        invoice_item=invoice_item,
+        payment_info=payment_info,
+    )
+
+
+def build_invoice_from_record(record: dict) -> Invoice:
+    return build_invoice(invoice_id=record["invoice_id"], rows=record["rows"])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+"""Tests for the asyncio interface of the XML generation"""
+
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator
+from estonian_e_invoice.aio import AsyncXMLGenerator
+from estonian_e_invoice.validation.deferred import deferred_validation
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_footer, build_header, build_invoice
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def produce_invoices(count, produced=None):
+    for index in range(count):
+        if produced is not None:
+            produced.append(index)
+        yield build_invoice(invoice_id=str(index))
+
+
+class BufferWriter:
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+def test_async_generator_matches_streaming_generator():
+    sink = io.BytesIO()
+    StreamingXMLGenerator(
+        build_header(),
+        None,
+        [build_invoice(invoice_id=str(index)) for index in range(5)],
+    ).write(sink)
+
+    writer = BufferWriter()
+    run(
+        AsyncXMLGenerator(
+            build_header(), None, produce_invoices(5), batch_size=2
+        ).write(writer)
+    )
+
+    assert b"".join(writer.chunks) == sink.getvalue()
+    # Header, three batches of invoices and the footer.
+    assert len(writer.chunks) == 5
+
+
+def test_async_generator_pulls_invoices_on_demand():
+    produced = []
+
+    async def consume():
+        chunks = AsyncXMLGenerator(
+            build_header(),
+            build_footer(invoices_count=10, total_amount="240.00"),
+            produce_invoices(10, produced),
+            batch_size=3,
+        ).generate()
+        await chunks.__anext__()
+        await chunks.__anext__()
+        assert len(produced) == 3
+        return [chunk async for chunk in chunks]
+
+    assert len(run(consume())) == 4
+    assert len(produced) == 10
+
+
+def test_async_generator_writes_to_stream_writer():
+    class StreamWriter(BufferWriter):
+        drained = 0
+
+        def write(self, chunk):
+            self.chunks.append(chunk)
+
+        async def drain(self):
+            self.drained += 1
+
+    writer = StreamWriter()
+    run(AsyncXMLGenerator(build_header(), None, produce_invoices(1)).write(writer))
+
+    assert writer.drained == len(writer.chunks) == 3
+
+
+def test_pending_invoices_are_validated_in_worker_processes():
+    async def produce_pending_invoices():
+        with deferred_validation():
+            invoice = build_invoice(invoice_id=1)
+        yield invoice
+
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(ValidationError) as error:
+            run(
+                AsyncXMLGenerator(
+                    build_header(),
+                    None,
+                    produce_pending_invoices(),
+                    executor=executor,
+                ).write(BufferWriter())
+            )
+
+    assert error.value.errors == {
+        "invoiceId": ["must be of string type"],
+        "PaymentInfo.PaymentId": ["must be of string type"],
+    }
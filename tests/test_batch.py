@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""Tests for the parallel batch rendering"""
+
+import io
+from decimal import Decimal
+from xml.etree import ElementTree
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator
+from estonian_e_invoice.batch import BatchRenderer, RecordError
+from estonian_e_invoice.entities import Header
+from estonian_e_invoice.validation.deferred import deferred_validation
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_footer, build_header, build_invoice_from_record
+
+
+def test_batch_renderer_matches_streaming_generator():
+    records = [{"invoice_id": str(index), "rows": index % 3 + 1} for index in range(25)]
+    sink = io.BytesIO()
+
+    result = BatchRenderer(
+        build_invoice_from_record, max_workers=2, chunk_size=4
+    ).write(sink, build_header(), records)
+
+    expected = io.BytesIO()
+    StreamingXMLGenerator(
+        build_header(), None, map(build_invoice_from_record, records)
+    ).write(expected)
+    assert sink.getvalue() == expected.getvalue()
+    assert result.errors == []
+    assert result.footer.elements == {
+        "TotalNumberInvoices": 25,
+        "TotalAmount": Decimal("588.00"),
+    }
+
+
+def test_batch_renderer_reports_invalid_records():
+    records = [
+        {"invoice_id": "1", "rows": 1},
+        {"invoice_id": 2, "rows": 1},
+        {"invoice_id": "3", "rows": 1},
+    ]
+    sink = io.BytesIO()
+
+    result = BatchRenderer(
+        build_invoice_from_record, max_workers=1, chunk_size=2
+    ).write(sink, build_header(), records)
+
+    assert result.errors == [
+        RecordError(index=1, errors={"PaymentId": ["must be of string type"]})
+    ]
+    root = ElementTree.fromstring(sink.getvalue())
+    assert [invoice.get("invoiceId") for invoice in root.iter("Invoice")] == ["1", "3"]
+    assert root.find("Footer/TotalNumberInvoices").text == "2"
+
+
+def test_batch_renderer_validates_pending_header_and_footer():
+    renderer = BatchRenderer(build_invoice_from_record, max_workers=1)
+    records = [{"invoice_id": "1", "rows": 2}]
+    with deferred_validation():
+        header = Header(date="not-a-date", file_id=123)
+        footer = build_footer(invoices_count="1")
+
+    sink = io.BytesIO()
+    with pytest.raises(ValidationError) as error:
+        renderer.write(sink, header, records)
+    assert set(error.value.errors) == {"Date", "FileId"}
+    assert sink.getvalue() == b""
+
+    with pytest.raises(ValidationError) as error:
+        renderer.write(sink, build_header(), records, footer)
+    assert set(error.value.errors) == {"TotalNumberInvoices"}
+    assert sink.getvalue() == b""
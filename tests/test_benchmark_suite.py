@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+"""Tests for the baseline comparison of the benchmark suite"""
+
+from benchmarks.suite import STAGES, compare, run, run_scenario
+
+
+def test_slower_stages_are_reported_as_regressions():
+    results = run(invoices=(1,), rows=(1,), sample=1, repeat=1)
+    baseline = {
+        "scenarios": {
+            "invoices=1,rows=1": {
+                stage: results["scenarios"]["invoices=1,rows=1"][stage]
+                for stage in STAGES
+            },
+            "invoices=1000,rows=1": {stage: 1.0 for stage in STAGES},
+        }
+    }
+    assert compare(results, baseline, threshold=0.1) == []
+
+    baseline["scenarios"]["invoices=1,rows=1"]["construct"] /= 2
+    regressions = compare(results, baseline, threshold=0.1)
+    assert [(name, stage) for name, stage, _, _ in regressions] == [
+        ("invoices=1,rows=1", "construct")
+    ]
+
+
+def test_end_to_end_streams_every_invoice():
+    result = run_scenario(invoices=3, rows=1, sample=1, repeat=2)
+
+    assert result["measured_invoices"] == 1
+    assert result["total_seconds"] == result["end_to_end"] * 3
+    for stage in STAGES:
+        assert result[stage] <= result["median"][stage]
+
+    single_result = run_scenario(invoices=1, rows=1, sample=1, repeat=1)
+    # The header and the footer are shared by more invoices.
+    assert result["bytes_per_invoice"] < single_result["bytes_per_invoice"]
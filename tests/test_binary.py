@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""Tests for the binary format of validated entities"""
+
+import io
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice import XMLGenerator, binary
+from estonian_e_invoice.entities import InvoiceItem
+from estonian_e_invoice.validation.deferred import deferred_validation
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_footer, build_header, build_invoice
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CODECS = [
+    "json",
+    pytest.param(
+        "msgpack",
+        marks=pytest.mark.skipif(msgpack is None, reason="msgpack is not installed"),
+    ),
+]
+
+
+def generate(invoice) -> bytes:
+    return XMLGenerator(build_header(), None, invoice).generate()
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_entities_round_trip(codec):
+    entities = [build_header(), build_invoice(rows=3), build_footer()]
+    file = io.BytesIO()
+
+    assert binary.dump(entities, file, codec) == 3
+    assert file.getvalue()[:6] == b"EINV\x01" + codec[0].upper().encode()
+
+    loaded = list(binary.load(io.BytesIO(file.getvalue())))
+    assert [type(node) for node in loaded] == [type(node) for node in entities]
+    assert [node.to_dict() for node in loaded] == [node.to_dict() for node in entities]
+    assert generate(loaded[1]) == generate(entities[1])
+
+    (header,) = binary.load(io.BytesIO(binary.dumps(entities[0], codec)))
+    assert binary.loads(binary.dumps(entities[0], codec)).elements == header.elements
+
+
+def test_column_rows_are_encoded():
+    invoice = build_invoice(rows=2)
+    values = invoice.to_dict()
+    values["InvoiceItem"] = InvoiceItem.from_columns(
+        description=["Electricity", "Network fee"],
+        item_sum=[Decimal("10.0000"), Decimal("2.5000")],
+    )
+    invoice = type(invoice).from_dict(values)
+
+    loaded = binary.loads(binary.dumps(invoice, "json"))
+    assert isinstance(loaded.elements["InvoiceItem"].elements["InvoiceItemGroup"], list)
+    assert generate(loaded) == generate(invoice)
+
+
+def test_append(tmp_path):
+    path = str(tmp_path / "invoices.bin")
+    invoices = [build_invoice(invoice_id=str(index)) for index in range(4)]
+
+    assert binary.append(invoices[:1], path, "json") == 1
+    assert binary.append(invoices[1:], path) == 3
+    with pytest.raises(ValueError):
+        binary.append(invoices, path, "msgpack")
+
+    assert [invoice.attributes["invoiceId"] for invoice in binary.load(path)] == [
+        "0",
+        "1",
+        "2",
+        "3",
+    ]
+
+
+def test_pending_trees_are_validated():
+    with deferred_validation():
+        invoice = build_invoice()
+        invalid_invoice = build_invoice(invoice_id=1)
+
+    assert binary.loads(binary.dumps(invoice)).to_bytes() == invoice.to_bytes()
+
+    file = io.BytesIO()
+    with pytest.raises(ValidationError) as error:
+        binary.dump([invalid_invoice], file)
+    assert "invoiceId" in error.value.errors
+    assert list(binary.load(io.BytesIO(file.getvalue()))) == []
+
+
+def test_invalid_files_are_rejected():
+    with pytest.raises(ValueError):
+        list(binary.load(io.BytesIO(b"<E_Invoice>")))
+
+    data = binary.dumps(build_invoice(), "json")
+    with pytest.raises(ValueError):
+        list(binary.load(io.BytesIO(data[:-1])))
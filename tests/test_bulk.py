@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""Tests for the bulk validation of invoice records"""
+
+import io
+import json
+
+from estonian_e_invoice.bulk import BulkSummary, BulkValidator, FieldError
+from tests.factories import build_invoice_from_record
+
+RECORDS = [
+    {"invoice_id": "1", "rows": 1},
+    {"invoice_id": 2, "rows": 2},
+    {"invoice_id": "3", "rows": 1},
+]
+
+
+def test_results_list_entities_and_field_errors():
+    results = BulkValidator(build_invoice_from_record).validate(RECORDS)
+
+    assert [result.index for result in results] == [0, 1, 2]
+    assert [result.is_valid for result in results] == [True, False, True]
+    assert results[0].entity.attributes["invoiceId"] == "1"
+    assert results[1].entity is None
+    assert results[1].errors == [
+        FieldError("invoiceId", "must be of string type"),
+        FieldError("PaymentInfo.PaymentId", "must be of string type"),
+    ]
+
+
+def test_parallel_results_match_sequential_results():
+    records = RECORDS * 5
+
+    parallel_results = BulkValidator(
+        build_invoice_from_record, max_workers=2, chunk_size=4
+    ).validate(records)
+    sequential_results = BulkValidator(build_invoice_from_record).validate(records)
+
+    assert [(result.index, result.errors) for result in parallel_results] == [
+        (result.index, result.errors) for result in sequential_results
+    ]
+    assert parallel_results[0].entity.to_bytes() == (
+        sequential_results[0].entity.to_bytes()
+    )
+
+
+def test_results_are_written_as_json_lines(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+
+    summary = BulkValidator(build_invoice_from_record).write_jsonl(path, RECORDS)
+
+    assert summary == BulkSummary(valid=2, invalid=1)
+    with open(path, encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    assert lines[0] == {"index": 0, "valid": True, "errors": []}
+    assert lines[1] == {
+        "index": 1,
+        "valid": False,
+        "errors": [
+            {"path": "invoiceId", "message": "must be of string type"},
+            {"path": "PaymentInfo.PaymentId", "message": "must be of string type"},
+        ],
+    }
+
+    sink = io.StringIO()
+    BulkValidator(build_invoice_from_record).write_jsonl(
+        sink, RECORDS, only_invalid=True
+    )
+    assert [json.loads(line)["index"] for line in sink.getvalue().splitlines()] == [1]
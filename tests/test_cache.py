@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""Tests for the serialized fragment cache"""
+
+import io
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator
+from estonian_e_invoice.cache import FragmentCache, content_key
+from estonian_e_invoice.entities import VAT, AccountInfo, LegalAddress
+from tests.factories import build_footer, build_header, build_invoice
+
+
+def build_invoices(count: int, parties: list) -> list:
+    invoices = []
+    for index in range(count):
+        invoice = build_invoice(invoice_id=str(index))
+        elements = dict(invoice.elements)
+        elements["InvoiceParties"] = parties
+        invoice.elements = elements
+        invoices.append(invoice)
+    return invoices
+
+
+def build_frozen_parties() -> list:
+    parties = build_invoice().elements["InvoiceParties"]
+    for party in parties:
+        party.freeze()
+    return parties
+
+
+def test_cached_output_matches_uncached_output():
+    def write(fragment_cache=None):
+        sink = io.BytesIO()
+        StreamingXMLGenerator(
+            build_header(),
+            None,
+            build_invoices(3, parties),
+            fragment_cache=fragment_cache,
+        ).write(sink)
+        return sink.getvalue()
+
+    parties = build_frozen_parties()
+    fragment_cache = FragmentCache()
+
+    assert write(fragment_cache) == write()
+    # The parties of the first invoice are serialized with their contact data,
+    # address and account. The following invoices share the frozen parties.
+    assert fragment_cache.stats() == {
+        "hits": 4,
+        "misses": 5,
+        "evictions": 0,
+        "size": 5,
+        "hit_rate": 4 / 9,
+    }
+
+
+def test_nodes_which_are_not_frozen_are_not_looked_up():
+    fragment_cache = FragmentCache()
+    invoice = build_invoice()
+
+    assert invoice.to_bytes(fragment_cache=fragment_cache) == invoice.to_bytes()
+    assert fragment_cache.stats()["hits"] + fragment_cache.stats()["misses"] == 0
+    assert len(fragment_cache) == 0
+
+
+def test_xml_generator_uses_the_fragment_cache():
+    header, footer = build_header(), build_footer()
+    (invoice,) = build_invoices(1, build_frozen_parties())
+    fragment_cache = FragmentCache()
+
+    generator = XMLGenerator(header, footer, invoice, fragment_cache=fragment_cache)
+    assert generator.to_bytes() == XMLGenerator(header, footer, invoice).to_bytes()
+    assert len(fragment_cache) == 5
+
+
+def test_modified_nodes_are_serialized_again():
+    invoice = build_invoice()
+    seller_party = invoice.elements["InvoiceParties"][0]
+    fragment_cache = FragmentCache()
+    invoice.to_bytes(fragment_cache=fragment_cache)
+
+    elements = dict(seller_party.elements)
+    elements["Name"] = "Other seller"
+    seller_party.elements = elements
+
+    assert invoice.to_bytes(fragment_cache=fragment_cache) == invoice.to_bytes()
+    assert b"Other seller" in invoice.to_bytes(fragment_cache=fragment_cache)
+
+
+def test_least_recently_used_fragments_are_evicted():
+    fragment_cache = FragmentCache(max_size=2)
+    first, second, third = (
+        AccountInfo(account_number=str(number)) for number in range(3)
+    )
+    for account_info in (first, second, third):
+        account_info.freeze()
+
+    fragment_cache.get_fragment(first)
+    fragment_cache.get_fragment(second)
+    fragment_cache.get_fragment(first)
+    fragment_cache.get_fragment(third)
+    fragment_cache.get_fragment(first)
+
+    assert fragment_cache.stats()["evictions"] == 1
+    assert fragment_cache.stats()["hits"] == 2
+
+    fragment_cache.get_fragment(second)
+    assert fragment_cache.stats()["misses"] == 4
+
+    with pytest.raises(ValueError):
+        FragmentCache(max_size=0)
+
+
+def test_content_key_distinguishes_rendered_values():
+    assert content_key(LegalAddress(postal_address_1="Street 1", city="Tallinn")) == (
+        content_key(LegalAddress(postal_address_1="Street 1", city="Tallinn"))
+    )
+    assert content_key(
+        VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("2.0000"))
+    ) != content_key(VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("2.00")))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""Tests for building invoice rows from columns"""
+
+import pickle
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice import XMLGenerator
+from estonian_e_invoice.cache import content_key
+from estonian_e_invoice.entities import VAT, InvoiceItem, ItemDetailInfo, ItemEntry
+from estonian_e_invoice.validation.deferred import deferred_validation
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_footer, build_header, build_invoice
+
+COLUMNS = {
+    "description": ["Electricity", "Network fee", "Discount"],
+    "item_sum": [Decimal("10.0000"), Decimal("2.5000"), None],
+    "item_unit": ["kWh", None, ""],
+    "item_amount": [Decimal("100.0000"), None, None],
+    "vat_rate": [Decimal("20.00"), Decimal("20.00"), None],
+    "vat_sum": [Decimal("2.0000"), Decimal("0.5000"), None],
+}
+
+ROWS = [
+    ItemEntry(
+        description="Electricity",
+        item_sum=Decimal("10.0000"),
+        item_detail_info=ItemDetailInfo(item_unit="kWh", item_amount=Decimal("100.0000")),
+        vat=VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("2.0000")),
+    ),
+    ItemEntry(
+        description="Network fee",
+        item_sum=Decimal("2.5000"),
+        vat=VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("0.5000")),
+    ),
+    ItemEntry(description="Discount"),
+]
+
+
+def test_columns_render_like_rows():
+    item = InvoiceItem.from_columns(**COLUMNS)
+    rows = item.elements["InvoiceItemGroup"]
+
+    assert len(rows) == 3
+    assert rows[-1].elements == {"Description": "Discount"}
+    assert [row.to_bytes() for row in rows[:2]] == [row.to_bytes() for row in ROWS[:2]]
+    assert item.to_bytes() == InvoiceItem(ROWS).to_bytes()
+    assert content_key(item) == content_key(InvoiceItem(ROWS))
+
+    # The rows are built on every access and not kept.
+    assert rows[0] is not rows[0]
+    assert pickle.loads(pickle.dumps(item)).to_bytes() == item.to_bytes()
+
+
+def test_column_items_are_generated():
+    invoice = build_invoice(rows=1)
+    invoice.elements = dict(
+        invoice.elements, InvoiceItem=InvoiceItem.from_columns(**COLUMNS)
+    )
+
+    with deferred_validation():
+        header = build_header()
+
+    output = XMLGenerator(header, build_footer(), invoice).to_bytes()
+    assert b"<Description>Network fee</Description>" in output
+
+
+def test_invalid_columns_are_reported_by_row():
+    with pytest.raises(ValidationError) as error:
+        InvoiceItem.from_columns(
+            description=["Electricity", "", "A" * 501],
+            item_sum=[Decimal("1.00001"), None, 1],
+            vat_rate=[None, Decimal("20.00"), None],
+            vat_sum=[None, None, None],
+            item_price=[Decimal("1.0000")],
+        )
+
+    assert error.value.errors == {
+        "Description": [{1: ["required field"], 2: ["max length is 500"]}],
+        "ItemSum": [
+            {
+                0: ["must not have more than 4 decimal places"],
+                2: ["must be of decimal type"],
+            }
+        ],
+        "ItemDetailInfo.ItemPrice": ["must have 3 values"],
+        "VAT.VATSum": [{1: ["required field"]}],
+    }
+
+
+def test_unknown_columns_are_rejected():
+    from estonian_e_invoice.columns import ItemEntryColumns
+
+    with pytest.raises(TypeError):
+        ItemEntryColumns({"description": ["Item"], "price": [Decimal("1")]})
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""Runs the validation tests against the compiled validation engine"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice.entities import VAT, ItemEntry, SellerParty
+from estonian_e_invoice.validation import validation_schemas
+from estonian_e_invoice.validation.compiled import (
+    CompiledValidator,
+    UnsupportedSchemaError,
+)
+from estonian_e_invoice.validation.registry import validator_registry
+from estonian_e_invoice.validation.validators import CustomValidator
+
+# Every test case of the Cerberus engine is collected again for this module.
+from tests.test_validation import *  # noqa: F401,F403
+
+
+@pytest.fixture(autouse=True)
+def compiled_engine():
+    engine = validator_registry.engine
+    validator_registry.set_engine("compiled")
+    yield
+    validator_registry.set_engine(engine)
+
+
+@pytest.mark.parametrize(
+    "schema, document",
+    [
+        (validation_schemas.HEADER_SCHEMA, {"Date": "2020-4-31", "FileId": ""}),
+        (validation_schemas.HEADER_SCHEMA, {"Date": "2020-02-29" * 3, "Extra": 1}),
+        (validation_schemas.HEADER_SCHEMA, {"Date": date(2020, 2, 29), "FileId": "1"}),
+        (validation_schemas.HEADER_SCHEMA, {"Date": datetime(2020, 2, 29)}),
+        (validation_schemas.FOOTER_SCHEMA, {"TotalNumberInvoices": True}),
+        (
+            validation_schemas.PAYMENT_INFO_SCHEMA,
+            {"Currency": "eur", "Payable": 0, "PaymentTotalSum": Decimal("1.001")},
+        ),
+        (validation_schemas.INVOICE_TYPE_SCHEMA, {"Type": "DEBT"}),
+        (
+            validation_schemas.INVOICE_ITEM_SCHEMA,
+            {"InvoiceItemGroup": (None, ItemEntry(description="Item"), "Item")},
+        ),
+        (
+            validation_schemas.INVOICE_SCHEMA,
+            {"InvoiceParties": [SellerParty(name="Seller", reg_number="1"), []]},
+        ),
+        (validation_schemas.VAT_SCHEMA, {"VATRate": None, "VATSum": Decimal("1")}),
+    ],
+)
+def test_engines_are_equivalent(schema, document):
+    cerberus_validator = CustomValidator(schema)
+    compiled_validator = CompiledValidator(schema)
+
+    is_valid = cerberus_validator.validate(document)
+    assert compiled_validator.validate(document) == is_valid
+    assert compiled_validator.document == cerberus_validator.document
+    # Compare the representations to check the order of the errors as well.
+    assert str(compiled_validator.errors) == str(cerberus_validator.errors)
+
+
+def test_unsupported_schemas_fall_back_to_cerberus():
+    schema = {"Value": {"type": "string", "minlength": 2}}
+
+    with pytest.raises(UnsupportedSchemaError):
+        CompiledValidator(schema)
+
+    assert isinstance(validator_registry.get(schema), CustomValidator)
+    assert isinstance(
+        validator_registry.get(validation_schemas.VAT_SCHEMA), CompiledValidator
+    )
+
+
+def test_compiled_engine_validates_nodes():
+    vat = VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("20.0000"))
+    assert vat.elements == {"VATRate": Decimal("20.00"), "VATSum": Decimal("20.0000")}
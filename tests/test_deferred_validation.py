@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+"""Tests for the deferred validation of entity trees"""
+
+import ast
+import io
+import pickle
+import threading
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator
+from estonian_e_invoice.entities import VAT, BuyerParty, InvoiceType, ItemEntry
+from estonian_e_invoice.validation.deferred import deferred_validation
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_header, build_invoice
+
+
+def build_invalid_invoice():
+    with deferred_validation():
+        invoice = build_invoice(invoice_id=1, rows=20)
+        entries = invoice.elements["InvoiceItem"].elements["InvoiceItemGroup"]
+        entries[17] = ItemEntry(
+            description="Item",
+            vat=VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("2.00001")),
+        )
+        entries.append("Item")
+        invoice.elements["InvoiceParties"][1].elements = {"Name": 1}
+
+    return invoice
+
+
+def test_entities_are_validated_eagerly_by_default():
+    with pytest.raises(ValidationError):
+        BuyerParty(name=1)
+
+
+def test_tree_errors_are_reported_with_their_paths():
+    invoice = build_invalid_invoice()
+
+    with pytest.raises(ValidationError) as validation_error:
+        invoice.validate_tree()
+
+    assert ast.literal_eval(str(validation_error.value)) == {
+        "InvoiceItem.InvoiceItemGroup[20]": ["must be of item_entry type"],
+        "InvoiceItem.InvoiceItemGroup[17].VAT.VATSum": [
+            "must not have more than 4 decimal places"
+        ],
+        "InvoiceParties[1].Name": ["must be of string type"],
+        "PaymentInfo.PaymentId": ["must be of string type"],
+        "invoiceId": ["must be of string type"],
+    }
+
+
+def test_validated_tree_matches_eagerly_validated_tree():
+    with deferred_validation():
+        invoice = build_invoice()
+        invoice_type = InvoiceType(invoice_type="DEB", source_invoice="1")
+
+    invoice.validate_tree()
+    invoice_type.validate_tree()
+
+    assert invoice.to_bytes() == build_invoice().to_bytes()
+    assert invoice.elements["PaymentInfo"].elements["Payable"] == "YES"
+    assert (
+        invoice_type.to_bytes()
+        == b'<Type type="DEB"><SourceInvoice>1</SourceInvoice></Type>'
+    )
+
+
+def test_generators_validate_pending_trees():
+    with pytest.raises(ValidationError) as validation_error:
+        StreamingXMLGenerator(build_header(), None, [build_invalid_invoice()]).write(
+            io.BytesIO()
+        )
+
+    assert "invoiceId" in ast.literal_eval(str(validation_error.value))
+
+
+def test_deferring_is_thread_local():
+    errors = []
+
+    def build_buyer_party():
+        try:
+            BuyerParty(name=1)
+        except ValidationError as e:
+            errors.append(e)
+
+    with deferred_validation():
+        thread = threading.Thread(target=build_buyer_party)
+        thread.start()
+        thread.join()
+        BuyerParty(name=1)
+
+    assert len(errors) == 1
+
+
+def test_pickled_trees_stay_pending():
+    invoice = pickle.loads(pickle.dumps(build_invalid_invoice()))
+
+    with pytest.raises(ValidationError) as validation_error:
+        invoice.validate_tree()
+    assert "invoiceId" in ast.literal_eval(str(validation_error.value))
+
+    with deferred_validation():
+        invoice = build_invoice()
+    invoice = pickle.loads(pickle.dumps(invoice))
+    invoice.validate_tree()
+
+    assert invoice.to_bytes() == build_invoice().to_bytes()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""Tests for building entities from mappings and exporting them"""
+
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice import XMLGenerator
+from estonian_e_invoice.dicts import read_jsonl
+from estonian_e_invoice.entities import Footer, Invoice, InvoiceItem
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_header, build_invoice
+
+
+def to_json(invoice: Invoice) -> str:
+    return json.dumps(invoice.to_dict(), default=str)
+
+
+def test_invoice_round_trip():
+    invoice = build_invoice(rows=3)
+    data = invoice.to_dict()
+
+    assert data["invoiceId"] == "1"
+    assert list(data["InvoiceParties"]) == ["SellerParty", "BuyerParty"]
+    assert data["InvoiceInformation"]["Type"] == {"type": "DEB"}
+    assert data["InvoiceItem"]["InvoiceItemGroup"][0]["VAT"]["VATSum"] == Decimal(
+        "2.0000"
+    )
+
+    for rebuilt in (
+        Invoice.from_dict(data),
+        Invoice.from_dict(json.loads(to_json(invoice))),
+    ):
+        assert rebuilt.to_dict() == data
+        assert (
+            XMLGenerator(build_header(), None, rebuilt).generate()
+            == XMLGenerator(build_header(), None, invoice).generate()
+        )
+
+
+def test_scalars_are_parsed():
+    footer = Footer.from_dict({"TotalNumberInvoices": "2", "TotalAmount": 24})
+
+    assert footer.elements == {"TotalNumberInvoices": 2, "TotalAmount": Decimal("24")}
+
+
+@pytest.mark.parametrize(
+    "value, message",
+    [
+        ("sNaN", "must be of decimal type"),
+        ("NaN", "must be of decimal type"),
+        ("-Infinity", "must be of decimal type"),
+        (Decimal("sNaN"), "must be a finite decimal"),
+        (Decimal("NaN"), "must be a finite decimal"),
+        (Decimal("Infinity"), "must be a finite decimal"),
+    ],
+)
+def test_non_finite_decimals_are_rejected(value, message):
+    with pytest.raises(ValidationError) as error:
+        Footer.from_dict({"TotalNumberInvoices": 1, "TotalAmount": value})
+    assert error.value.errors == {"TotalAmount": [message]}
+
+
+def test_errors_are_keyed_by_path():
+    data = build_invoice(rows=2).to_dict()
+    data["InvoiceParties"]["Courier"] = {"Name": "Test courier"}
+    data["InvoiceSumGroup"]["TotalSum"] = "twelve"
+    data["InvoiceItem"]["InvoiceItemGroup"][1]["VAT"]["VATSum"] = "2.00001"
+    del data["InvoiceItem"]["InvoiceItemGroup"][0]["Description"]
+
+    with pytest.raises(ValidationError) as error:
+        Invoice.from_dict(data)
+
+    assert error.value.errors == {
+        "InvoiceParties.Courier": ["unknown field"],
+        "InvoiceSumGroup.TotalSum": ["must be of decimal type"],
+        "InvoiceItem.InvoiceItemGroup[0].Description": ["required field"],
+        "InvoiceItem.InvoiceItemGroup[1].VAT.VATSum": [
+            "must not have more than 4 decimal places"
+        ],
+    }
+
+    with pytest.raises(ValidationError) as error:
+        InvoiceItem.from_dict({"ItemEntry": {}})
+    assert error.value.errors == {
+        "ItemEntry": ["unknown field"],
+        "InvoiceItemGroup": ["required field"],
+    }
+
+
+def test_read_jsonl():
+    invoices = [build_invoice(invoice_id=str(index)) for index in range(3)]
+    source = io.BytesIO(
+        "\n".join(
+            [to_json(invoices[0]), "", to_json(invoices[1]), to_json(invoices[2])]
+        ).encode()
+    )
+
+    assert [invoice.to_dict() for invoice in read_jsonl(source)] == [
+        invoice.to_dict() for invoice in invoices
+    ]
+
+    data = invoices[0].to_dict()
+    del data["invoiceId"]
+    source = io.BytesIO(
+        "\n".join([to_json(invoices[1]), json.dumps(data, default=str)]).encode()
+    )
+    reader = read_jsonl(source)
+    assert next(reader).attributes["invoiceId"] == "1"
+    with pytest.raises(ValidationError) as error:
+        next(reader)
+    assert error.value.errors == {2: [{"invoiceId": ["required field"]}]}
+
+    with pytest.raises(ValidationError) as error:
+        list(read_jsonl(io.BytesIO(b"[]")))
+    assert error.value.errors == {1: ["must be of dict type"]}
+
+    with pytest.raises(ValidationError) as error:
+        list(read_jsonl(io.BytesIO(b"\n\xff\n")))
+    assert error.value.errors[2][0].startswith("invalid JSON: 'utf-8' codec")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests for the compact entity representation"""
+
+import pickle
+from decimal import Decimal
+from xml.etree import ElementTree
+
+import pytest
+from estonian_e_invoice.entities import VAT, BuyerParty, InvoiceType
+from estonian_e_invoice.entities.common import CompactNode
+from tests.factories import build_invoice, build_item_entry
+
+
+def test_entities_do_not_have_instance_dictionaries():
+    invoice = build_invoice()
+
+    for node in (
+        invoice,
+        invoice.elements["InvoiceParties"][1],
+        invoice.elements["InvoiceItem"].elements["InvoiceItemGroup"][0],
+    ):
+        assert not hasattr(node, "__dict__")
+
+
+def test_elements_keep_the_field_order():
+    vat = VAT(vat_sum=Decimal("2.0000"), vat_rate=Decimal("20.00"), currency="EUR")
+
+    assert list(vat.elements) == ["VATRate", "VATSum", "Currency"]
+    assert list(vat.iter_elements()) == list(vat.elements.items())
+
+
+def test_serializers_do_not_build_mappings(monkeypatch):
+    invoice = build_invoice()
+    expected = invoice.to_bytes(), ElementTree.tostring(invoice.to_etree())
+
+    def fail(node):
+        raise AssertionError("{tag} built a mapping".format(tag=node.tag))
+
+    monkeypatch.setattr(CompactNode, "elements", property(fail))
+    monkeypatch.setattr(CompactNode, "attributes", property(fail))
+
+    assert (invoice.to_bytes(), ElementTree.tostring(invoice.to_etree())) == expected
+
+
+def test_elements_are_read_only():
+    entry = build_item_entry()
+
+    with pytest.raises(TypeError):
+        entry.elements["Description"] = "Changed"
+
+    entry.elements = dict(entry.elements, Description="Changed")
+    assert entry.elements["Description"] == "Changed"
+
+    with pytest.raises(ValueError):
+        entry.elements = {"Unknown": "Value"}
+
+
+def test_absent_values_are_not_listed():
+    assert InvoiceType(invoice_type="DEB").elements == {}
+    assert InvoiceType(invoice_type="DEB").attributes == {"type": "DEB"}
+    assert BuyerParty(name="Buyer").elements == {"Name": "Buyer"}
+
+
+def test_entities_can_be_pickled():
+    invoice = build_invoice()
+
+    assert pickle.loads(pickle.dumps(invoice)).to_bytes() == invoice.to_bytes()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+"""Tests for the XML generators"""
+
+import ast
+import gc
+import io
+import weakref
+from decimal import Decimal
+from xml.dom import minidom
+from xml.etree import ElementTree
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator
+from estonian_e_invoice.entities import ItemEntry
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_footer, build_header, build_invoice
+
+
+def test_streaming_generator_matches_xml_generator():
+    header, footer, invoice = build_header(), build_footer(), build_invoice()
+    sink = io.BytesIO()
+
+    StreamingXMLGenerator(header, footer, [invoice]).write(sink)
+
+    expected = XMLGenerator(header, footer, invoice).generate(prettify=False)
+    assert sink.getvalue() == expected
+
+
+def test_streaming_generator_writes_multiple_invoices(tmp_path):
+    path = str(tmp_path / "invoices.xml")
+
+    StreamingXMLGenerator(
+        build_header(),
+        build_footer(invoices_count=3, total_amount="72.00"),
+        (build_invoice(invoice_id=str(index)) for index in range(3)),
+    ).write(path)
+
+    root = ElementTree.parse(path).getroot()
+    assert [child.tag for child in root] == [
+        "Header",
+        "Invoice",
+        "Invoice",
+        "Invoice",
+        "Footer",
+    ]
+    assert [invoice.get("invoiceId") for invoice in root.iter("Invoice")] == [
+        "0",
+        "1",
+        "2",
+    ]
+
+
+def test_streaming_generator_releases_written_invoices():
+    references = []
+
+    def invoices():
+        for index in range(5):
+            invoice = build_invoice(invoice_id=str(index))
+            references.append(weakref.ref(invoice))
+            yield invoice
+            # Only the invoice being written may still be alive.
+            gc.collect()
+            assert sum(reference() is not None for reference in references) <= 1
+
+    StreamingXMLGenerator(build_header(), None, invoices()).write(io.BytesIO())
+    assert len(references) == 5
+
+
+def test_streaming_generator_computes_footer():
+    sink = io.BytesIO()
+
+    footer = StreamingXMLGenerator(
+        build_header(),
+        None,
+        (build_invoice(invoice_id=str(index), rows=index) for index in range(1, 4)),
+    ).write(sink)
+
+    assert footer.elements == {
+        "TotalNumberInvoices": 3,
+        "TotalAmount": Decimal("72.00"),
+    }
+    root = ElementTree.fromstring(sink.getvalue())
+    assert root.find("Footer/TotalNumberInvoices").text == "3"
+    assert root.find("Footer/TotalAmount").text == "72.00"
+
+
+def test_streaming_generator_checks_given_footer():
+    with pytest.raises(ValidationError) as validation_error:
+        StreamingXMLGenerator(
+            build_header(),
+            build_footer(invoices_count=2, total_amount="24.00"),
+            [build_invoice(invoice_id="1"), build_invoice(invoice_id="2")],
+        ).write(io.BytesIO())
+    assert {
+        "TotalAmount": ["does not match the invoices, expected 48.00"]
+    } == ast.literal_eval(str(validation_error.value))
+
+
+def test_streaming_generator_leaves_no_partial_file(tmp_path):
+    path = tmp_path / "invoices.xml"
+    path.write_bytes(b"previous")
+    with pytest.raises(ValidationError):
+        StreamingXMLGenerator(
+            build_header(),
+            build_footer(invoices_count=2, total_amount="24.00"),
+            [build_invoice(invoice_id="1"), build_invoice(invoice_id="2")],
+        ).write(str(path))
+    assert [item.name for item in tmp_path.iterdir()] == ["invoices.xml"]
+    assert path.read_bytes() == b"previous"
+
+
+def test_xml_generator_computes_footer():
+    header, invoice = build_header(), build_invoice()
+
+    assert XMLGenerator(header, None, invoice).generate(prettify=False) == XMLGenerator(
+        header, build_footer(), invoice
+    ).generate(prettify=False)
+
+
+def test_xml_generator_checks_given_footer_on_request():
+    footer = build_footer(invoices_count=2, total_amount="12.00")
+    # Given footers are written as they are by default.
+    XMLGenerator(build_header(), footer, build_invoice())
+
+    with pytest.raises(ValidationError) as validation_error:
+        XMLGenerator(build_header(), footer, build_invoice(), check_footer=True)
+    assert {
+        "TotalNumberInvoices": ["does not match the invoices, expected 1"],
+        "TotalAmount": ["does not match the invoices, expected 24.00"],
+    } == ast.literal_eval(str(validation_error.value))
+
+
+def test_prettified_output_matches_minidom():
+    invoice = build_invoice()
+    invoice.elements["InvoiceItem"].elements["InvoiceItemGroup"].append(
+        ItemEntry(description='Quotes " and \r\n line endings\r')
+    )
+    generator = XMLGenerator(build_header(), build_footer(), invoice)
+
+    prettified = generator.generate()
+
+    rough_string = generator.to_string(prettify=False)
+    assert prettified == minidom.parseString(rough_string).toprettyxml(indent="  ")
+
+
+def test_output_type_can_be_chosen():
+    generator = XMLGenerator(build_header(), build_footer(), build_invoice())
+    generator.generate()
+
+    assert isinstance(generator.to_string(prettify=True), str)
+    assert isinstance(generator.to_string(prettify=False), bytes)
+    assert generator.to_string(prettify=True, as_bytes=True) == generator.to_string(
+        prettify=True
+    ).encode("utf-8")
+    assert generator.to_string(prettify=False, as_bytes=False) == generator.to_string(
+        prettify=False
+    ).decode("utf-8")
+
+
+def test_direct_serialization_matches_element_tree():
+    invoice = build_invoice(rows=3)
+    invoice.elements["InvoiceItem"].elements["InvoiceItemGroup"].append(
+        ItemEntry(description='Quotes " \r\n and unicode € 😀')
+    )
+    invoice.attributes = dict(invoice.attributes, invoiceId='Tab\t"<&>"\r\n')
+
+    assert invoice.to_bytes() == ElementTree.tostring(invoice.to_etree(), "utf-8")
+    assert invoice.to_bytes("us-ascii") == ElementTree.tostring(
+        invoice.to_etree(), "us-ascii"
+    )
+    # ElementTree declares other encodings.
+    assert ElementTree.tostring(invoice.to_etree(), "latin-1") == (
+        b"<?xml version='1.0' encoding='latin-1'?>\n" + invoice.to_bytes("latin-1")
+    )
+
+    generator = XMLGenerator(build_header(), build_footer(), invoice)
+    assert generator.to_bytes() == generator.generate(prettify=False)
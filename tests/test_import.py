@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""Tests for the lazy imports of the package"""
+
+import json
+import subprocess
+import sys
+
+import estonian_e_invoice
+
+SCRIPT = """
+import json, sys
+import estonian_e_invoice
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_package_import_does_not_load_the_generators():
+    modules = json.loads(
+        subprocess.check_output([sys.executable, "-c", SCRIPT]).decode()
+    )
+
+    for module in (
+        "cerberus",
+        "xml.dom.minidom",
+        "estonian_e_invoice.entities",
+        "estonian_e_invoice.estonian_e_invoice",
+        "estonian_e_invoice.validation.validation_schemas",
+    ):
+        assert module not in modules
+
+
+def test_generators_are_loaded_on_first_use():
+    from estonian_e_invoice import XMLGenerator
+    from estonian_e_invoice.estonian_e_invoice import StreamingXMLGenerator
+
+    assert estonian_e_invoice.StreamingXMLGenerator is StreamingXMLGenerator
+    assert XMLGenerator.__module__ == "estonian_e_invoice.estonian_e_invoice"
+    assert "XMLGenerator" in dir(estonian_e_invoice)
+
+
+def test_warm_up_creates_the_validators():
+    from estonian_e_invoice.validation.registry import validator_registry
+
+    validator_registry.clear()
+    estonian_e_invoice.warm_up()
+    warm_stats = validator_registry.stats()
+
+    estonian_e_invoice.warm_up()
+    assert validator_registry.stats() == {
+        "hits": warm_stats["misses"],
+        "misses": warm_stats["misses"],
+    }
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""Tests for the timing of the generation pipeline"""
+
+import io
+
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator, instrumentation
+from estonian_e_invoice.instrumentation import Collector
+from estonian_e_invoice.validation.deferred import deferred_validation
+from tests.factories import build_footer, build_header, build_invoice
+
+
+def test_validation_and_generator_stages_are_recorded():
+    with Collector() as collector:
+        invoice = build_invoice(rows=3)
+        XMLGenerator(build_header(), build_footer(), invoice).generate(prettify=True)
+
+    timings = collector.to_dict()
+
+    assert timings["validate"]["ItemEntry"]["count"] == 3
+    assert timings["validate"]["Invoice"]["count"] == 1
+    assert timings["to_etree"]["ItemEntry"]["count"] == 3
+    assert timings["to_etree"]["Invoice"]["count"] == 1
+    assert set(timings["generator"]) == {
+        "XMLGenerator.validate_tree",
+        "XMLGenerator.to_etree",
+        "XMLGenerator.prettify",
+    }
+    assert all(
+        timing["seconds"] >= 0
+        for stage in timings.values()
+        for timing in stage.values()
+    )
+
+
+def test_deferred_validation_is_recorded():
+    with deferred_validation():
+        invoice = build_invoice(rows=2)
+
+    with Collector() as collector:
+        StreamingXMLGenerator(build_header(), None, [invoice]).write(io.BytesIO())
+
+    timings = collector.to_dict()
+    assert timings["validate"]["ItemEntry"]["count"] == 2
+    assert timings["generator"]["StreamingXMLGenerator.serialize"]["count"] == 3
+
+
+def test_collectors_are_restored_and_call_the_callback():
+    calls = []
+
+    with Collector() as outer:
+        with Collector(callback=lambda *args: calls.append(args)) as inner:
+            build_header()
+        assert instrumentation.active_collector is outer
+    assert instrumentation.active_collector is None
+
+    assert outer.to_dict() == {}
+    assert [(stage, name) for stage, name, _ in calls] == [("validate", "Header")]
+    assert inner.to_dict()["validate"]["Header"]["count"] == 1
+
+    inner.clear()
+    assert inner.to_dict() == {}
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""Tests for the interning of repeated entities"""
+
+import threading
+
+import pytest
+from estonian_e_invoice.entities import (
+    VAT,
+    AccountInfo,
+    BuyerParty,
+    ContactData,
+    LegalAddress,
+    SellerParty,
+)
+from estonian_e_invoice.interning import InternRegistry, intern_registry
+from estonian_e_invoice.validation.exceptions import ValidationError
+from estonian_e_invoice.validation.registry import validator_registry
+
+
+def build_seller_party(registry):
+    return registry.get(
+        SellerParty,
+        "Seller",
+        reg_number="222222222",
+        contact_data=registry.get(
+            ContactData,
+            contact_name="Contact",
+            legal_address=registry.get(
+                LegalAddress, postal_address_1="Street 1", city="Tallinn"
+            ),
+        ),
+        account_info=registry.get(AccountInfo, account_number="10123456789012"),
+    )
+
+
+def test_equal_arguments_return_the_same_instance():
+    registry = InternRegistry()
+
+    seller_party = build_seller_party(registry)
+    validator_registry.clear()
+
+    assert build_seller_party(registry) is seller_party
+    assert registry.get(SellerParty, name="Seller", reg_number="222222222") is not (
+        seller_party
+    )
+    # Interned entities are not validated again.
+    assert validator_registry.stats()["misses"] == 1
+    assert registry.stats() == {"hits": 4, "misses": 5, "evictions": 0, "size": 5}
+
+
+def test_interned_entities_are_frozen():
+    seller_party = build_seller_party(InternRegistry())
+    contact_data = seller_party.elements["ContactData"]
+
+    assert seller_party.is_frozen and contact_data.is_frozen
+    with pytest.raises(AttributeError):
+        seller_party.elements = {"Name": "Other"}
+    with pytest.raises(AttributeError):
+        contact_data.elements["LegalAddress"].elements = {"City": "Tartu"}
+    assert not SellerParty(name="Seller", reg_number="1").is_frozen
+
+
+def test_least_recently_used_entities_are_evicted():
+    registry = InternRegistry(max_size=2)
+
+    first = registry.get(BuyerParty, name="First")
+    registry.get(BuyerParty, name="Second")
+    assert registry.get(BuyerParty, name="First") is first
+    registry.get(BuyerParty, name="Third")
+
+    assert registry.get(BuyerParty, name="First") is first
+    assert registry.stats() == {"hits": 2, "misses": 3, "evictions": 1, "size": 2}
+
+
+def test_only_cacheable_classes_can_be_interned():
+    with pytest.raises(ValueError):
+        intern_registry.get(VAT, vat_rate=1, vat_sum=1)
+
+    with pytest.raises(ValidationError):
+        BuyerParty.interned(name="")
+    assert BuyerParty.interned(name="Buyer") is BuyerParty.interned("Buyer")
+
+
+def test_registry_is_thread_safe():
+    registry = InternRegistry(max_size=8)
+    parties = []
+
+    def get_parties():
+        for index in range(100):
+            parties.append(registry.get(BuyerParty, name=str(index % 10)))
+
+    threads = [threading.Thread(target=get_parties) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = registry.stats()
+    assert stats["hits"] + stats["misses"] == len(parties) == 400
+    assert stats["size"] == len(registry) == 8
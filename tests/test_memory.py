@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+"""Tests for the memory used by building and generating invoices
+
+The ceilings are the peaks traced by tracemalloc in bytes, and can be adjusted
+with environment variables, e.g. ESTONIAN_E_INVOICE_MAX_GENERATE_BYTES_PER_ROW.
+"""
+
+import os
+
+import pytest
+from benchmarks.bench_memory import construction_peak, generate_peak, streaming_peak
+
+ROWS = 50
+
+
+def ceiling(name: str, default: int) -> int:
+    return int(os.environ.get("ESTONIAN_E_INVOICE_MAX_" + name, default))
+
+
+def test_construction_peak_per_row():
+    assert construction_peak(ROWS) / ROWS <= ceiling("CONSTRUCT_BYTES_PER_ROW", 6000)
+
+
+@pytest.mark.parametrize(
+    "prettify, name, default",
+    [
+        (False, "GENERATE_BYTES_PER_ROW", 5000),
+        (True, "PRETTY_GENERATE_BYTES_PER_ROW", 10000),
+    ],
+)
+def test_generate_peak_per_row(prettify, name, default):
+    assert generate_peak(ROWS, prettify) / ROWS <= ceiling(name, default)
+
+
+def test_streaming_peak_per_file():
+    assert streaming_peak(100, rows=5) <= ceiling("STREAMING_PEAK_BYTES", 1000000)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+
+"""Tests for reading E_Invoice documents"""
+
+import io
+import tracemalloc
+from decimal import Decimal
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator
+from estonian_e_invoice.entities import SellerParty
+from estonian_e_invoice.parser import (
+    InvoiceReader,
+    parse,
+    parse_string,
+    release_child,
+)
+from estonian_e_invoice.validation.exceptions import ValidationError
+from estonian_e_invoice.validation.registry import validator_registry
+from tests.factories import build_footer, build_header, build_invoice
+
+
+@pytest.mark.parametrize("prettify", [False, True])
+def test_parsed_document_generates_the_same_output(prettify):
+    generator = XMLGenerator(build_header(), build_footer(), build_invoice())
+    text = generator.generate(prettify=prettify)
+
+    document = parse_string(text)
+
+    assert len(document.invoices) == 1
+    assert (
+        XMLGenerator(document.header, document.footer, document.invoices[0]).generate(
+            prettify=prettify
+        )
+        == text
+    )
+
+
+def test_parsed_files_generate_the_same_bytes(tmp_path):
+    path = str(tmp_path / "invoices.xml")
+    StreamingXMLGenerator(
+        build_header(),
+        None,
+        (build_invoice(invoice_id=str(index), rows=index) for index in range(1, 4)),
+    ).write(path)
+
+    document = parse(path)
+
+    sink = io.BytesIO()
+    StreamingXMLGenerator(document.header, document.footer, document.invoices).write(
+        sink
+    )
+    with open(path, "rb") as file:
+        assert sink.getvalue() == file.read()
+
+
+def test_values_are_parsed_into_their_schema_types():
+    document = parse_string(
+        XMLGenerator(build_header(), build_footer(), build_invoice()).to_bytes()
+    )
+    invoice = document.invoices[0]
+
+    assert document.footer.elements["TotalNumberInvoices"] == 1
+    assert document.footer.elements["TotalAmount"] == Decimal("24.00")
+    assert str(invoice.elements["InvoiceSumGroup"].elements["InvoiceSum"]) == (
+        "20.0000"
+    )
+    assert isinstance(invoice.elements["InvoiceParties"][0], SellerParty)
+    assert invoice.elements["PaymentInfo"].elements["Payable"] == "YES"
+
+
+def test_yes_no_values_are_parsed():
+    text = XMLGenerator(build_header(), build_footer(), build_invoice()).to_bytes()
+
+    document = parse_string(
+        text.replace(b"<Payable>YES</Payable>", b"<Payable>NO</Payable>")
+    )
+
+    assert document.invoices[0].elements["PaymentInfo"].elements["Payable"] == "NO"
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("NaN", "must be of decimal type"),
+        ("sNaN", "must be of decimal type"),
+        ("Infinity", "must be of decimal type"),
+        ("-Infinity", "must be of decimal type"),
+        ("1e5", "must be of decimal type"),
+        ("2.00001", "must not have more than 4 decimal places"),
+    ],
+)
+def test_decimals_are_parsed_like_xml_decimals(text, message):
+    document = XMLGenerator(build_header(), build_footer(), build_invoice()).to_bytes()
+    document = document.replace(
+        b"<VATSum>2.0000</VATSum>",
+        "<VATSum>{text}</VATSum>".format(text=text).encode(),
+        1,
+    )
+
+    with pytest.raises(ValidationError) as validation_error:
+        parse_string(document)
+
+    assert validation_error.value.errors == {
+        "InvoiceItem.InvoiceItemGroup[0].VAT.VATSum": [message]
+    }
+
+
+def test_invalid_values_are_reported_with_their_paths():
+    text = XMLGenerator(build_header(), build_footer(), build_invoice()).to_bytes()
+    text = text.replace(b"<VATSum>2.0000</VATSum>", b"<VATSum>2,00</VATSum>", 1)
+
+    with pytest.raises(ValidationError) as validation_error:
+        parse_string(text)
+
+    assert validation_error.value.errors == {
+        "InvoiceItem.InvoiceItemGroup[0].VAT.VATSum": ["must be of decimal type"]
+    }
+
+
+def test_unknown_elements_are_rejected():
+    text = XMLGenerator(build_header(), build_footer(), build_invoice()).to_bytes()
+
+    with pytest.raises(ValidationError) as validation_error:
+        parse_string(text.replace(b"<FileId>", b"<Extra /><FileId>"))
+
+    assert validation_error.value.errors == {"Header.Extra": ["unknown field"]}
+
+
+def write_invoices(path, count, footer=None):
+    StreamingXMLGenerator(
+        build_header(),
+        footer,
+        (build_invoice(invoice_id=str(index)) for index in range(count)),
+    ).write(path)
+
+
+def test_reader_yields_the_invoices_one_by_one(tmp_path):
+    path = str(tmp_path / "invoices.xml")
+    write_invoices(path, 3)
+    reader = InvoiceReader(path)
+
+    invoices = iter(reader)
+    first = next(invoices)
+    assert reader.header.elements["FileId"] == "FILE-1"
+    assert reader.footer is None
+
+    rest = list(invoices)
+    assert [invoice.attributes["invoiceId"] for invoice in [first] + rest] == [
+        "0",
+        "1",
+        "2",
+    ]
+    assert reader.footer.elements["TotalAmount"] == Decimal("72.00")
+    assert [invoice.to_bytes() for invoice in parse(path).invoices] == [
+        invoice.to_bytes() for invoice in [first] + rest
+    ]
+
+
+def test_reader_checks_the_footer(tmp_path):
+    path = str(tmp_path / "invoices.xml")
+    write_invoices(path, 2)
+    with open(path, "rb") as file:
+        text = file.read().replace(b"48.00", b"50.00")
+
+    with pytest.raises(ValidationError) as validation_error:
+        list(InvoiceReader(io.BytesIO(text)))
+    assert validation_error.value.errors == {
+        "TotalAmount": ["does not match the invoices, expected 48.00"]
+    }
+
+    assert len(list(InvoiceReader(io.BytesIO(text), check_footer=False))) == 2
+
+
+@pytest.mark.parametrize("module", ["xml.etree.ElementTree", "lxml.etree"])
+def test_released_children_are_removed_from_the_root(module):
+    etree = pytest.importorskip(module)
+    root = None
+    for event, element in etree.iterparse(
+        io.BytesIO(b"<a><b><c /></b><d /></a>"), ("start", "end")
+    ):
+        if root is None:
+            root = element
+        if event == "end" and element.tag in ("b", "d"):
+            release_child(root, element)
+            assert len(root) == 0 and len(element) == 0
+
+
+def test_reader_memory_does_not_grow_with_the_file(tmp_path):
+    path = str(tmp_path / "invoices.xml")
+    write_invoices(path, 200)
+
+    def peak_memory(read):
+        tracemalloc.start()
+        try:
+            read()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def read_invoices():
+        for _ in InvoiceReader(path):
+            pass
+
+    engine = validator_registry.engine
+    # The compiled validators keep the test fast under tracemalloc.
+    validator_registry.set_engine("compiled")
+    try:
+        # Imports and compiled validators are not counted.
+        parse(path)
+        assert peak_memory(read_invoices) < peak_memory(lambda: parse(path)) / 2
+    finally:
+        validator_registry.set_engine(engine)
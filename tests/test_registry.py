@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests for the validator registry"""
+
+import threading
+from decimal import Decimal
+
+from estonian_e_invoice.entities import VAT, ItemEntry
+from estonian_e_invoice.validation.registry import ValidatorRegistry, validator_registry
+from estonian_e_invoice.validation.validation_schemas import VAT_SCHEMA
+
+
+def test_validator_is_reused():
+    registry = ValidatorRegistry()
+
+    validator = registry.get(VAT_SCHEMA)
+    assert registry.stats() == {"hits": 0, "misses": 1}
+
+    assert registry.get(VAT_SCHEMA) is validator
+    assert registry.stats() == {"hits": 1, "misses": 1}
+
+    registry.clear()
+    assert registry.stats() == {"hits": 0, "misses": 0}
+    assert registry.get(VAT_SCHEMA) is not validator
+
+
+def test_validators_are_thread_local():
+    registry = ValidatorRegistry()
+    validators = []
+
+    def get_validator():
+        validators.append(registry.get(VAT_SCHEMA))
+        validators.append(registry.get(VAT_SCHEMA))
+
+    threads = [threading.Thread(target=get_validator) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert validators[0] is validators[1]
+    assert validators[2] is validators[3]
+    assert validators[0] is not validators[2]
+    assert registry.stats() == {"hits": 2, "misses": 2}
+
+
+def test_counters_of_finished_threads_are_summed_up():
+    registry = ValidatorRegistry()
+
+    for _ in range(5):
+        thread = threading.Thread(target=registry.get, args=(VAT_SCHEMA,))
+        thread.start()
+        thread.join()
+        registry.get(VAT_SCHEMA)
+
+    assert registry.stats() == {"hits": 4, "misses": 6}
+    # Only the counters of the main thread are kept per thread.
+    assert len(registry._stats) == 1
+
+
+def test_nodes_use_the_registry():
+    validator_registry.clear()
+
+    vat = VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("20.0000"))
+    for _ in range(3):
+        ItemEntry(description="Item description", vat=vat)
+
+    assert validator_registry.stats() == {"hits": 2, "misses": 2}
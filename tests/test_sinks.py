@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""Tests for the files written to a path or a file object"""
+
+import io
+
+import pytest
+from estonian_e_invoice.sinks import open_sink
+
+
+def test_file_objects_are_used_as_they_are():
+    sink = io.BytesIO()
+    with open_sink(sink, atomic=True) as file:
+        assert file is sink
+    assert not sink.closed
+
+
+def test_paths_are_opened_with_the_mode(tmp_path):
+    path = str(tmp_path / "records.jsonl")
+    with open_sink(path, "w", encoding="utf-8") as file:
+        file.write("€\n")
+    assert file.closed
+    with open(path, "rb") as file:
+        assert file.read() == "€\n".encode("utf-8")
+
+
+def test_atomic_paths_are_replaced_when_complete(tmp_path):
+    path = tmp_path / "invoices.xml"
+    path.write_bytes(b"previous")
+
+    with pytest.raises(ValueError):
+        with open_sink(str(path), atomic=True) as file:
+            file.write(b"partial")
+            raise ValueError
+    assert [item.name for item in tmp_path.iterdir()] == ["invoices.xml"]
+    assert path.read_bytes() == b"previous"
+
+    with open_sink(str(path), atomic=True) as file:
+        file.write(b"complete")
+    assert [item.name for item in tmp_path.iterdir()] == ["invoices.xml"]
+    assert path.read_bytes() == b"complete"
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+"""Tests for computing the invoice totals from the rows"""
+
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import pytest
+from estonian_e_invoice.entities import VAT, InvoiceItem, InvoiceSumGroup, ItemEntry
+from estonian_e_invoice.totals import (
+    build_vat,
+    check_invoice_totals,
+    compute_totals,
+    compute_vat_sum,
+)
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_invoice
+
+
+def build_rows() -> list:
+    return [
+        ItemEntry(
+            description="Standard rate",
+            item_sum=Decimal("10.0050"),
+            vat=build_vat(Decimal("20.00"), Decimal("10.0050")),
+        ),
+        ItemEntry(
+            description="Reduced rate",
+            item_sum=Decimal("3.3333"),
+            vat=build_vat(Decimal("9.00"), Decimal("3.3333")),
+        ),
+        ItemEntry(
+            description="Standard rate",
+            item_sum=Decimal("1.0000"),
+            vat=build_vat(Decimal("20.00"), Decimal("1.0000")),
+        ),
+        ItemEntry(description="Without VAT", item_sum=Decimal("0.5000")),
+    ]
+
+
+def test_compute_vat_sum_rounding():
+    assert compute_vat_sum(Decimal("9.00"), Decimal("0.0050")) == Decimal("0.0005")
+    assert compute_vat_sum(
+        Decimal("9.00"), Decimal("0.0050"), rounding=ROUND_HALF_EVEN
+    ) == Decimal("0.0004")
+
+    vat = build_vat(Decimal("20.00"), Decimal("10.0050"), currency="EUR")
+    assert vat.elements == {
+        "VATRate": Decimal("20.00"),
+        "VATSum": Decimal("2.0010"),
+        "SumBeforeVAT": Decimal("10.0050"),
+        "SumAfterVAT": Decimal("12.0060"),
+        "Currency": "EUR",
+    }
+
+
+def test_totals_of_rows():
+    totals = compute_totals(InvoiceItem(invoice_item_entries=build_rows()))
+
+    assert totals.invoice_sum == Decimal("14.8383")
+    assert totals.total_vat_sum == Decimal("2.50")
+    assert totals.total_sum == Decimal("17.34")
+    assert [vat.elements for vat in totals.get_vat_breakdown()] == [
+        {
+            "VATRate": Decimal("9.00"),
+            "VATSum": Decimal("0.3000"),
+            "SumBeforeVAT": Decimal("3.3333"),
+            "SumAfterVAT": Decimal("3.6333"),
+        },
+        {
+            "VATRate": Decimal("20.00"),
+            "VATSum": Decimal("2.2010"),
+            "SumBeforeVAT": Decimal("11.0050"),
+            "SumAfterVAT": Decimal("13.2060"),
+        },
+    ]
+
+    invoice_sum_group = totals.to_invoice_sum_group(currency="EUR")
+    assert invoice_sum_group.elements == {
+        "InvoiceSum": Decimal("14.8383"),
+        "TotalVATSum": Decimal("2.50"),
+        "TotalSum": Decimal("17.34"),
+        "Currency": "EUR",
+        "TotalToPay": Decimal("17.34"),
+    }
+    totals.check(invoice_sum_group)
+
+
+def test_totals_of_columns_match_rows():
+    rows = build_rows()
+    item = InvoiceItem.from_columns(
+        description=[row.elements["Description"] for row in rows],
+        item_sum=[row.elements["ItemSum"] for row in rows],
+        vat_rate=[Decimal("20.00"), Decimal("9.00"), Decimal("20.00"), None],
+        vat_sum=[Decimal("2.0010"), Decimal("0.3000"), Decimal("0.2000"), None],
+    )
+
+    totals = compute_totals(item)
+    expected = compute_totals(InvoiceItem(invoice_item_entries=rows))
+    assert totals.rows_count == expected.rows_count == 4
+    assert totals.to_invoice_sum_group().elements == (
+        expected.to_invoice_sum_group().elements
+    )
+
+
+def test_invoice_totals_are_checked():
+    invoice = build_invoice(rows=3)
+    check_invoice_totals(invoice)
+
+    rows = build_rows()
+    rows[1] = ItemEntry(
+        description="Reduced rate",
+        item_sum=Decimal("3.3333"),
+        vat=VAT(vat_rate=Decimal("9.00"), vat_sum=Decimal("0.31")),
+    )
+    totals = compute_totals(InvoiceItem(invoice_item_entries=rows), check_rows=True)
+
+    with pytest.raises(ValidationError) as error:
+        totals.check(
+            InvoiceSumGroup(
+                total_sum=Decimal("17.36"),
+                invoice_sum=Decimal("14.84"),
+                total_vat_sum=Decimal("2.51"),
+                vat=VAT(vat_rate=Decimal("20.00"), vat_sum=Decimal("2.2010")),
+            )
+        )
+
+    assert error.value.errors == {
+        "InvoiceItem": [
+            {
+                "InvoiceItemGroup": [
+                    {
+                        1: [
+                            {
+                                "VAT": [
+                                    {
+                                        "VATSum": [
+                                            "does not match the VAT rate, "
+                                            "expected 0.3000"
+                                        ]
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+        ],
+        "InvoiceSumGroup": [{"TotalSum": ["does not match the rows, expected 17.35"]}],
+    }
@@ -3,7 +3,8 @@
 """Test for validators"""
 
 import ast
-from datetime import datetime
+import itertools
+from datetime import date, datetime
 from decimal import Decimal
 
 import pytest
@@ -25,6 +26,7 @@ from estonian_e_invoice.entities import (
     PaymentInfo,
     SellerParty,
 )
+from estonian_e_invoice.validation.checks import check_date_string, to_yes_no
 from estonian_e_invoice.validation.exceptions import ValidationError
 
 
@@ -61,6 +63,37 @@ def test_header_validation():
     }
 
 
+def test_date_string_check_matches_strptime():
+    def is_valid(value):
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            return False
+        return True
+
+    for year, month, day in itertools.product(
+        ("1900", "2000", "2020", "2021", "0000", "202"), range(14), range(33)
+    ):
+        for value in (
+            "{}-{}-{}".format(year, month, day),
+            "{}-{:02}-{:02}".format(year, month, day),
+            "{}-{}- {}".format(year, month, day),
+            "{}-{:02}-{:02} ".format(year, month, day),
+        ):
+            assert (check_date_string(value) is None) == is_valid(value), value
+
+
+def test_date_values_are_formatted():
+    header = Header(date=date(2020, 2, 29), file_id="123456")
+    assert header.elements["Date"] == "2020-02-29"
+
+    with pytest.raises(ValidationError) as validation_error:
+        Header(date=datetime(2020, 2, 29), file_id="123456")
+    assert {"Date": ["must be of string type"]} == ast.literal_eval(
+        str(validation_error.value)
+    )
+
+
 def test_footer_validation():
     # Test invoices_count and total amount are required
     with pytest.raises(ValidationError) as validation_error:
@@ -78,6 +111,14 @@ def test_footer_validation():
         "TotalAmount": ["must be of decimal type"],
     } == ast.literal_eval(str(validation_error.value))
 
+    # Test with values which are not finite
+    for value in ("NaN", "sNaN", "Infinity"):
+        with pytest.raises(ValidationError) as validation_error:
+            Footer(invoices_count=10, total_amount=Decimal(value))
+        assert {"TotalAmount": ["must be a finite decimal"]} == ast.literal_eval(
+            str(validation_error.value)
+        )
+
     # Test with valid params
     footer = Footer(invoices_count=10, total_amount=Decimal("10.00"))
     assert footer.elements == {
@@ -212,6 +253,16 @@ def test_payment_info_validation():
     }
 
 
+def test_yes_no_is_coerced_by_truth_value():
+    assert [to_yes_no(value) for value in (True, False, 1, "", "NO")] == [
+        "YES",
+        "NO",
+        "YES",
+        "NO",
+        "YES",
+    ]
+
+
 def test_legal_address_validation():
     # Test postal_address_1 and city are required
     with pytest.raises(ValidationError) as validation_error:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""Tests for the XSD validation of generated documents"""
+
+import io
+
+import pytest
+from estonian_e_invoice import StreamingXMLGenerator, XMLGenerator
+from estonian_e_invoice.validation.exceptions import ValidationError
+from tests.factories import build_footer, build_header, build_invoice
+
+pytest.importorskip("lxml")
+
+from lxml import etree  # noqa: E402
+
+from estonian_e_invoice.xsd import (  # noqa: E402
+    XSD_PATH,
+    XSDValidator,
+    get_xsd_validator,
+)
+
+
+def get_global_elements(path: str) -> list:
+    schema = etree.parse(path).getroot()
+    return [
+        element.get("name")
+        for element in schema.iterchildren("{http://www.w3.org/2001/XMLSchema}element")
+    ]
+
+
+@pytest.mark.parametrize("prettify", [False, True])
+def test_generated_document_is_valid(prettify):
+    generator = XMLGenerator(build_header(), build_footer(), build_invoice())
+
+    get_xsd_validator().validate(generator.generate(prettify=prettify))
+
+
+def test_streamed_file_is_validated_per_invoice(tmp_path):
+    path = str(tmp_path / "invoices.xml")
+    invoices = (build_invoice(invoice_id=str(index)) for index in range(1, 4))
+    StreamingXMLGenerator(
+        build_header(), None, invoices, xsd_validator=get_xsd_validator()
+    ).write(path)
+
+    get_xsd_validator().validate_file(path)
+
+
+def test_only_the_root_is_declared_globally():
+    assert get_global_elements(XSD_PATH) == ["E_Invoice"]
+
+
+def test_streamed_invoices_are_validated_in_minimal_documents(tmp_path):
+    # Only invoice IDs 1 and 3 are valid by this schema.
+    with open(XSD_PATH) as file:
+        schema = file.read()
+    schema = schema.replace(
+        '<xs:attribute name="invoiceId" type="NormalStringType"',
+        '<xs:attribute name="invoiceId" type="OddIdType"',
+    ).replace(
+        "<!-- Document -->",
+        '<xs:simpleType name="OddIdType"><xs:restriction base="xs:string">'
+        '<xs:pattern value="[13]"/></xs:restriction></xs:simpleType>',
+    )
+    path = str(tmp_path / "e-invoice.xsd")
+    with open(path, "w") as file:
+        file.write(schema)
+    assert get_global_elements(path) == ["E_Invoice"]
+
+    validator = XSDValidator(path)
+    generator = StreamingXMLGenerator(
+        build_header(),
+        None,
+        [build_invoice(invoice_id="1"), build_invoice(invoice_id="3")],
+        xsd_validator=validator,
+    )
+    generator.write(io.BytesIO())
+
+    sink = io.BytesIO()
+    generator.invoices = [build_invoice(invoice_id=str(index)) for index in (1, 2, 3)]
+    with pytest.raises(ValidationError) as error:
+        generator.write(sink)
+    assert list(error.value.errors) == ["/E_Invoice/Invoice[2]"]
+    assert b'invoiceId="1"' in sink.getvalue()
+    assert b'invoiceId="2"' not in sink.getvalue()
+
+    generator.xsd_validator = None
+    sink = io.BytesIO()
+    generator.write(sink)
+    with pytest.raises(ValidationError) as error:
+        validator.validate_file(io.BytesIO(sink.getvalue()))
+    assert list(error.value.errors) == ["/E_Invoice/Invoice[2]"]
+
+
+def test_invalid_elements_are_keyed_by_path():
+    document = XMLGenerator(build_header(), build_footer(), build_invoice()).to_bytes()
+    document = document.replace(b"<Payable>YES</Payable>", b"<Payable>MAYBE</Payable>")
+
+    with pytest.raises(ValidationError) as error:
+        get_xsd_validator().validate(document)
+    assert list(error.value.errors) == ["/E_Invoice/Invoice/PaymentInfo/Payable"]
+
+    with pytest.raises(ValidationError) as error:
+        get_xsd_validator().validate_file(io.BytesIO(document))
+    assert list(error.value.errors) == ["/E_Invoice/Invoice[1]/PaymentInfo/Payable"]
+
+
+def test_file_children_are_checked_in_order():
+    header = build_header().to_bytes()
+    invoice = build_invoice().to_bytes()
+    footer = build_footer().to_bytes()
+    document = b"<E_Invoice>" + invoice + header + footer + b"</E_Invoice>"
+
+    with pytest.raises(ValidationError) as error:
+        get_xsd_validator().validate_file(io.BytesIO(document))
+    assert list(error.value.errors) == ["/E_Invoice"]
+
+
+def test_schema_is_compiled_once():
+    validator = get_xsd_validator()
+
+    assert isinstance(validator, XSDValidator)
+    assert get_xsd_validator() is validator